@@ -19,92 +19,997 @@ from PyQt5.QtWidgets import (
 	QApplication, QGraphicsScene,
 	QFileDialog, QGraphicsPixmapItem, QMessageBox)
 from PyQt5.QtCore import Qt
-import sys, os, math
+import sys, os, collections, time, argparse, glob, multiprocessing, struct, zlib, math, threading
+import concurrent.futures
+from array import array
 import TimingDiagrammerUI
+from TimingDiagrammerEngine import TimingEngine
+
+def deflateRows(rows):
+	#one band of an 8 bit RGB PNG as a piece of raw deflate data that ends on a
+	#byte boundary, so that the pieces of all bands can be joined into one zlib
+	#stream; returns it with the adler32 and length of what it holds
+	data = b''.join([b'\x00' + row for row in rows])
+	compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+	return (compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH), zlib.adler32(data), len(data))
+
+def adler32Combine(adler1, adler2, length2):
+	#adler32 of two pieces of data from the adler32 of each
+	a1 = adler1 & 0xffff
+	b1 = adler1 >> 16
+	a = (a1 + (adler2 & 0xffff) - 1) % 65521
+	b = (b1 + (adler2 >> 16) + length2 * (a1 - 1)) % 65521
+	return (b << 16) | a
+
+def renderSnapshotTile(snapshot, local, tile):
+	#an export tile, drawn by the TileRenderer that the calling thread keeps in local
+	renderer = getattr(local, 'renderer', None)
+	if renderer is None:
+		renderer = local.renderer = TileRenderer(snapshot)
+	return renderer.renderTile(*tile)
+
+class PngWriter(object):
+	#streams an 8 bit RGB PNG to an open file a band of rows at a time, so an
+	#image never has to be held in memory as a whole. Bands are compressed
+	#apart, on the threads of executor if there is one: zlib lets go of the
+	#GIL, so that overlaps with drawing the next bands. At most queued bands
+	#wait for their turn to be written
+	def __init__(self, f, width, height, executor = None, queued = 1):
+		self.f = f
+		self.executor = executor
+		self.queued = max(1, queued)
+		self.pending = collections.deque()
+		self.adler = 1
+		self.f.write(b'\x89PNG\r\n\x1a\n')
+		self.writeChunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+		#zlib header: deflate, 32K window, default compression
+		self.header = b'\x78\x9c'
+
+	def writeChunk(self, kind, data):
+		self.f.write(struct.pack('>I', len(data)) + kind + data)
+		self.f.write(struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+	def writeRows(self, rows):
+		#rows of raw RGB bytes, or a callable that makes them
+		if self.executor is None:
+			self.writeDeflated(deflateRows(rows() if callable(rows) else rows))
+			return
+		if callable(rows):
+			self.pending.append(self.executor.submit(lambda: deflateRows(rows())))
+		else:
+			self.pending.append(self.executor.submit(deflateRows, rows))
+		while len(self.pending) > self.queued:
+			self.writeDeflated(self.pending.popleft().result())
+
+	def writeDeflated(self, deflated):
+		(data, adler, length) = deflated
+		self.adler = adler32Combine(self.adler, adler, length)
+		self.writeChunk(b'IDAT', self.header + data)
+		self.header = b''
+
+	def close(self):
+		while len(self.pending) > 0:
+			self.writeDeflated(self.pending.popleft().result())
+		#an empty last block, then the adler32 of everything
+		self.writeChunk(b'IDAT', self.header + b'\x03\x00' + struct.pack('>I', self.adler))
+		self.writeChunk(b'IEND', b'')
+
+class WaveRow(object):
+	#all the lines, fills and curves of one row at one z, kept in flat arrays;
+	#only the primitives in the buckets that the exposed rectangle touches are
+	#painted. Pens and brushes come from styler, see QtStyles
+	LINE, POLY, RECT, PATH, GRID = range(5)
+	bucketWidth = 256
+	#when a cycle is narrower than lodCyclePixels on the device, the row is
+	#painted as bands from the top to the bottom of what each style draws in
+	#columns about lodColumnPixels wide, the min/max envelope of the waves
+	lodCyclePixels = 4
+	lodColumnPixels = 2
+
+	def __init__(self, styler = None):
+		#an item is given its styler once Qt has set it up, see WaveRowItem
+		if styler is not None:
+			self.styler = styler
+			self.reset()
+
+	def reset(self):
+		#empty the item so that it can be filled again for another row
+		self.kinds = array('B')
+		#index into self.styles, a (pen, brush) per pen or fill color
+		self.styleIndex = array('H')
+		self.styles = []
+		self.styleKeys = {}
+		#coordinates of primitive i are coords[offsets[i]:offsets[i + 1]]
+		self.coords = array('d')
+		self.offsets = array('I', [0])
+		#bucket number -> indices of the primitives that reach into it
+		self.buckets = {}
+		#extent kept as plain numbers while the row is being filled, and
+		#turned into a rectangle once, when the scene first asks for it
+		self.extent = None
+		self.bounds = None
+		self.cycleWidth = 2 * self.styler.waveHalfPeriod
+		#column width -> {style: [(x0, x1, y0, y1), ...]}
+		self.envelopes = {}
+
+	def style(self, key):
+		index = self.styleKeys.get(key)
+		if index is None:
+			index = len(self.styles)
+			if key[0] == 'fill':
+				self.styles.append((self.styler.noQPen, self.styler.qtBrush(key[1])))
+			else:
+				pen = self.styler.qtPen(key[1])
+				if key[2] != 0:
+					pen = QtGui.QPen(pen)
+					pen.setDashOffset(key[2])
+				self.styles.append((pen, self.styler.noQBrush))
+			self.styleKeys[key] = index
+		return index
+
+	def addPrimitive(self, primitive, dashOffset = 0):
+		#dashOffset starts the pattern of a dotted or dashed pen that far into it
+		kind = primitive[0]
+		if kind == 'grid':
+			#a run of grid lines is painted as two runs, one of each pen
+			(pens, x0, pitch, count, y0, y1) = primitive[2:]
+			for parity in (0, 1):
+				runCount = (count - parity + 1) // 2
+				if runCount > 0:
+					runX = x0 + pitch * parity
+					self.addEntry(self.GRID, ('stroke', pens[parity], dashOffset), (runX, 2 * pitch, runCount, y0, y1),
+						(runX, y0, runX + 2 * pitch * (runCount - 1), y1), pens[parity][1] / 2)
+			return
+		if kind == 'line':
+			coords = primitive[3:7]
+			self.addEntry(self.LINE, ('stroke', primitive[2], dashOffset), coords, self.pointBounds(coords), primitive[2][1] / 2)
+		elif kind == 'poly' or kind == 'arrow':
+			coords = [v for point in primitive[3] for v in point]
+			self.addEntry(self.POLY, ('fill', primitive[2]), coords, self.pointBounds(coords), 0)
+		elif kind == 'rect':
+			(x, y, width, height) = primitive[3:7]
+			self.addEntry(self.RECT, ('fill', primitive[2]), primitive[3:7], (x, y, x + width, y + height), 0)
+		else:
+			coords = [v for segment in primitive[3] for point in segment for v in point]
+			self.addEntry(self.PATH, ('stroke', primitive[2], dashOffset), coords, self.pointBounds(coords), primitive[2][1] / 2)
+
+	def pointBounds(self, coords):
+		xs = coords[0::2]
+		ys = coords[1::2]
+		return (min(xs), min(ys), max(xs), max(ys))
+
+	def addEntry(self, kind, styleKey, coords, bounds, margin):
+		self.kinds.append(kind)
+		self.styleIndex.append(self.style(styleKey))
+		self.coords.extend(coords)
+		self.offsets.append(len(self.coords))
+		index = len(self.kinds) - 1
+		(x0, y0, x1, y1) = bounds
+		x0 -= margin
+		y0 -= margin
+		x1 += margin
+		y1 += margin
+		extent = self.extent
+		if extent is None:
+			self.extent = [x0, y0, x1, y1]
+		else:
+			if x0 < extent[0]: extent[0] = x0
+			if y0 < extent[1]: extent[1] = y0
+			if x1 > extent[2]: extent[2] = x1
+			if y1 > extent[3]: extent[3] = y1
+		self.bounds = None
+		#a pixel to spare for the antialiasing
+		buckets = self.buckets
+		for bucket in range(int((x0 - 1) // self.bucketWidth), int((x1 + 1) // self.bucketWidth) + 1):
+			bucketList = buckets.get(bucket)
+			if bucketList is None:
+				bucketList = buckets[bucket] = array('I')
+			bucketList.append(index)
+
+	def paintRow(self, painter, exposed, lod):
+		#exposed is in row coordinates, lod the scale of the painter
+		if lod * self.cycleWidth < self.lodCyclePixels:
+			self.paintEnvelope(painter, exposed, lod)
+			return
+		first = int(exposed.left() // self.bucketWidth)
+		last = int(exposed.right() // self.bucketWidth)
+		if first == last:
+			indices = self.buckets.get(first, ())
+		else:
+			#a primitive can reach into several buckets, but is painted once
+			indices = set()
+			for bucket in range(first, last + 1):
+				indices.update(self.buckets.get(bucket, ()))
+			indices = sorted(indices)
+		kinds = self.kinds
+		coords = self.coords
+		offsets = self.offsets
+		currentStyle = -1
+		for i in indices:
+			if self.styleIndex[i] != currentStyle:
+				currentStyle = self.styleIndex[i]
+				(pen, brush) = self.styles[currentStyle]
+				painter.setPen(pen)
+				painter.setBrush(brush)
+			kind = kinds[i]
+			c = coords[offsets[i]:offsets[i + 1]]
+			if kind == self.LINE:
+				painter.drawLine(QtCore.QLineF(c[0], c[1], c[2], c[3]))
+			elif kind == self.POLY:
+				painter.drawPolygon(QtGui.QPolygonF([QtCore.QPointF(c[j], c[j + 1]) for j in range(0, len(c), 2)]))
+			elif kind == self.RECT:
+				painter.drawRect(QtCore.QRectF(c[0], c[1], c[2], c[3]))
+			elif kind == self.GRID:
+				#only the lines of the run that are exposed
+				(x0, pitch, count, y0, y1) = c
+				first = 0
+				last = int(count) - 1
+				if last > 0:
+					first = max(first, -int((x0 - exposed.left() + 1) // pitch))
+					last = min(last, int((exposed.right() + 1 - x0) // pitch))
+				for j in range(first, last + 1):
+					x = x0 + pitch * j
+					painter.drawLine(QtCore.QLineF(x, y0, x, y1))
+			else:
+				path = QPainterPath()
+				for j in range(0, len(c), 8):
+					path.moveTo(c[j], c[j + 1])
+					path.cubicTo(c[j + 2], c[j + 3], c[j + 4], c[j + 5], c[j + 6], c[j + 7])
+				painter.drawPath(path)
+
+	def envelope(self, columnWidth):
+		#grid lines and dotted or dashed guides are left out, at this scale they
+		#would only grey the row
+		columns = {}
+		kinds = self.kinds
+		coords = self.coords
+		offsets = self.offsets
+		for i in range(0, len(kinds)):
+			kind = kinds[i]
+			if kind == self.GRID:
+				continue
+			pen = self.styles[self.styleIndex[i]][0]
+			if pen.style() != Qt.NoPen and pen.style() != Qt.SolidLine:
+				continue
+			c = coords[offsets[i]:offsets[i + 1]]
+			if kind == self.RECT:
+				(x0, y0, x1, y1) = (c[0], c[1], c[0] + c[2], c[1] + c[3])
+			else:
+				(x0, y0, x1, y1) = self.pointBounds(c)
+			styleColumns = columns.get(self.styleIndex[i])
+			if styleColumns is None:
+				styleColumns = columns[self.styleIndex[i]] = {}
+			for column in range(int(x0 // columnWidth), int(x1 // columnWidth) + 1):
+				band = styleColumns.get(column)
+				if band is None:
+					styleColumns[column] = [y0, y1]
+				else:
+					if y0 < band[0]: band[0] = y0
+					if y1 > band[1]: band[1] = y1
+		#neighbouring columns with the same band become one rectangle
+		envelope = {}
+		for (style, styleColumns) in columns.items():
+			runs = []
+			for column in sorted(styleColumns):
+				(y0, y1) = styleColumns[column]
+				if runs != [] and runs[-1][1] == column * columnWidth and runs[-1][2:] == (y0, y1):
+					runs[-1] = (runs[-1][0], (column + 1) * columnWidth, y0, y1)
+				else:
+					runs.append((column * columnWidth, (column + 1) * columnWidth, y0, y1))
+			envelope[style] = runs
+		return envelope
+
+	def paintEnvelope(self, painter, exposed, lod):
+		#a power of two column width, so that zooming reuses the envelopes
+		columnWidth = 1 << int(self.lodColumnPixels / lod).bit_length()
+		envelope = self.envelopes.get(columnWidth)
+		if envelope is None:
+			envelope = self.envelopes[columnWidth] = self.envelope(columnWidth)
+		painter.setPen(Qt.NoPen)
+		#at least a device pixel high, so that a steady level still shows
+		minHeight = 1 / lod
+		for (style, runs) in envelope.items():
+			(pen, brush) = self.styles[style]
+			if pen.style() == Qt.NoPen:
+				painter.setBrush(brush)
+				margin = 0
+			else:
+				painter.setBrush(pen.color())
+				margin = pen.widthF() / 2
+			for (x0, x1, y0, y1) in runs:
+				if x1 < exposed.left() or x0 > exposed.right():
+					continue
+				height = max(y1 - y0 + 2 * margin, minHeight)
+				painter.drawRect(QtCore.QRectF(x0, (y0 + y1 - height) / 2, x1 - x0, height))
+
+class WaveRowItem(QtWidgets.QGraphicsItem, WaveRow):
+	#a row on the scene, painted by the item itself
+	def __init__(self, diagrammer):
+		super(WaveRowItem, self).__init__()
+		self.setFlag(QtWidgets.QGraphicsItem.ItemUsesExtendedStyleOption)
+		self.styler = diagrammer
+		self.reset()
+
+	def boundingRect(self):
+		if self.bounds is None:
+			if self.extent is None:
+				self.bounds = QtCore.QRectF()
+			else:
+				(x0, y0, x1, y1) = self.extent
+				self.bounds = QtCore.QRectF(x0, y0, x1 - x0, y1 - y0)
+		return self.bounds
+
+	def paint(self, painter, option, widget=None):
+		exposed = option.exposedRect
+		if painter.hasClipping():
+			#QGraphicsScene.render() exposes the whole item, but clips to its target
+			exposed = exposed.intersected(painter.clipBoundingRect())
+			#with a pixel to spare for the antialiasing, as for the buckets
+			if not exposed.adjusted(-1, -1, 1, 1).intersects(self.boundingRect()):
+				return
+		self.paintRow(painter, exposed, option.levelOfDetailFromTransform(painter.worldTransform()))
+
+class NameColumn(QtWidgets.QWidget):
+	#the signal name column, pinned to the left of the diagram view. What the
+	#scene has left of the waves is rendered into a pixmap for the height of
+	#the view and as much again above and below it, and only rendered again
+	#when the view scrolls past that or the scene or the zoom change
+	def __init__(self, diagrammer):
+		super(NameColumn, self).__init__(diagrammer.graphicsView)
+		self.diagrammer = diagrammer
+		#scene rect of the whole column, and the part of it in the pixmap
+		self.sceneColumn = QtCore.QRectF()
+		self.cacheRect = QtCore.QRectF()
+		self.pixmap = None
+
+	def setColumn(self, rect):
+		self.sceneColumn = rect
+		self.invalidate()
+
+	def invalidate(self):
+		self.pixmap = None
+		self.update()
+
+	def renderCache(self, top, bottom, scale):
+		#the margins are whole device pixels, so that the pixmap lands on the
+		#same pixel rows as the view and the names are not resampled
+		margin = int((bottom - top) * scale)
+		above = max(0, min(margin, int((top - self.sceneColumn.top()) * scale)))
+		below = max(0, min(margin, int((self.sceneColumn.bottom() - bottom) * scale) + 1))
+		top = top - above / scale
+		bottom = bottom + below / scale
+		self.cacheRect = QtCore.QRectF(self.sceneColumn.left(), top, self.sceneColumn.width(), max(0, bottom - top))
+		width = int(self.cacheRect.width() * scale + 0.5)
+		height = int(self.cacheRect.height() * scale + 0.5)
+		self.pixmap = QPixmap(max(1, width), max(1, height))
+		self.pixmap.fill(Qt.white)
+		if width == 0 or height == 0:
+			return
+		#names of rows that only have items near the view
+		self.diagrammer.showVirtualRegion(self.cacheRect, None)
+		painter = QPainter(self.pixmap)
+		painter.setRenderHints(self.diagrammer.graphicsView.renderHints())
+		self.diagrammer.graphicsScene.render(painter, QtCore.QRectF(0, 0, width, height), self.cacheRect,
+			Qt.IgnoreAspectRatio)
+		painter.end()
+
+	def paintEvent(self, event):
+		painter = QPainter(self)
+		painter.fillRect(self.rect(), Qt.white)
+		if self.sceneColumn.isEmpty():
+			return
+		transform = self.diagrammer.graphicsView.viewportTransform()
+		scale = transform.m22()
+		top = transform.inverted()[0].map(QtCore.QPointF(0, 0)).y()
+		bottom = top + self.height() / scale
+		neededTop = max(top, self.sceneColumn.top())
+		neededBottom = min(bottom, self.sceneColumn.bottom())
+		if self.pixmap is None or neededTop < self.cacheRect.top() or neededBottom > self.cacheRect.bottom():
+			self.renderCache(top, bottom, scale)
+		painter.drawPixmap(0, round((self.cacheRect.top() - top) * scale), self.pixmap)
+
+class Minimap(QtWidgets.QWidget):
+	#a strip under the diagram with the whole of it across, and the part the
+	#view shows framed; clicking or dragging centers the view there. Each line
+	#of the diagram gets a row of the strip, or every so many lines when they do
+	#not all fit, see startMinimap. The image is drawn by a MinimapWorker once a
+	#redraw is done, see scheduleMinimap
+	def __init__(self, diagrammer, parent):
+		super(Minimap, self).__init__(parent)
+		self.diagrammer = diagrammer
+		#scene rect the image was drawn for, and (image y, scene y) of the middle
+		#of each row, from top to bottom and with the ends of both added
+		self.image = None
+		self.imageRect = QtCore.QRectF()
+		self.rowCenters = []
+		self.setFixedHeight(64)
+		self.setCursor(Qt.PointingHandCursor)
+
+	def setImage(self, image, rect, rowCenters = []):
+		self.image = image
+		self.imageRect = rect
+		self.rowCenters = rowCenters
+		self.update()
+
+	def mapY(self, y, fromIndex):
+		#from image y to scene y with fromIndex 0, back with 1; straight between
+		#the middles of the rows
+		centers = self.rowCenters
+		toIndex = 1 - fromIndex
+		for i in range(1, len(centers)):
+			if y <= centers[i][fromIndex] or i == len(centers) - 1:
+				(before, after) = (centers[i - 1], centers[i])
+				span = after[fromIndex] - before[fromIndex]
+				if span == 0:
+					return after[toIndex]
+				return before[toIndex] + (y - before[fromIndex]) * (after[toIndex] - before[toIndex]) / span
+		return y
+
+	def sceneToMinimap(self, rect):
+		sx = self.width() / self.imageRect.width()
+		sy = self.height() / self.image.height()
+		top = self.mapY(rect.top(), 1) * sy
+		bottom = self.mapY(rect.bottom(), 1) * sy
+		return QtCore.QRectF((rect.x() - self.imageRect.x()) * sx, top, rect.width() * sx, bottom - top)
+
+	def paintEvent(self, event):
+		painter = QPainter(self)
+		painter.fillRect(self.rect(), Qt.white)
+		if self.image is not None and not self.imageRect.isEmpty():
+			#stretched until the one for the new size is drawn
+			painter.drawImage(QtCore.QRectF(self.rect()), self.image)
+			view = self.diagrammer.graphicsView
+			shown = view.mapToScene(view.viewport().rect()).boundingRect()
+			painter.setPen(QtGui.QPen(QtGui.QColor(0, 0, 0, 160), 0))
+			painter.setBrush(QtGui.QColor(0, 0, 255, 32))
+			painter.drawRect(self.sceneToMinimap(shown).adjusted(0, 0, -1, -1))
+		painter.setPen(QtGui.QColor("gray"))
+		painter.drawLine(0, 0, self.width(), 0)
+
+	def centerAt(self, pos):
+		if self.image is None or self.imageRect.isEmpty() or self.width() == 0 or self.height() == 0:
+			return
+		x = self.imageRect.x() + pos.x() * self.imageRect.width() / self.width()
+		y = self.mapY(pos.y() * self.image.height() / self.height(), 0)
+		self.diagrammer.centerView(x, y)
+
+	def mousePressEvent(self, event):
+		if event.button() == Qt.LeftButton:
+			self.centerAt(event.pos())
+
+	def mouseMoveEvent(self, event):
+		if event.buttons() & Qt.LeftButton:
+			self.centerAt(event.pos())
+
+	def resizeEvent(self, event):
+		self.diagrammer.scheduleMinimap()
+
+	def showEvent(self, event):
+		self.diagrammer.scheduleMinimap()
+
+class QtTextMetrics(object):
+	#text measured with Qt, for the diagrammer and for the layout engine of the
+	#render worker; each keeps its own caches in textSizeCache, by (text, font,
+	#size, wrapWidth), and fontMetricsCache, by (font, size), since font metrics
+	#are not to be shared between threads
+	def measureText(self, text, font = None, size = None, wrapWidth = -1):
+		#same size a QGraphicsTextItem gets, worked out from the font metrics
+		#without any item
+		key = (text, font, size, wrapWidth)
+		textSize = self.textSizeCache.get(key)
+		if textSize is None:
+			if wrapWidth == -1 and text.find('\t') == -1:
+				textSize = self.measureTextLines(text, font, size)
+			else:
+				#wrapping and tab stops are left to the text layout
+				textSize = self.measureTextDocument(text, font, size, wrapWidth)
+			self.textSizeCache[key] = textSize
+			if len(self.textSizeCache) > 4096:
+				self.textSizeCache.popitem(last=False)
+		return textSize
+
+	def measureTextLines(self, text, font, size):
+		metrics = self.fontMetricsCache.get((font, size))
+		if metrics is None:
+			if font is None:
+				metrics = QtGui.QFontMetricsF(QtGui.QFont())
+			else:
+				metrics = QtGui.QFontMetricsF(QtGui.QFont(font, size, QtGui.QFont.Normal))
+			self.fontMetricsCache[(font, size)] = metrics
+		width = 0
+		rows = text.split('\n')
+		for row in rows:
+			if row != '':
+				#a last glyph that hangs over its advance widens the line
+				width = max(width, metrics.horizontalAdvance(row) + max(0, -metrics.rightBearing(row[-1])))
+		height = metrics.height() * len(rows) + max(0, metrics.leading()) * (len(rows) - 1)
+		#and the 4 pixel document margin all around
+		return int(round(width + 8)), int(round(height + 8))
+
+	def measureTextDocument(self, text, font, size, wrapWidth):
+		document = QtGui.QTextDocument()
+		if font is None:
+			document.setDefaultFont(QtGui.QFont())
+		else:
+			document.setDefaultFont(QtGui.QFont(font, size, QtGui.QFont.Normal))
+		document.setPlainText(text)
+		if wrapWidth != -1:
+			document.setTextWidth(wrapWidth)
+		boundingRectSize = QtCore.QRectF(QtCore.QPointF(0, 0), document.size()).toRect().size()
+		return boundingRectSize.width(), boundingRectSize.height()
+
+class QtStyles(object):
+	#Qt pens, brushes, colors and fonts made from the engine's values for them and
+	#shared through stylePool; each thread that paints keeps a pool of its own,
+	#along with noQPen and noQBrush
+	def qtColor(self, color):
+		qcolor = self.stylePool.get(('color', color))
+		if qcolor is None:
+			qcolor = QtGui.QColor(color)
+			self.stylePool[('color', color)] = qcolor
+		return qcolor
+
+	def qtPen(self, pen):
+		qpen = self.stylePool.get(('pen', pen))
+		if qpen is None:
+			color, width, style = pen
+			qpen = QtGui.QPen(self.qtColor(color))
+			qpen.setWidth(width)
+			if style == 'dot':
+				qpen.setStyle(Qt.DotLine)
+			elif style == 'dash':
+				qpen.setStyle(Qt.DashLine)
+			self.stylePool[('pen', pen)] = qpen
+		return qpen
+
+	def qtBrush(self, color):
+		qbrush = self.stylePool.get(('brush', color))
+		if qbrush is None:
+			qbrush = QtGui.QBrush(self.qtColor(color))
+			self.stylePool[('brush', color)] = qbrush
+		return qbrush
+
+	def qtFont(self, font, size):
+		qfont = self.stylePool.get(('font', font, size))
+		if qfont is None:
+			qfont = QtGui.QFont(font, size, QtGui.QFont.Normal)
+			self.stylePool[('font', font, size)] = qfont
+		return qfont
+
+class LayoutEngine(QtTextMetrics, TimingEngine):
+	#the engine of the render worker thread. It lays out lines from a copy of the
+	#diagrammer's engine state and never sees the diagrammer itself
+	def __init__(self):
+		super(LayoutEngine, self).__init__()
+		self.textSizeCache = collections.OrderedDict()
+		self.fontMetricsCache = {}
+
+	def layoutLine(self, line, command):
+		#what drawWaves1LineCached keeps of a line it draws, less the items
+		self.primitives = []
+		self.directionArrowsList = []
+		self.overlayAnnotationList = []
+		self.deferredWaves = []
+		if self.maxWaveCount > 0:
+			self.fillAllGrids()
+		entry = {}
+		entry['lineCount'] = self.drawWaves1Line(line, command)
+		entry['primitives'] = self.primitives
+		entry['waves'] = self.deferredWaves
+		entry['extent'] = self.primitivesExtent(self.primitives)
+		entry['state'] = self.saveLineState()
+		entry['directionArrows'] = self.directionArrowsList
+		entry['overlayAnnotations'] = self.overlayAnnotationList
+		entry['errorMessage'] = self.errorMessage
+		self.primitives = []
+		self.deferredWaves = []
+		self.errorMessage = ''
+		self.centerOnRequest = None
+		return entry
+
+class TileRenderer(QtStyles, LayoutEngine):
+	#draws the tiles of an export on a thread of its own from a snapshot of the
+	#scene, see exportSnapshot. The primitives are painted as the items made of
+	#them paint, rows and text in the order the scene stacks them, so a tile
+	#comes out as rendering that part of the scene would. Like the render worker
+	#it never sees the diagrammer
+	def __init__(self, snapshot):
+		super(TileRenderer, self).__init__()
+		self.loadEngineState(snapshot['engine'])
+		self.snapshot = snapshot
+		self.stylePool = {}
+		self.noQPen = QtGui.QPen(Qt.NoPen)
+		self.noQBrush = QtGui.QBrush(Qt.NoBrush)
+		self.defaultTextColor = QtGui.QColor.fromRgba(snapshot['textColor'])
+
+	def renderTile(self, x, y, width, height):
+		#x and y are pixel offsets into the exported image; the tile is drawn with
+		#the snapshot's margin more pixels on each side, see exportMargin
+		snapshot = self.snapshot
+		(imageWidth, imageHeight) = snapshot['size']
+		(marginX, marginY) = snapshot['margin']
+		(sourceX, sourceY) = snapshot['origin']
+		scale = snapshot['scale']
+		left = min(x, marginX)
+		top = min(y, marginY)
+		right = min(imageWidth - x - width, marginX)
+		bottom = min(imageHeight - y - height, marginY)
+		entries = snapshot['buckets'].get((x // snapshot['tileWidth'], y // snapshot['bandHeight']), ())
+		items = self.tileItems(entries)
+		#Qt places glyphs that start left of or above the image a little
+		#differently, and steps a thin sloped line from where the image cuts it,
+		#so the image reaches to where the texts of the tile start and around its
+		#thin sloped lines, which are no longer than a row is high
+		for (z, order, kind, content) in items:
+			if kind == 'text':
+				left = max(left, min(x, x - int(math.floor((content[3] - sourceX) * scale))))
+				top = max(top, min(y, y - int(math.floor((content[4] - sourceY) * scale))))
+				continue
+			for primitive in content:
+				if primitive[0] != 'line' or primitive[2][1] * scale > 1:
+					continue
+				(x0, y0, x1, y1) = primitive[3:7]
+				if x0 != x1 and y0 != y1:
+					left = max(left, min(x, x - int(math.floor((min(x0, x1) - sourceX) * scale))))
+					top = max(top, min(y, y - int(math.floor((min(y0, y1) - sourceY) * scale))))
+					right = max(right, min(imageWidth - x - width, int(math.ceil((max(x0, x1) - sourceX) * scale)) + 1 - x - width))
+					bottom = max(bottom, min(imageHeight - y - height, int(math.ceil((max(y0, y1) - sourceY) * scale)) + 1 - y - height))
+		image = QImage(left + width + right, top + height + bottom, QImage.Format_RGB32)
+		image.fill(QtGui.QColor("white"))
+		painter = QPainter(image)
+		#what is only in the margin is left out by a clip; wide strokes can come
+		#out a little different along it, so it is kept out of the tile by a few
+		#pixels
+		painter.setClipRect(QtCore.QRect(left, top, width, height).adjusted(-4, -4, 4, 4))
+		#the scene mapped onto the exported image as rendering all of it would
+		transform = QtGui.QTransform().translate(left - x, top - y).scale(scale, scale).translate(-sourceX, -sourceY)
+		painter.setWorldTransform(transform)
+		exposed = painter.clipBoundingRect()
+		lod = QtWidgets.QStyleOptionGraphicsItem.levelOfDetailFromTransform(transform)
+		for (z, order, kind, content) in items:
+			if kind == 'text':
+				self.paintText(painter, content)
+				continue
+			row = WaveRow(self)
+			for primitive in content:
+				clipped = self.clipPrimitive(primitive, transform, image.width(), image.height())
+				if clipped is not None:
+					row.addPrimitive(*clipped)
+			if row.extent is not None:
+				row.paintRow(painter, exposed, lod)
+		painter.end()
+		if image.size() == QtCore.QSize(width, height):
+			return image
+		return image.copy(left, top, width, height)
+
+	def tileItems(self, entries):
+		#the parts reaching into a tile, (part, primitive) in order with a
+		#primitive of -1 for a run, as (z, order, 'row', primitives) and (z,
+		#order, 'text', primitive) sorted the way the scene stacks the items
+		#addPrimitives makes of them: by z, then by when they were added
+		parts = self.snapshot['parts']
+		zStep = self.snapshot['lineZStep']
+		items = []
+		index = 0
+		while index < len(entries):
+			partIndex = entries[index][0]
+			(stacking, primitives, wave, run) = parts[partIndex]
+			if wave is not None:
+				partPrimitives = self.drawDeferredRun(wave, run)
+				index += 1
+			else:
+				partPrimitives = []
+				while index < len(entries) and entries[index][0] == partIndex:
+					partPrimitives.append(primitives[entries[index][1]])
+					index += 1
+			rows = {}
+			texts = []
+			for primitive in partPrimitives:
+				kind = primitive[0]
+				if kind == 'anchor':
+					continue
+				if kind == 'text':
+					texts.append(primitive)
+					continue
+				row = rows.get(primitive[1])
+				if row is None:
+					row = rows[primitive[1]] = []
+				row.append(primitive)
+			for (z, row) in rows.items():
+				items.append((z + stacking * zStep, len(items), 'row', row))
+			for primitive in texts:
+				items.append((primitive[1] + stacking * zStep, len(items), 'text', primitive))
+		items.sort(key = lambda item: item[:2])
+		return items
+
+	def clipPrimitive(self, primitive, transform, width, height):
+		#Qt starts the pattern of a thin dotted or dashed line again where the
+		#edge of the image cuts it, so those lines and grid runs are cut to the
+		#width x height image here instead, by whole pixels and with the pattern
+		#offset by as much; a wider pen is dashed before it is clipped. Returns
+		#(primitive, dash offset), or None when nothing of it is on the image
+		kind = primitive[0]
+		scale = self.snapshot['scale']
+		if kind == 'line':
+			(pen, x0, y0, x1, y1) = primitive[2:7]
+			if pen[2] == 'solid' or pen[1] * scale > 1 or (x0 != x1) == (y0 != y1):
+				return (primitive, 0)
+			if y0 == y1:
+				run = self.clipRun(transform, x0, x1, y0, False, width)
+			else:
+				run = self.clipRun(transform, y0, y1, x0, True, height)
+			if run is None:
+				return None
+			(start, end, offset) = run
+			if y0 == y1:
+				return (primitive[:3] + [start, y0, end, y1], offset)
+			return (primitive[:3] + [x0, start, x1, end], offset)
+		if kind == 'grid':
+			(pens, x0, pitch, count, y0, y1) = primitive[2:]
+			if max(pens[0][1], pens[1][1]) * scale > 1 or (pens[0][2] == 'solid' and pens[1][2] == 'solid') or y0 == y1:
+				return (primitive, 0)
+			run = self.clipRun(transform, y0, y1, x0, True, height)
+			if run is None:
+				return None
+			(start, end, offset) = run
+			return (primitive[:6] + [start, end], offset)
+		return (primitive, 0)
+
+	def clipRun(self, transform, start, end, across, vertical, length):
+		#a line from start to end along one axis at across on the other, with its
+		#ends moved in by whole device pixels to the image, which is length
+		#pixels along that axis: (start, end, pixels the start moved) or None.
+		#Qt goes from the start of the line in steps of 1/64 pixel that it
+		#truncates, so an end is also moved off negative coordinates
+		scale = self.snapshot['scale']
+		def position(value):
+			if vertical:
+				return transform.map(QtCore.QPointF(across, value)).y()
+			return transform.map(QtCore.QPointF(value, across)).x()
+		def moveTo(value, target):
+			#value nudged to the last bit until it maps right onto the pixel
+			for step in range(0, 4):
+				mapped = position(value)
+				if mapped == target:
+					break
+				value = math.nextafter(value, math.inf if mapped < target else -math.inf)
+			return value
+		a = position(start)
+		b = position(end)
+		if max(a, b) < 0 or min(a, b) > length:
+			return None
+		direction = 1 if b > a else -1
+		offset = 0
+		if (a < 0) if direction > 0 else (a > length):
+			offset = int(math.ceil(-a if direction > 0 else a - length))
+			start = moveTo(start + direction * offset / scale, a + direction * offset)
+		if (b > length) if direction > 0 else (b < 0):
+			pixels = int(math.ceil(b - length if direction > 0 else -b))
+			end = moveTo(end - direction * pixels / scale, b - direction * pixels)
+		return (start, end, offset)
+
+	def paintText(self, painter, primitive):
+		#as a QGraphicsTextItem at (x, y) paints its document
+		(text, x, y, font, size, color, wrapWidth) = primitive[2:]
+		document = QtGui.QTextDocument()
+		if font is None:
+			document.setDefaultFont(QtGui.QFont())
+		else:
+			document.setDefaultFont(self.qtFont(font, size))
+		document.setPlainText(text)
+		document.setTextWidth(wrapWidth)
+		palette = QtGui.QPalette()
+		palette.setColor(QtGui.QPalette.Text, self.defaultTextColor if color is None else self.qtColor(color))
+		context = QtGui.QAbstractTextDocumentLayout.PaintContext()
+		context.palette = palette
+		context.clip = QtCore.QRectF(QtCore.QPointF(0, 0), document.size())
+		painter.save()
+		painter.translate(x, y)
+		painter.setClipRect(context.clip, Qt.IntersectClip)
+		document.documentLayout().draw(painter, context)
+		painter.restore()
+
+class RenderWorker(QtCore.QObject):
+	#runs in its own thread and lays out a snapshot of the document while the
+	#editor keeps taking keys; it works on a frozen copy of the engine state,
+	#see startBackgroundRender, and sends back primitives. Scene items are only
+	#ever created on the main thread
+	prepared = QtCore.pyqtSignal(int, object)
+
+	def __init__(self):
+		super(RenderWorker, self).__init__()
+		self.latestGeneration = 0
+		#made on the worker thread, so that its fonts belong to it
+		self.engine = None
+
+	@QtCore.pyqtSlot(int, object, object)
+	def prepare(self, generation, texts, snapshot):
+		#the lines as redrawLines will come to them, keyed the way
+		#drawWaves1LineCached keys them; lines that the diagrammer has drawn
+		#already are passed over, with the state they were drawn to
+		if self.engine is None:
+			self.engine = LayoutEngine()
+		engine = self.engine
+		engine.loadEngineState(snapshot['engine'])
+		engine.restoreLineState(snapshot['startState'])
+		engine.linesWithArrow = 0
+		knownLines = snapshot['knownLines']
+		dirtyBlocks = snapshot['dirtyBlocks']
+		lines = {}
+		seen = set()
+		acceptDirective = True
+		directiveKey = None
+		ordinal = 0
+		line = 0
+		for i in range(0, len(texts)):
+			if generation != self.latestGeneration:
+				#a newer edit arrived, this snapshot is stale
+				return
+			data = texts[i]
+			if data.strip() == '':
+				continue
+			if acceptDirective == True:
+				if data.strip().find('#!') == 0:
+					if data[2:] != '':
+						engine.processDirective(data[2:])
+					continue
+			command = engine.commandOf(data)
+			if command == '':
+				continue
+			acceptDirective = False
+			if directiveKey is None:
+				directiveKey = engine.directiveStateKey()
+			key = (command, directiveKey, ordinal, engine.lineStateKey(line))
+			dupCount = 0
+			while (key, dupCount) in seen:
+				dupCount += 1
+			key = (key, dupCount)
+			seen.add(key)
+			known = knownLines.get(key)
+			if known is not None and i not in dirtyBlocks:
+				(lineCount, state) = known
+				engine.restoreLineState(state)
+			else:
+				lines[key] = engine.layoutLine(line, command)
+				lineCount = lines[key]['lineCount']
+			line += lineCount
+			ordinal += 1
+			engine.waveHeightChange = 0
+		self.prepared.emit(generation, lines)
+
+class MinimapWorker(QtCore.QObject):
+	#draws the minimap image on its own thread from the drawings of the lines
+	#shown in it; it only reads their primitives, which are plain data, and never
+	#touches the scene. Each line is reduced to what it puts on the pixels of its
+	#row once, and kept by its line key for as long as the scale stays the same
+	drawn = QtCore.pyqtSignal(int, object, object)
+	#steps a row is divided into from top to bottom
+	rowSteps = 32
+
+	def __init__(self):
+		super(MinimapWorker, self).__init__()
+		self.latestGeneration = 0
+		#(left, width, columns) and line key -> reduced row
+		self.rowScale = None
+		self.rowCache = {}
+		#draws the runs of deferred waves
+		self.engine = None
+
+	@QtCore.pyqtSlot(int, object, object, object)
+	def draw(self, generation, rows, rect, size):
+		#rows are (line key, primitives, deferred waves, top, bottom) in the order
+		#drawn, each given an equal share of the height
+		(left, top, width, height) = rect
+		(columns, imageRows) = size
+		sx = columns / width
+		if self.rowScale != (left, width, columns):
+			self.rowScale = (left, width, columns)
+			self.rowCache = {}
+		rowCache = {}
+		reduced = []
+		for (key, primitives, waves, rowTop, rowBottom) in rows:
+			row = None if key is None else self.rowCache.get(key)
+			if row is None:
+				row = self.reduceRow(generation, self.rowParts(primitives, waves), left, sx, rowTop, rowBottom)
+				if row is None:
+					#a newer request is on its way
+					return
+			if key is not None:
+				rowCache[key] = row
+			reduced.append(row)
+		self.rowCache = rowCache
+		rowHeight = imageRows / max(1, len(rows))
+		step = rowHeight / self.rowSteps
+		image = QImage(columns, imageRows, QImage.Format_RGB32)
+		image.fill(Qt.white)
+		painter = QPainter(image)
+		painter.setPen(Qt.NoPen)
+		for i in range(0, len(reduced)):
+			y = i * rowHeight
+			for (color, colorBoxes) in reduced[i][0].items():
+				painter.setBrush(QtGui.QColor(color))
+				for (x0, y0, x1, y1) in colorBoxes:
+					painter.drawRect(QtCore.QRectF(x0, int(y + y0 * step), x1 - x0 + 1, max(1, int(y + y1 * step) - int(y + y0 * step))))
+		#lines faded, so that the edges of a busy row do not run together into
+		#a solid band
+		for i in range(0, len(reduced)):
+			y = i * rowHeight
+			for (color, colorLines) in reduced[i][1].items():
+				color = QtGui.QColor(color)
+				color.setAlpha(96)
+				painter.setPen(color)
+				for (x0, y0, x1, y1) in colorLines:
+					painter.drawLine(x0, int(y + y0 * step), x1, int(y + y1 * step))
+		painter.end()
+		#where the middle of each row is, in the image and in the scene, for the
+		#minimap to map its points through
+		centers = [(0, top)]
+		for i in range(0, len(rows)):
+			centers.append(((i + 0.5) * rowHeight, (rows[i][3] + rows[i][4]) / 2))
+		centers.append((imageRows, top + height))
+		self.drawn.emit(generation, image, (rect, centers))
+
+	def rowParts(self, primitives, waves):
+		#the primitives of a row, then those of its deferred waves a run at a time,
+		#drawn here and let go once reduced
+		yield primitives
+		for wave in waves:
+			if self.engine is None:
+				self.engine = TimingEngine()
+			for index in range(0, len(wave['runs'])):
+				yield self.engine.drawDeferredRun(wave, index)
+
+	def reduceRow(self, generation, parts, left, sx, top, bottom):
+		#at this scale most primitives land on the same pixels as others, so they
+		#are reduced to boxes and lines by color, in pixel columns across and in
+		#rowSteps down the row, and each drawn once; grid lines, dotted or dashed
+		#guides and text would only grey the strip. None if a newer request
+		#comes in meanwhile
+		sy = self.rowSteps / max(1, bottom - top)
+		boxes = {}
+		lines = {}
+		count = 0
+		for primitive in (primitive for part in parts for primitive in part):
+			count += 1
+			if count & 4095 == 4095 and generation != self.latestGeneration:
+				return None
+			kind = primitive[0]
+			if kind == 'line':
+				(color, penWidth, style) = primitive[2]
+				if style != 'solid' or color == 'transparent':
+					continue
+				points = ((primitive[3], primitive[4]), (primitive[5], primitive[6]))
+			elif kind == 'path':
+				(color, penWidth, style) = primitive[2]
+				if style != 'solid' or color == 'transparent':
+					continue
+				points = [point for segment in primitive[3] for point in (segment[0], segment[3])]
+			elif kind == 'poly' or kind == 'arrow' or kind == 'rect':
+				color = primitive[2]
+				#white fills only blank out what is under text
+				if color == 'transparent' or color == 'white':
+					continue
+				if kind == 'rect':
+					(x, y, w, h) = primitive[3:7]
+				else:
+					xs = [x for (x, y) in primitive[3]]
+					ys = [y for (x, y) in primitive[3]]
+					(x, y, w, h) = (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+				box = (int((x - left) * sx), int((y - top) * sy), int((x + w - left) * sx), int((y + h - top) * sy))
+				boxes.setdefault(color, set()).add(box)
+				continue
+			else:
+				continue
+			colorLines = lines.setdefault(color, set())
+			for j in range(0, len(points) - 1):
+				((x0, y0), (x1, y1)) = (points[j], points[j + 1])
+				colorLines.add((int((x0 - left) * sx), int((y0 - top) * sy), int((x1 - left) * sx), int((y1 - top) * sy)))
+		return (boxes, lines)
+
+class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagrammer, QtTextMetrics, QtStyles, TimingEngine):
+	renderRequested = QtCore.pyqtSignal(int, object, object)
+	minimapRequested = QtCore.pyqtSignal(int, object, object, object)
 
-fontMap = {'sans':'Sans', 'serif':'Serif', 
-			'mono':'Monospace', 'fixed': 'Fixed',
-			}
-
-#color map has pastel/light values
-colorMap = {
-	'a': 'antiquewhite', 
-	'A': 'aquamarine', 
-	'b': 'blue', 
-	'B': 'brown', 
-	'c': 'lightcyan', 
-	'C': 'cornflowerblue', 
-	'd': 'skyblue', 
-	'D': 'deepskyblue', 
-	'g': 'mediumaquamarine', 
-	'G': 'springgreen', 
-	'h': 'honeydew', 
-	'H': 'hotpink', 
-	'i': 'indigo', 
-	'I': 'indianred', 
-	'l': 'lavender', 
-	'L': 'lawngreen', 
-	'm': 'mistyrose', 
-	'M': 'magenta', 
-	'k': 'khaki', 
-	'o': 'orange',
-	'O': 'orchid',
-	'p': 'pink', 
-	'P': 'peachpuff', 
-	'r': 'red', 
-	'R': 'rosybrown', 
-	's': 'snow',
-	't': 'thistle',
-	'v': 'violet', 
-	'w': 'white',
-	'W': 'wheat',
-	'x': 'black',
-	'y': 'light yellow', 
-	'Y': 'yellow', 
-	'z': 'plum',
-	'Z': 'cornsilk'
-}
-
-#text color map has dark color values
-textColorMap = {
-	'a': 'aqua', 
-	'A': 'aquamarine', 
-	'b': 'blue', 
-	'B': 'brown', 
-	'c': 'chocolate', 
-	'C': 'crimson', 
-	'd': 'darkblue', 
-	'D': 'darkred', 
-	'g': 'green', 
-	'G': 'goldenrod', 
-	'h': 'honeydew', 
-	'i': 'indigo', 
-	'l': 'limegreen', 
-	'L': 'lawngreen', 
-	'm': 'maroon', 
-	'M': 'magenta', 
-	'n': 'navy', 
-	'k': 'khaki', 
-	'o': 'orangered',
-	'O': 'olive',
-	'p': 'deeppink', 
-	'P': 'purple', 
-	'r': 'red', 
-	'R': 'firebrick', 
-	's': 'slateblue',
-	't': 'teal',
-	'v': 'darkviolet', 
-	'V': 'fuchsia', 
-	'w': 'darkslategrey',
-	'W': 'saddlebrown',
-	'x': 'black',
-	'y': 'mediumvioletred', 
-	'Y': 'gold', 
-	'z': 'navy',
-	'Z': 'darkorchid'
-}
-
-class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagrammer):
 	def __init__(self, parent=None):
 		self.parent = parent
 		super(TimingDiagrammer, self).__init__(parent)
@@ -114,24 +1019,166 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 		self.actionSave.triggered.connect(self.fileSave)
 		self.actionSaveAs.triggered.connect(self.fileSaveAs)
 		self.actionExport.triggered.connect(self.fileExport)
+		self.actionExportSvg.triggered.connect(self.fileExportSvg)
 		self.actionExit.triggered.connect(self.fileExit)
 		self.actionAliasing.triggered.connect(self.optionsAliasing)
 		self.actionSettings.triggered.connect(self.optionsSettings)
 		self.actionAbout.triggered.connect(self.helpAbout)
+		self.actionZoomIn.triggered.connect(self.viewZoomIn)
+		self.actionZoomOut.triggered.connect(self.viewZoomOut)
+		self.actionZoomReset.triggered.connect(self.viewZoomReset)
+		self.actionMinimap.triggered.connect(self.viewMinimap)
+		#Ctrl++ needs the shift key on most keyboards
+		self.actionZoomIn.setShortcuts([self.actionZoomIn.shortcut(), QtGui.QKeySequence("Ctrl+=")])
 		self.plainTextEdit.document().setDefaultFont(QtGui.QFont("Monospace", 12, QtGui.QFont.Normal))
 		self.plainTextEdit.installEventFilter(self)
+		#Ctrl+wheel over the diagram zooms
+		self.graphicsView.viewport().installEventFilter(self)
 
 		self.setAutoFillBackground(False)
-		self.graphicsScene = QGraphicsScene(self)
-		self.graphicsScene.setBackgroundBrush(Qt.white);
-		fileName = os.path.join(os.path.dirname(os.path.abspath(__file__)), "splash.jpg")
-		if os.path.isfile(fileName):
-			splash = QGraphicsPixmapItem(QPixmap.fromImage(QImage(fileName)))
-			self.graphicsScene.addItem(splash)
+		self.graphicsScene = self.newScene()
+		self.splashItem = None
+		self.showSplash()
 
 		self.graphicsView.setMouseTracking(True)
 		self.graphicsView.setScene(self.graphicsScene)
 		self.antiAliasedView = False
+		#the signal names stay in a column of their own left of the waves, so
+		#that scrolling sideways keeps them in sight and only repaints the waves
+		self.frozenNameColumn = True
+		self.clearNameColumnLabels = self.frozenNameColumn
+		self.nameColumn = NameColumn(self)
+		self.nameColumn.hide()
+		self.graphicsView.verticalScrollBar().valueChanged.connect(self.nameColumn.update)
+		#an overview of the whole diagram under the view, drawn on a thread of
+		#its own once a redraw is done and the diagram has been still for
+		#minimapQuietPeriod ms
+		self.minimapQuietPeriod = 250
+		#least height of a row of the minimap
+		self.minimapRowPixels = 4
+		self.minimapGeneration = 0
+		self.minimapThread = None
+		self.minimapWorker = None
+		self.minimapTimer = QtCore.QTimer(self)
+		self.minimapTimer.setSingleShot(True)
+		self.minimapTimer.timeout.connect(self.startMinimap)
+		self.minimap = Minimap(self, self.main)
+		self.gridLayout.addWidget(self.minimap, 1, 0, 1, 1)
+		for scrollBar in (self.graphicsView.horizontalScrollBar(), self.graphicsView.verticalScrollBar()):
+			scrollBar.valueChanged.connect(self.minimapViewChanged)
+			scrollBar.rangeChanged.connect(self.minimapViewChanged)
+		#scale of the view, kept between zoomMin and zoomMax
+		self.zoomFactor = 1.0
+		self.zoomStep = 1.25
+		self.zoomMin = 1 / 1024
+		self.zoomMax = 16.0
+		#while the scene is built in bulk the view neither repaints nor scrolls, and
+		#a scene built from scratch keeps no index until it is done;
+		#sceneIndexMethod is the index it goes back to
+		self.sceneIndexMethod = QGraphicsScene.BspTreeIndex
+		self.bulkBuildDepth = 0
+		self.bulkBuildFromScratch = False
+		self.deferredCenterOn = None
+		#a scene built from scratch is built off view in a spare scene and swapped
+		#in when done; the scene it replaces is cleared once the event loop is idle
+		#and becomes the next spare
+		self.swapScenes = True
+		self.shownScene = None
+		self.shownItems = []
+		self.spareScene = None
+		self.retiredScene = None
+		self.sceneTeardownTimer = QtCore.QTimer(self)
+		self.sceneTeardownTimer.setSingleShot(True)
+		self.sceneTeardownTimer.timeout.connect(self.tearDownRetiredScene)
+
+		#redraw only the lines that changed or moved instead of rebuilding the whole scene
+		self.incrementalRedraw = True
+		self.lineItemCache = {}
+		#drawings of lines that were edited away, deleted or moved, kept off the
+		#scene by the same key as lineItemCache, so that undoing an edit or moving
+		#lines back puts the old items back; at most lineDrawingCacheSize of them
+		self.lineDrawingCache = collections.OrderedDict()
+		self.lineDrawingCacheSize = 512
+		#a progressive redraw draws what the view shows and the lines around the
+		#cursor first, shows them, and does the rest from the event loop in
+		#slices of progressiveSliceTime seconds; redrawSteps is the redraw in
+		#progress, see redrawLines
+		self.progressiveRedraw = True
+		self.progressiveSliceTime = 0.02
+		self.redrawSteps = None
+		self.redrawQueued = False
+		self.redrawCursor = None
+		self.redrawStartState = None
+		self.newLineItemCache = {}
+		self.redrawDirtyBlocks = set()
+		self.redrawRect = QtCore.QRectF()
+		self.progressiveTimer = QtCore.QTimer(self)
+		self.progressiveTimer.setSingleShot(True)
+		self.progressiveTimer.timeout.connect(self.continueRedraw)
+		#very long wave commands are laid out without being drawn and their runs
+		#are drawn near the view only, see deferWaves; 0 draws every line whole
+		self.deferWaveTokens = 2048
+		self.deferRunTokens = 256
+		#draws those runs, see drawRun
+		self.runEngine = None
+		self.virtualMargin = 0.5
+		self.virtualViewTimer = QtCore.QTimer(self)
+		self.virtualViewTimer.setSingleShot(True)
+		self.virtualViewTimer.timeout.connect(self.updateVirtualView)
+		for scrollBar in (self.graphicsView.horizontalScrollBar(), self.graphicsView.verticalScrollBar()):
+			scrollBar.valueChanged.connect(self.scheduleVirtualView)
+			scrollBar.rangeChanged.connect(self.scheduleVirtualView)
+		self.globalItems = []
+		self.globalPrimitives = []
+		self.dirtyBlocks = set()
+		self.lineZStep = 1e-6
+		#items taken off the scene are kept here by class, at most itemPoolLimit
+		#of each, and filled in again by the next redraw instead of being deleted
+		#and allocated anew; retiredItems wait in the retired scene
+		self.itemPool = {}
+		for itemClass in (WaveRowItem, QtWidgets.QGraphicsTextItem):
+			self.itemPool[itemClass] = []
+		self.itemPoolLimit = 1 << 16
+		self.retiredItems = []
+
+		#images bigger than exportMaxImageBytes are rendered in tiles of at most
+		#exportTileWidth columns and exportTileBytes, and streamed to the file;
+		#exportStripWidth > 0 writes numbered images that wide instead
+		self.exportMaxImageBytes = 256 << 20
+		self.exportTileBytes = 32 << 20
+		self.exportTileWidth = 4096
+		self.exportStripWidth = 0
+		#tiled and strip exports are drawn and encoded on exportThreads threads
+		self.exportThreads = os.cpu_count() or 1
+		#text items without a font use the application font
+		self.defaultFontFamily = QtGui.QFontInfo(QtGui.QFont()).family()
+		self.defaultFontSize = QtGui.QFont().pointSizeF()
+		self.defaultQFont = QtGui.QFont()
+		self.defaultTextColor = QtWidgets.QGraphicsTextItem().defaultTextColor()
+		self.fontResolution = self.logicalDpiY()
+		self.lineIRCache = collections.OrderedDict()
+		#shared Qt pens, brushes, colors and fonts, by the engine's values for them;
+		#started afresh when the directives change
+		self.stylePool = {}
+		self.stylePoolKey = None
+		self.noQPen = QtGui.QPen(Qt.NoPen)
+		self.noQBrush = QtGui.QBrush(Qt.NoBrush)
+		#(text, font, size, wrapWidth) -> (width, height), and font metrics by (font, size)
+		self.textSizeCache = collections.OrderedDict()
+		self.fontMetricsCache = {}
+
+		#edits are coalesced for redrawQuietPeriod ms and laid out in a worker thread;
+		#0 redraws synchronously on every change
+		self.redrawQuietPeriod = 150
+		self.redrawPending = False
+		#line drawings from the worker by drawWaves1LineCached key, less their items
+		self.preparedLines = {}
+		self.renderGeneration = 0
+		self.renderThread = None
+		self.renderWorker = None
+		self.redrawTimer = QtCore.QTimer(self)
+		self.redrawTimer.setSingleShot(True)
+		self.redrawTimer.timeout.connect(self.startBackgroundRender)
 
 		if os.name == 'nt':
 			import ctypes
@@ -140,16 +1187,12 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 		self.resetParameters()
 		self.resetVariables()
 		
-		self.gapPenColor = "#dddddd"
-		self.gapPen = QtGui.QPen()
-		self.gapPen.setColor(QtGui.QColor(self.gapPenColor))
-		self.gapPen.setWidth(7)
-
 		#these two cannot be in resetVariables
 		self.currentDirName = os.path.dirname(os.path.abspath(__file__))
 		self.currentFileName = 'Untitled.tim'
 
 		self.plainTextEdit.textChanged.connect(self.textChangedHandler)
+		self.plainTextEdit.document().contentsChange.connect(self.contentsChangeHandler)
 		self.shortcutNew = QtWidgets.QShortcut(QtGui.QKeySequence('Ctrl+N'), self)
 		self.shortcutNew.activated.connect(self.fileNew)
 		self.shortcutOpen = QtWidgets.QShortcut(QtGui.QKeySequence('Ctrl+O'), self)
@@ -162,7 +1205,7 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 		self.plainTextEdit.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
 		self.setWindowTitle("Timing Diagrammer - Untitled.tim")
 		#print ("========== sys.argv = ", sys.argv)
-		if len(sys.argv) > 1:
+		if len(sys.argv) > 1 and not sys.argv[1].startswith('--'):
 			fileName = sys.argv[1]
 			self.currentDirName = os.path.dirname(fileName)
 			#print ("DEBUG: currentDirName = ", self.currentDirName)
@@ -172,934 +1215,553 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 				self.fileReadBackend()
 
 	def resetVariables(self):
-		#runtime variables
-		self.currentLineHasArrow = False
-		self.currentLineNumber = 0
-		self.yBasisRegistered = 0
-		self.timeDelta = 0
+		#a redraw in progress would go on from the old state
+		self.abandonRedraw()
+		TimingEngine.resetVariables(self)
+		#editor and mouse state
 		self.editorIsModified = False
-		self.pendingArrowDelay = 0
-		self.clockEvenOddFlip = 0
 		self.directionArrowTailState = 0
 		self.directionArrowTail = None
 		self.discardModalDialogChars = False
-		self.pendingTimeDelta = 0
-		self.currentLineArrowLineList = []
-		self.currentLineArrowPolyList = []
-		self.directionArrowsList = []
-		self.overlayAnnotationList = []
-		self.currentLineOverlayAnnotationQTextList = []
 		self.droppedXCoord = -1
 		self.droppedYCoord = -1
-		self.maxWaveCount = 0
-
-	def resetParameters(self):
-		self.riseClockArrow = False
-		self.fallClockArrow = False
-		self.evenGridsEnabled = True
-		self.oddGridsEnabled = True
-		self.clockArrowSize = 15
-		self.gridPenColor = "#ff0000"
-		self.gridPen = QtGui.QPen(Qt.DotLine)
-		self.gridPen.setColor(QtGui.QColor(self.gridPenColor))
-		self.gridOtherPenColor = "#0000ff"
-		self.gridOtherPen = QtGui.QPen(Qt.DotLine)
-		self.gridOtherPen.setColor(QtGui.QColor(self.gridOtherPenColor))
-
-		self.triPenColor = "olive"
-		self.triPen = QtGui.QPen(Qt.DashLine)
-		self.triPen.setColor(QtGui.QColor(self.triPenColor))
-		self.triPen.setWidth(1)
-
-		self.dirArrowPenColor = "blue"
-		self.dirArrowPen = QtGui.QPen()
-		self.dirArrowPen.setColor(QtGui.QColor(self.dirArrowPenColor))
-
-		self.markerPenColor = "blue"
-		self.markerPen = QtGui.QPen()
-		self.markerPen.setColor(QtGui.QColor(self.markerPenColor))
-
-		self.gapBrushColor = "#aaaaaa"
-		self.gapBrush = QtGui.QBrush(QtGui.QColor(self.gapBrushColor))
-		self.gapBrush.setStyle(Qt.BrushStyle(Qt.SolidPattern))
-
-		self.arrowSize = 9
-		self.waveHalfDuration = 40
-		self.waveTransitionTime = 10
-		self.waveHalfPeriod = self.waveHalfDuration + self.waveTransitionTime
-		self.sigNameColWidth = 50
-		self.sigNameFont = "Sans"
-		self.sigNameFontSize = 12
-		self.signalNameXSpacing = 50
-		self.signalWaveXOffset = 50
-		self.signalWaveYOffset = 150
-		self.xMargin = 30
-		self.yMargin = 50
-		self.waveHeight = 30
-		self.waveHeightChange = 0
-		self.gapHeight = self.waveHeight
-		self.signalWaveYSpacing = self.waveHeight
-		self.arrowVertOffset = -self.waveHeight/2 - self.signalWaveYSpacing
-		self.arrowLineAdjust = self.waveHeight/2
-		self.arrowLineEnds = 10
-		self.fontName = 'Sans'
-		self.fontSize = 10
-
-	def resolvednextC (self, cmd):
-		i = 0
-		last = chr(0)
-		ret = chr(0)
-		for c in cmd:
-			#print ("for c loop - c = ", c)
-			if c in '0123456789|/$':
-				i += 1
-				last = c
-				#print ("c in '0123456789|/$")
-				#print("last assigned to ", c)
-				#print("A. i = ", i)
+
+	def resetStylePool(self, directiveKey):
+		if directiveKey != self.stylePoolKey:
+			self.stylePool = {}
+			self.stylePoolKey = directiveKey
+
+	def addPrimitives(self, primitives):
+		#the QGraphicsScene backend for the engine's primitives: one self-painting
+		#item per row and z; text stays items of its own, on top of the row items
+		#of its z, and anchors only count for the scene rect
+		rows = {}
+		singles = []
+		for primitive in primitives:
+			kind = primitive[0]
+			if kind == 'anchor':
 				continue
-		
-			#print("last is seen to be ", last)
-			if last == '$':
-				last = chr(0)
-				#print("B. i = ", i)
-				if i < len(cmd) - 1:
-					ret = cmd[i+1:i+2]
-					if ret not in '0123456789|/$':
-						#print ("B. ret = ", ret)
-						break
-			else:
-				ret = c
-				break
-			i += 1
-		return ret
-
-	def drawGrid (self, x0, yBasis, waveCount):
-		if self.maxWaveCount == 0:
-			#draw the grid
-			if (self.evenGridsEnabled == True and (waveCount % 2) == self.clockEvenOddFlip):
-				self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2 + self.waveHeightChange/2, 
-					x0 + self.waveHalfDuration, yBasis), self.gridOtherPen)
-			elif (self.oddGridsEnabled == True and (waveCount % 2) != self.clockEvenOddFlip):
-				self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-					x0 + self.waveHalfDuration, yBasis), self.gridPen)
-
-	def tdDrawArrowHeadAngle(self, startPoint = (100, 100), direction = (0, 1), size = 9, color = "black"):
-		#direction is an angle specified as (height, base) tuple
-		#where height/base = tan(angle)
-		deg2rad = 3.141592653/180
-		height, base = direction
-		if base == 0:
-			theta = -height * 1.5707963267949
+			if kind == 'text':
+				singles.append(primitive)
+				continue
+			row = rows.get(primitive[1])
+			if row is None:
+				row = self.takeRowItem()
+				rows[primitive[1]] = row
+			row.addPrimitive(primitive)
+		items = []
+		for (z, row) in rows.items():
+			row.setZValue(z)
+			self.graphicsScene.addItem(row)
+			items.append(row)
+		for primitive in singles:
+			items.append(self.addPrimitive(primitive))
+		return items
+
+	def addPrimitive(self, primitive):
+		#a text item; every property is set, since the item may come from the pool
+		(text, x, y, font, size, color, wrapWidth) = primitive[2:]
+		item = self.takeItem(QtWidgets.QGraphicsTextItem)
+		if font is None:
+			item.setFont(self.defaultQFont)
 		else:
-			theta = -math.atan2(height, base)
-		x, y = startPoint
-		pointList = [QtCore.QPointF(x, y),
-						QtCore.QPointF(x + size * math.cos(160*deg2rad + theta), 
-							y + size * math.sin(160*deg2rad + theta)),
-						QtCore.QPointF(x + 3 * size * math.cos(180*deg2rad + theta)/5, 
-							y + 3 * size * math.sin(180*deg2rad + theta)/5),
-						QtCore.QPointF(x + size * math.cos(200*deg2rad + theta), 
-							y + size * math.sin(200*deg2rad + theta)),
-							QtCore.QPointF(x, y)]
-
-		### startPoint,  direction = (0, 1), size = 9
-		p = self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-		p.setZValue(1)
-
-	def tdDrawArrowHead(self, startPoint, direction='L'):
-		x, y = startPoint
-		yArrowSize = xArrowSize = self.arrowSize
-		if direction == 'R':
-			yArrowSize = -yArrowSize
-			xArrowSize = -xArrowSize
-
-		pointList = [QtCore.QPointF(x, y),
-						QtCore.QPointF(x + xArrowSize, y - yArrowSize/2),
-						QtCore.QPointF(x + xArrowSize*3/4, y),
-						QtCore.QPointF(x + xArrowSize, y + yArrowSize/2),
-						QtCore.QPointF(x, y)]
-
-		p = self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("black")))
-		self.currentLineArrowPolyList.append(p)
-		p.setZValue(1)
-					
-	def parseFVData(self, annotSpec):
-		leftBrktPos = annotSpec.find('[')
-		rightBrktPos = annotSpec.find(']')
-		if rightBrktPos == -1:
-			spec = annotSpec[leftBrktPos + 1:]
+			item.setFont(self.qtFont(font, size))
+		item.setPlainText(text)
+		if color is None:
+			item.setDefaultTextColor(self.defaultTextColor)
 		else:
-			spec = annotSpec[leftBrktPos + 1: rightBrktPos]
-
-		delay = 0
-		width = -1
-		color = 'black'
-		font = self.fontName
-		size = self.fontSize
-		vert = 0
-		arrow = 0
-		center = True
-
-		if spec == '':
-			return (delay,
-					width,
-					color,
-					font,
-					size,
-			        vert,
-			        arrow,
-					center)
-
-		spec = spec.replace('  ', ' ')
-		spec = spec.replace(' =', '=')
-		for fvPair in spec.split(' '):
-			#print ("parseFVData: fvPair is ", fvPair)
-			if fvPair == '':
+			item.setDefaultTextColor(self.qtColor(color))
+		item.setTextWidth(wrapWidth)
+		item.setPos(x, y)
+		item.setZValue(primitive[1])
+		self.graphicsScene.addItem(item)
+		return item
+
+	def takeItem(self, itemClass):
+		pool = self.itemPool[itemClass]
+		if pool != []:
+			return pool.pop()
+		return itemClass()
+
+	def takeRowItem(self):
+		pool = self.itemPool[WaveRowItem]
+		if pool != []:
+			row = pool.pop()
+			row.reset()
+			return row
+		return WaveRowItem(self)
+
+	def primitivesRect(self, primitives):
+		return self.extentRect(self.primitivesExtent(primitives))
+
+	def extentRect(self, extent):
+		if extent is None:
+			return QtCore.QRectF()
+		return QtCore.QRectF(QtCore.QPointF(extent[0], extent[1]), QtCore.QPointF(extent[2], extent[3]))
+
+	def unitedExtent(self, extents):
+		united = None
+		for extent in extents:
+			if extent is None:
 				continue
-			fvPair = fvPair.replace(' ', '')
-			fvPair = fvPair.split('=')
-			if len(fvPair) < 2:
+			if united is None:
+				united = extent
+			else:
+				united = (min(united[0], extent[0]), min(united[1], extent[1]),
+					max(united[2], extent[2]), max(united[3], extent[3]))
+		return united
+
+	def drawRun(self, wave, index):
+		#the primitives of a run of a deferred wave, drawn by an engine of its own
+		#from the state the wave was laid out in; they are not kept
+		if self.runEngine is None:
+			self.runEngine = LayoutEngine()
+		return self.runEngine.drawDeferredRun(wave, index)
+
+	def linePrimitives(self, entry):
+		#all the primitives of a drawn line, its deferred waves drawn in
+		primitives = entry['primitives']
+		for wave in reversed(entry['waves']):
+			runs = []
+			for index in range(0, len(wave['runs'])):
+				runs.extend(self.drawRun(wave, index))
+			primitives = primitives[:wave['at']] + runs + primitives[wave['at']:]
+		return primitives
+
+	def showVirtualRegion(self, region, keepRegion):
+		#make the items of the chunks that reach into region, everything if it is
+		#None, and drop those of the chunks outside keepRegion, none if it is None
+		for entry in list(self.lineItemCache.values()) + list(self.newLineItemCache.values()):
+			chunks = entry['chunks']
+			if chunks is None:
 				continue
-			field = fvPair[0]
-			value = fvPair[1]
-		
-			if field == "delay":
-				try:
-					delay = int(value)
-				except:
-					delay = 0
-			elif field == "width":
-				try:
-					width = int(value)
-				except:
-					width = -1
-			elif field == "color":
-				if value in textColorMap:
-					color = textColorMap[value]
-				else:
-					color = 'black'
-			elif field == "font":
-				if value in fontMap:
-					font = fontMap[value]
-				else:
-					font = self.fontName
-			elif field == "center":
-				center = value in "yY"
-			elif field == "size":
-				try:
-					size = int(value)
-					if size < 6:
-						size = 6
-				except:
-					size = self.fontSize
-			elif field == "vert":
-				try:
-					vert = int(value)
-				except:
-					vert = 0
-			elif field == "arrow":
-				try:
-					arrow = int(value)
-				except:
-					arrow = 0
-
-		return (delay,
-				width,
-				color,
-				font,
-				size,
-		        vert,
-		        arrow,
-				center)
-
-	def getFVData(self, annotSpecCmd):
-		#print ("getFVData: annotSpecCmd = ", annotSpecCmd)
-		attributeMapList = []
-		if annotSpecCmd == '':
-			#print ("getFVData: null cmd4")
-			return attributeMapList
-		for step in annotSpecCmd.split(','):
-			#print ("step is ", step)
-			attributeMap = {}
-			attributeMap['delay'] = 0
-			attributeMap['width'] = -1
-			attributeMap['color'] = 'black'
-			attributeMap['font'] = self.fontName
-			attributeMap['size'] = self.fontSize
-			attributeMap['vert'] = 0
-			attributeMap['arrow'] = 0
-			attributeMap['center'] = True
-			if step == '':
-				attributeMapList.append(attributeMap)
+			chunkItems = entry['chunkItems']
+			if chunkItems == {} and region is not None and not entry['rect'].intersects(region):
 				continue
-			step = step.replace('  ', ' ')
-			step = step.replace(' =', '=')
-			#print ("after adj, step is ", step)
-			for fvPair in step.split(' '):
-				if fvPair == '':
-					continue
-				fvPair = fvPair.replace(' ', '')
-				fvPair = fvPair.split('=')
-				if len(fvPair) < 2:
-					continue
-				field = fvPair[0]
-				value = fvPair[1]
-				#print ("fvPair is ", fvPair)
-		
-				if field == "delay":
-					try:
-						value = int(value)
-					except:
-						value = 0
-					attributeMap['delay'] = int(value)
-				elif field == "width":
-					try:
-						value = int(value)
-					except:
-						value = -1
-					attributeMap['width'] = int(value)
-				elif field == "color":
-					if value in textColorMap:
-						value = textColorMap[value]
-					else:
-						color = 'black'
-					attributeMap['color'] = value
-				elif field == "font":
-					if value in fontMap:
-						attributeMap['font'] = fontMap[value]
-					else:
-						attributeMap['font'] = self.fontName
-				elif field == "center":
-					if value in "yY":
-						attributeMap['center'] = True
-					else:
-						attributeMap['center'] = False
-				elif field == "size":
-					try:
-						value = int(value)
-						if value < 6:
-							value = 6
-						#print ("appended fontSize = ", value)
-					except:
-						value = self.fontSize
-						#print ("appended width = 0 default",)
-					attributeMap['size'] = int(value)
-				elif field == "vert":
-					try:
-						value = int(value)
-					except:
-						value = 0
-					attributeMap['vert'] = value
-					#print ("appended vert = ", value)
-				elif field == "arrow":
-					try:
-						value = int(value)
-					except:
-						value = 0
-					attributeMap['arrow'] = value
-					#print ("appended arrow = ", value)
-
-			attributeMapList.append(attributeMap)
-	
-		#print ("===============================")
-		#print ("len attributeMapList = ", len(attributeMapList))
-	
-		return attributeMapList
-
-	def doAnnotationCmd (self, cmd, annotSpecCmd, updateViewPort = False, charPosWithinCmd = -1):
-		attributeMapList = self.getFVData(annotSpecCmd.strip())
-		annotNum = 0
-		#print ("doAnnotationCmd: cmd = ", cmd)
-		#count number of commas in cmd before charPosWithinCmd
-		waveNum = -1
-		if charPosWithinCmd > 0:
-			waveNum = cmd[:charPosWithinCmd].count(',')
-
-		for annot in cmd.split(','):
-			annot = annot.replace(chr(1), '#')
-			annot = annot.replace(chr(2), ';')
-			annot = annot.replace(chr(6), ',')
-			#print ("doAnnotationCmd: annot = ", annot, " -- annotNum = ", annotNum)
-			if len(attributeMapList) > annotNum:
-				delay = attributeMapList[annotNum]['delay']
-				width = attributeMapList[annotNum]['width']
-				color = attributeMapList[annotNum]['color']
-				font = attributeMapList[annotNum]['font']
-				size = attributeMapList[annotNum]['size']
-				vert = attributeMapList[annotNum]['vert']
-				arrow = attributeMapList[annotNum]['arrow']
-				center = attributeMapList[annotNum]['center']
-			else:
-				delay = 0
-				width = -1
-				color = 'black'
-				font = self.fontName
-				size = self.fontSize
-				vert = 0
-				arrow = 0
-				center = True
-
-			#print ("@@@ len of self.currentLineArrowPolyList = ", len(self.currentLineArrowPolyList))
-			if annotNum == 0 and arrow != 0:
-				for l in self.currentLineArrowLineList:
-					l.setLine(l.line().x1(), l.line().y1() - arrow, l.line().x2(), l.line().y2() - arrow)
-					l.setZValue(1)
-				for p in self.currentLineArrowPolyList:
-					#print ("@@@@@ polygon = ", p, " arrow = ", arrow)
-					poly = p.polygon()
-					poly.translate(0, -arrow)
-					self.graphicsScene.removeItem(p)
-					p = self.graphicsScene.addPolygon(poly, QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("black")))
-					p.setZValue(1)
-
-			#print ("@@@@#####@@@@ delay = ", delay, " width = ", width, " color = ", color, " vert = ", vert, " arrow = ", arrow, " -- annot is ", annot)
-			if annot != '':
-				brktPos = annot.find('[')
-				if brktPos > 0:
-					#print ("doAnnotationCmd: brktPos > 0 for annot = ", annot)
-					(delay, 
-					width, 
-					color, 
-					font, 
-					size,
-					vert, 
-					arrow,
-					center) = self.parseFVData(annot[brktPos:])
-
-					#print (delay, 
-					#	width, 
-					#	color, 
-					#	font, 
-					#	size,
-					#	vert, 
-					#	arrow,
-					#	center)
-
-					annot = annot[:brktPos]
-
-			if annot != '':
-				annot = annot.replace(chr(3), '[')
-				updateViewPortLocal = updateViewPort and (annotNum == waveNum or annotNum == waveNum + 1)
-				#print ("annotNum = ", annotNum, " waveNum = ", waveNum, " annot = ", annot)
-				if self.currentLineHasArrow == True:
-					self.putText(annot, self.sigNameColWidth + 
-						self.signalWaveXOffset + 
-						delay +
-						self.waveHalfPeriod * annotNum + (self.waveHalfPeriod/2 if center == True else 0),
-						self.yBasisRegistered + self.arrowVertOffset - 1 - vert,
-						center, font, size, color, width, True, updateViewPortLocal)
-				else:
-					self.putText(annot, self.sigNameColWidth + 
-						self.signalWaveXOffset + 
-						delay +
-						self.waveHalfPeriod * annotNum + (self.waveHalfPeriod/2 if center == True else 0),
-						self.signalWaveYOffset +
-							(self.currentLineNumber - self.linesWithArrow) * (self.waveHeight + self.signalWaveYSpacing) + 
-							self.linesWithArrow * self.arrowLineAdjust - self.waveHeight/2 - vert, 
-						center, font, size, color, width, False, updateViewPortLocal)
-			annotNum += 1
-
-	def processCommand (self, cmd, line, cmdNum, cmd4, whichCommandHasCursor = 0, charPosWithinCmd = -1):
-		#print ("DEBUG ZZ cmd is ", cmd, "line value passed is ", line, "cmdNum = ", cmdNum)
-		#if whichCommandHasCursor != 0:
-			#print ("processCommand: cmdNum = ", cmdNum, "cmd = ", cmd, "whichCommandHasCursor = ", whichCommandHasCursor, " --- cursorIsOnThisLine = ", cursorIsOnThisLine)
-		if cmdNum == 1:
-			#process signal name
-			#simplifies parsing multi-char tokens
-			cmd = cmd.replace(chr(1), '#')
-			cmd = cmd.replace(chr(2), ';')
-			cmd = cmd.replace(chr(6), ',')
-			self.tdDrawSigNamesText(cmd, whichCommandHasCursor == 1)
-		elif cmdNum == 2:
-			xCurrent = 0
-			yCurrent = 0
-			#process waves
-			self.currentLineArrowLineList = []
-			self.currentLineHasArrow = False
-			if cmd.find('<') >= 0 or cmd.find('-') >= 0 or cmd.find('>') >= 0:
-				self.currentLineHasArrow = True
-			self.riseClockArrow = False
-			self.fallClockArrow = False
-			waveCount = 0
-			self.invertedClockHeight = 0
-			self.currentColor = 'w'
-			cNum = 0
-			cmd = cmd.strip()
-			lastC = chr(0)
-			lLastC = chr(0)
-			#print ("-- seeing cmd = ", cmd, " linesWithArrow = ", self.linesWithArrow)
-			#print ("------------------------------")
-			for thisC in cmd:
-				#print ("processCmd-mainloop: charPosWithinCmd=", charPosWithinCmd, " cNum=", cNum, " waveCount = ", waveCount)
-				#print ("processCmd-mainloop: thisC=", thisC, " ord(lastC) ... lastC=", ord(lastC), lastC)
-				if lastC == '$':
-					#print ("processCmd-mainloop: lastC was $")
-					cNum += 1
-					#if thisC != 'x':
-					self.currentColor = thisC
-					#else:
-					#	#illegal color 'x', set to 'white'
-					#	self.currentColor = 'w'
-					if thisC not in colorMap.keys():
-						self.label.setText("Error: Wrong color code: " + thisC + ".")
-						
-					#print ("self.currentColor == ", self.currentColor)
-					lastC = lLastC #restore from stored variable with value previous to $
-					lLastC = chr(0)
-					continue
+			changed = False
+			for index in range(0, len(chunks)):
+				(rect, wave, run, stacking) = chunks[index]
+				items = chunkItems.get(index)
+				if items is None:
+					if region is None or rect.intersects(region):
+						items = self.addPrimitives(self.drawRun(wave, run))
+						self.stackLineItems(items, stacking)
+						chunkItems[index] = items
+						changed = True
+				elif keepRegion is not None and not rect.intersects(keepRegion):
+					self.removeItems(items)
+					del chunkItems[index]
+					changed = True
+			if changed == True:
+				entry['items'] = entry['lineItems'] + [item for index in sorted(chunkItems) for item in chunkItems[index]]
+
+	def dropVirtualItems(self, entry):
+		if entry['chunks'] is not None:
+			for items in entry['chunkItems'].values():
+				self.removeItems(items)
+			entry['items'] = list(entry['lineItems'])
+			entry['chunkItems'] = {}
+
+	def updateNameColumn(self):
+		#the column runs from the left of the scene to just past the line
+		#that separates the names from the waves, and the view shows the rest;
+		#both edges are whole pixels, so that the two map the scene as the view
+		#alone would
+		rect = self.graphicsScene.sceneRect()
+		left = int(rect.left())
+		right = int(self.signalWaveXOffset + self.sigNameColWidth) + 1
+		if self.frozenNameColumn == False or rect.isEmpty() or left >= right or rect.right() <= right:
+			self.graphicsView.setSceneRect(QtCore.QRectF())
+			self.nameColumn.setColumn(QtCore.QRectF())
+		else:
+			self.graphicsView.setSceneRect(QtCore.QRectF(right, rect.top(), rect.right() - right, rect.height()))
+			top = int(rect.top())
+			self.nameColumn.setColumn(QtCore.QRectF(left, top, right - left, rect.bottom() - top))
+		self.placeNameColumn()
+
+	def placeNameColumn(self):
+		column = self.nameColumn.sceneColumn
+		if column.isEmpty():
+			self.graphicsView.setViewportMargins(0, 0, 0, 0)
+			self.nameColumn.hide()
+			return
+		width = int(column.width() * self.zoomFactor + 0.5)
+		self.graphicsView.setViewportMargins(width, 0, 0, 0)
+		frame = self.graphicsView.frameWidth()
+		self.nameColumn.setGeometry(frame, frame, width, self.graphicsView.viewport().height())
+		self.nameColumn.invalidate()
+		self.nameColumn.show()
+
+	def scheduleMinimap(self):
+		if self.minimap.isVisible():
+			self.minimapTimer.start(self.minimapQuietPeriod)
+
+	def startMinimap(self):
+		#the lines are only all in lineItemCache once a redraw is done
+		if self.bulkBuildDepth > 0 or self.redrawSteps is not None:
+			self.scheduleMinimap()
+			return
+		rect = self.graphicsScene.sceneRect()
+		columns = self.minimap.width()
+		rows = self.minimap.height()
+		self.minimapGeneration += 1
+		if self.splashItem is not None or rect.isEmpty() or columns <= 0 or rows <= 0:
+			self.minimap.setImage(None, QtCore.QRectF())
+			return
+		if self.minimapThread is None:
+			self.minimapThread = QtCore.QThread(self)
+			self.minimapWorker = MinimapWorker()
+			self.minimapWorker.moveToThread(self.minimapThread)
+			self.minimapRequested.connect(self.minimapWorker.draw)
+			self.minimapWorker.drawn.connect(self.minimapDrawn)
+			self.minimapThread.start()
+		#the lines that take up rows of the diagram, in order, as (key, primitives,
+		#deferred waves, top, bottom); the worker is only handed the primitive lists
+		#the lines already keep
+		if self.incrementalRedraw == True:
+			entries = sorted([(entry['ordinal'], key, entry) for (key, entry) in self.lineItemCache.items()
+				if entry['lineCount'] > 0], key = lambda item: item[0])
+			lines = [(key, entry['primitives'], entry['waves']) + entry['band'] for (ordinal, key, entry) in entries]
+		else:
+			#a full redraw keeps the primitives of the whole document, cut up by
+			#line; they get no key, as the worker cannot tell them from the last ones
+			starts = self.documentLineStarts
+			lines = [(None, self.globalPrimitives[starts[i]:starts[i + 1]], []) + self.documentLineBands[i]
+				for i in range(0, len(starts) - 1) if starts[i + 1] > starts[i]]
+		#when they are more than fit minimapRowPixels high, every so many is shown
+		step = max(1, math.ceil(len(lines) * self.minimapRowPixels / rows))
+		lines = lines[::step]
+		self.minimapWorker.latestGeneration = self.minimapGeneration
+		self.minimapRequested.emit(self.minimapGeneration, lines,
+			(rect.x(), rect.y(), rect.width(), rect.height()), (columns, rows))
+
+	def minimapDrawn(self, generation, image, layout):
+		if generation == self.minimapGeneration:
+			(rect, rowCenters) = layout
+			self.minimap.setImage(image, QtCore.QRectF(*rect), rowCenters)
+
+	def minimapViewChanged(self, *args):
+		#only the frame around what the view shows moves
+		self.minimap.update()
+
+	def scheduleVirtualView(self, *args):
+		self.virtualViewTimer.start(0)
+
+	def updateVirtualView(self):
+		#the view with virtualMargin of its size to spare on every side; what is
+		#more than twice that far away is dropped
+		if self.bulkBuildDepth > 0:
+			return
+		view = self.graphicsView.mapToScene(self.graphicsView.viewport().rect()).boundingRect()
+		dx = view.width() * self.virtualMargin
+		dy = view.height() * self.virtualMargin
+		self.showVirtualRegion(view.adjusted(-dx, -dy, dx, dy), view.adjusted(-2*dx, -2*dy, 2*dx, 2*dy))
+
+	def applyViewRequests(self):
+		if self.errorMessage != '':
+			self.label.setText(self.errorMessage)
+			self.errorMessage = ''
+		if self.centerOnRequest is not None:
+			self.centerView(self.centerOnRequest[0], self.centerOnRequest[1])
+			self.centerOnRequest = None
+
+	def centerView(self, x, y):
+		if self.bulkBuildDepth > 0:
+			#only the last request of a build counts
+			self.deferredCenterOn = (x, y)
+		else:
+			self.graphicsView.centerOn(x, y)
+
+	def beginBulkBuild(self, fromScratch = True):
+		self.bulkBuildDepth += 1
+		if self.bulkBuildDepth == 1:
+			self.bulkBuildFromScratch = fromScratch
+			if fromScratch == True and self.swapScenes == True:
+				#the view keeps showing the old scene until the new one is complete
+				self.shownScene = self.graphicsScene
+				self.shownItems = self.drawnItems()
+				self.graphicsScene = self.takeSpareScene()
+				self.splashItem = None
+				self.directionArrowTail = None
+				self.lineItemCache = {}
+				self.globalItems = []
+			if fromScratch == True:
+				#an index that is kept is updated item by item, a dropped one is
+				#rebuilt once, the next time it is asked for
+				self.graphicsScene.setItemIndexMethod(QGraphicsScene.NoIndex)
+			self.graphicsView.setUpdatesEnabled(False)
+
+	def endBulkBuild(self):
+		self.bulkBuildDepth -= 1
+		if self.bulkBuildDepth == 0:
+			if self.bulkBuildFromScratch == True:
+				self.graphicsScene.setItemIndexMethod(self.sceneIndexMethod)
+			if self.shownScene is not None:
+				hValue = self.graphicsView.horizontalScrollBar().value()
+				vValue = self.graphicsView.verticalScrollBar().value()
+				self.graphicsView.setScene(self.graphicsScene)
+				self.graphicsView.horizontalScrollBar().setValue(hValue)
+				self.graphicsView.verticalScrollBar().setValue(vValue)
+				self.retireScene(self.shownScene, self.shownItems)
+				self.shownScene = None
+				self.shownItems = []
+			self.graphicsView.setUpdatesEnabled(True)
+			if self.deferredCenterOn is not None:
+				self.graphicsView.centerOn(self.deferredCenterOn[0], self.deferredCenterOn[1])
+				self.deferredCenterOn = None
+
+	def newScene(self):
+		scene = QGraphicsScene(self)
+		scene.setBackgroundBrush(Qt.white)
+		return scene
+
+	def takeSpareScene(self):
+		if self.spareScene is None and self.retiredScene is not None:
+			#no idle time since the last swap
+			self.tearDownRetiredScene()
+		scene = self.spareScene
+		self.spareScene = None
+		if scene is None:
+			scene = self.newScene()
+		return scene
+
+	def retireScene(self, scene, items):
+		if self.retiredScene is not None:
+			self.tearDownRetiredScene()
+		self.retiredScene = scene
+		self.retiredItems = items
+		self.sceneTeardownTimer.start(0)
+
+	def tearDownRetiredScene(self):
+		self.sceneTeardownTimer.stop()
+		scene = self.retiredScene
+		if scene is None:
+			return
+		self.retiredScene = None
+		#no index to keep up to date while the items are taken off
+		scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+		self.removeItems(self.retiredItems)
+		self.retiredItems = []
+		scene.clear()
+		scene.setItemIndexMethod(self.sceneIndexMethod)
+		#a null rect makes the scene follow its items again
+		scene.setSceneRect(QtCore.QRectF())
+		if self.spareScene is None:
+			self.spareScene = scene
+		else:
+			scene.deleteLater()
 
-				if thisC == '$':
-					#print ("processCmd-mainloop: thisC is $")
-					cNum += 1
-					lLastC = lastC #store thisC previous to $
-					lastC = '$'
-					continue
-				
-				if cNum < len(cmd) - 1: 
-					nextC = self.resolvednextC(cmd[cNum + 1:])
-				else:
-					nextC = chr(0)
-				#print ("processCmd-mainloop: thisC == ", thisC)
-				#print ("processCmd-mainloop: nextC == ", nextC)
-				
-				xBasis = self.signalWaveXOffset + self.sigNameColWidth + self.waveHalfPeriod * waveCount
-				yBasis = self.signalWaveYOffset + (self.currentLineNumber - self.linesWithArrow) *\
-					(self.waveHeight + self.signalWaveYSpacing) + self.linesWithArrow * self.arrowLineAdjust
-				self.yBasisRegistered = yBasis
-
-				#print ("processCommand: A. thisC = ", thisC, " lastC = ", lastC, " pendingTimeDelta = ", self.pendingTimeDelta)
-				if thisC not in "DXz0123456789/<->|+dx" or (thisC in "dx" and lastC not in "RFDXz"): 
-					#for meta chars, don't reset since following chars will decide
-					#for DXz, pendingTimeDelta will be used and pendingTimeDelta will be assigned from timeDelta at end of function
-					#for dx, pendingTimeDelta will be used only if the last char was R or F 
-					#and pendingTimeDelta will be set to 0 at the end of the function
-					self.pendingTimeDelta = 0
-					#print ("B. thisC = ", thisC, " self.pendingTimeDelta reset to ", self.pendingTimeDelta)
-				#print ("processCommand: B. thisC = ", thisC, " lastC = ", lastC, " pendingTimeDelta = ", self.pendingTimeDelta)
-
-				if thisC == '|':
-					if waveCount > 0 or self.timeDelta > 0:
-						if self.currentColor in textColorMap:
-							self.markerPen.setColor(QtGui.QColor(textColorMap[self.currentColor]))
-						else:
-							self.markerPen.setColor(QtGui.QColor(self.markerPenColor))
-						#x0 = xBasis
-						#x0 = xBasis + self.waveHalfPeriod + self.timeDelta
-						x0 = xBasis + self.timeDelta
-						if waveCount != 0:
-							x0 -= self.waveTransitionTime/2
-						#print ("saw | -- X = ", x0, " -- waveCount = ", waveCount, " -- xBasis = ", xBasis, " -- self.timeDelta", self.timeDelta)
-						l = self.graphicsScene.addLine(QtCore.QLineF(x0,
-							yBasis - self.waveHeight - self.waveHeight,
-							x0,
-							yBasis + self.waveHeight/4), self.markerPen)
-						l.setZValue(3) #topmost
-					self.timeDelta = 0
-				elif thisC in 'PpCcKkQq': #clock pulses
-					#print ("processCommand: thisC = ", thisC, " ord (nextC) = ", ord(nextC))
-					if thisC == "Q":
-						self.riseClockArrow = True
-						self.fallClockArrow = True
-						self.tdDrawClock(waveCount, lastC, 'P', 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
-					elif thisC == "q":
-						self.riseClockArrow = True
-						self.fallClockArrow = True
-						self.tdDrawClock(waveCount, lastC, 'p', 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
-					elif thisC == "K":
-						self.riseClockArrow = False
-						self.fallClockArrow = True
-						self.tdDrawClock(waveCount, lastC, 'P', 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
-					elif thisC == "k":
-						self.riseClockArrow = False
-						self.fallClockArrow = True
-						self.tdDrawClock(waveCount, lastC, 'p', 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
-					elif thisC == "C":
-						self.riseClockArrow = True
-						self.fallClockArrow = False
-						self.tdDrawClock(waveCount, lastC, 'P', 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
-					elif thisC == "c":
-						self.riseClockArrow = True
-						self.fallClockArrow = False
-						self.tdDrawClock(waveCount, lastC, 'p', 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
-					else:
-						self.riseClockArrow = False
-						self.fallClockArrow = False
-						self.tdDrawClock(waveCount, lastC, thisC, 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
-					waveCount += 2
-					self.timeDelta = 0
-				elif thisC in 'rR': 
-					self.tdDrawRise(waveCount, thisC, nextC, (xBasis, yBasis))
-					waveCount += 1
-					self.timeDelta = 0
-				elif thisC in 'fF':
-					self.tdDrawFall(waveCount, thisC, nextC, (xBasis, yBasis))
-					waveCount += 1
-					self.timeDelta = 0
-				elif thisC in 'DX':
-					self.tdDrawDataDX(waveCount, lastC, thisC, nextC, (xBasis, yBasis))
-					waveCount += 1
-					self.timeDelta = 0
-				elif thisC in 'dx': #lower case
-					self.tdDrawDatadx(waveCount, lastC, thisC, nextC, (xBasis, yBasis))
-					waveCount += 1
-					self.timeDelta = 0
-				elif thisC == 'l': #lower case
-					self.tdDrawLow(waveCount, nextC, lastC, (xBasis, yBasis))
-					waveCount += 1
-					self.timeDelta = 0
-				elif thisC == 'h': #lower case
-					self.tdDrawHigh(waveCount, nextC, (xBasis, yBasis))
-					waveCount += 1
-					self.timeDelta = 0
-				elif thisC == 'z': #lower case
-					self.tdDrawTri(waveCount, nextC, (xBasis, yBasis))
-					waveCount += 1
-					self.timeDelta = 0
-				elif thisC == 'S':
-					#char to draw the grid lines, but does not advance waveCount
-					#does not add space
-					self.tdDrawSpace(waveCount, cmd, (xBasis, yBasis))
-					self.timeDelta = 0
-				elif thisC == 's':
-					self.tdDrawSpace(waveCount, cmd, (xBasis, yBasis))
-					waveCount += 1
-					self.timeDelta = 0
-				elif thisC == '<' or thisC == '>' or thisC == '-':
-					self.tdDrawHorizArrow(waveCount, thisC, nextC, (xBasis, yBasis))
-					if thisC != '>':
-						waveCount += 1
-					self.timeDelta = 0
-				elif thisC in "0123456789":
-					#print (" -- additional delay = ", self.timeDelta)
-					#a number follows a command for additional delay
-					if thisC == '0' and nextC in "|<->":
-						self.timeDelta = 10 * self.waveHalfDuration / 9
-					else:
-						self.timeDelta = int(thisC) * self.waveHalfDuration / 9
-					#print (" -- additional delay set to = ", self.timeDelta)
-				elif thisC == '/':
-					self.tdDrawGap(waveCount, lastC, nextC, (xBasis, yBasis))
-				else:
-					#print ("Error: Wrong code: " + thisC + ".")
-					self.label.setText("Error: Wrong code: " + thisC + ".")
-
-				# vertical line on the signal name
-				self.graphicsScene.addLine(QtCore.QLineF(self.signalWaveXOffset + self.sigNameColWidth, 
-					yBasis - self.signalWaveYSpacing - self.waveHeight, 
-					self.signalWaveXOffset + self.sigNameColWidth, 
-					yBasis + self.waveHeight))
-				
-				if thisC not in '0123456789/|':
-					#print ("char is NOT FWDSLASH -- thisC = ", thisC)
-					lastC = thisC
-
-				if whichCommandHasCursor == 2:
-					if charPosWithinCmd == cNum or charPosWithinCmd == cNum + 1:
-						xCurrent = xBasis
-						yCurrent = yBasis
-						#print ("==== snapshot xCurrent = ", xCurrent, "==== snapshot yCurrent = ", yCurrent)
-				cNum += 1
-
-			#for
-			if whichCommandHasCursor == 2 and xCurrent > 0:
-				#print ("processCommand: yCurrent = ", yCurrent, " self.currentLineNumber = ", self.currentLineNumber)
-				self.graphicsView.centerOn(xCurrent, yCurrent) 
-
-			#print ("-- cmdNum is 2 -- A seeing cmd = ", cmd, " self.currentLineHasArrow = ", self.currentLineHasArrow)
-			if self.currentLineHasArrow == True:
-				self.linesWithArrow += 1
-
-			#anchor/
-			xCurrent = self.signalWaveXOffset + self.sigNameColWidth + self.waveHalfPeriod * waveCount
-			yCurrent = self.signalWaveYOffset + (self.currentLineNumber - self.linesWithArrow) *\
-				(self.waveHeight + self.signalWaveYSpacing) + self.linesWithArrow * self.arrowLineAdjust
-			self.graphicsScene.addLine(QtCore.QLineF(xCurrent + self.waveHalfPeriod + self.xMargin, 
-								yCurrent + self.waveHeight + self.yMargin,  
-								xCurrent + self.waveHalfPeriod + self.xMargin + 1, 
-								yCurrent + self.waveHeight + self.yMargin + 1), 
-								QtGui.QPen(Qt.transparent)) 
-				
-			self.timeDelta = 0
-
-		elif cmdNum == 3:
-			cmd = cmd.replace('\[', chr(3))
-			#print ("-- B seeing cmd = ", cmd, "-- seeing cmd4 = ", cmd4, " self.currentLineHasArrow = ", self.currentLineHasArrow)
-			self.doAnnotationCmd (cmd, cmd4, whichCommandHasCursor == 3, charPosWithinCmd)
-			#print ("-- B self.linesWithArrow = ", self.linesWithArrow)
-		#print ("==============================================================================================")
-
-	def processDirective (self, data):
-		#print ("processDirective: data is ", data)
-		directiveList = data.strip().split(' ')
-		#print ("processDirective: directiveList[] is ", directiveList)
-		if directiveList[0] == "grid":
-			#print ("----show grid directive found")
-			if len(directiveList) > 1:
-				if directiveList[1] == "off" or directiveList[1] == "none":
-					self.evenGridsEnabled = False
-					self.oddGridsEnabled = False
-				elif directiveList[1] == "both":
-					self.evenGridsEnabled = True
-					self.oddGridsEnabled = True
-				elif directiveList[1] == "odd":
-					self.evenGridsEnabled = False
-					self.oddGridsEnabled = True
-				elif directiveList[1] == "even":
-					self.evenGridsEnabled = True
-					self.oddGridsEnabled = False
-				else:
-					try:
-						self.maxWaveCount = int(directiveList[1])
-					except:
-						self.maxWaveCount = 0
-		elif directiveList[0] == "margin":
-			#print ("----show grid directive found")
-			if len(directiveList) > 2:
-				try:
-					val2 = int(directiveList[2])
-				except:
-					val2 = 0
-				if directiveList[1] == "top":
-					if val2 < 50 or val2 > 300:
-						val2 = 150
-					self.signalWaveYOffset = val2
-				elif directiveList[1] == "signal":
-					if val2 < 46 or val2 > 100:
-						val2 = 50
-					self.signalWaveXOffset = val2
-				elif directiveList[1] == "side":
-					if val2 < 20 or val2 > 100:
-						val2 = 30
-					self.xMargin = val2
-				elif directiveList[1] == "bottom":
-					if val2 < 20 or val2 > 200:
-						val2 = 50
-					self.yMargin = val2
-		elif directiveList[0] == "color":
-			if len(directiveList) > 1:
-				if directiveList[1] == "dirarr":
-					#print ("----color debug directive found")
-					if len(directiveList) > 2:
-						#print ("----color debug directive found, directiveList[2] = ", directiveList[2], " len = ", len(directiveList[2]))
-						if directiveList[2].find('#') == 0:
-							self.dirArrowPenColor = directiveList[2]
-						elif directiveList[2] in textColorMap:
-							#print ("----color debug directive found in textColorMap")
-							self.dirArrowPenColor = textColorMap[directiveList[2]]
-						elif directiveList[2] in colorMap:
-							#print ("----color debug directive found in colorMap")
-							self.dirArrowPenColor = colorMap[directiveList[2]]
-						else:
-							return
-						self.dirArrowPen.setColor(QtGui.QColor(self.dirArrowPenColor))
-				elif directiveList[1] == "tri":
-					if len(directiveList) > 2:
-						if directiveList[2].find('#') == 0:
-							self.triPenColor = directiveList[2]
-						elif directiveList[2] in textColorMap:
-							self.triPenColor = textColorMap[directiveList[2]]
-						elif directiveList[2] in colorMap:
-							self.triPenColor = colorMap[directiveList[2]]
-						else:
-							return
-						self.triPen.setColor(QtGui.QColor(self.triPenColor))
-				elif directiveList[1] == "gap":
-					if len(directiveList) > 2:
-						if directiveList[2].find('#') == 0:
-							self.gapBrushColor = directiveList[2]
-						elif directiveList[2] in textColorMap:
-							self.gapBrushColor = textColorMap[directiveList[2]]
-						elif directiveList[2] in colorMap:
-							self.gapBrushColor = colorMap[directiveList[2]]
-						else:
-							return
-						self.gapBrush.setColor(QtGui.QColor(self.gapBrushColor))
-				elif directiveList[1] == "grid":
-					if len(directiveList) > 3:
-						if directiveList[2] == "both":
-							if directiveList[3].find('#') == 0:
-								self.gridOtherPenColor = self.gridPenColor = directiveList[3]
-							elif directiveList[3] in textColorMap:
-								self.gridOtherPenColor = self.gridPenColor = textColorMap[directiveList[3]]
-							elif directiveList[3] in colorMap:
-								self.gridOtherPenColor = self.gridPenColor = colorMap[directiveList[3]]
-							else:
-								return
-							self.gridPen.setColor(QtGui.QColor(self.gridPenColor))
-							self.gridOtherPen.setColor(QtGui.QColor(self.gridOtherPenColor))
-						elif directiveList[2] == "odd":
-							if directiveList[3].find('#') == 0:
-								self.gridPenColor = directiveList[3]
-							elif directiveList[3] in textColorMap:
-								self.gridPenColor = textColorMap[directiveList[3]]
-							elif directiveList[3] in colorMap:
-								self.gridPenColor = colorMap[directiveList[3]]
-							else:
-								return
-							self.gridPen.setColor(QtGui.QColor(self.gridPenColor))
-						elif directiveList[2] == "even":
-							if directiveList[3].find('#') == 0:
-								self.gridOtherPenColor = directiveList[3]
-							elif directiveList[3] in textColorMap:
-								self.gridOtherPenColor = textColorMap[directiveList[3]]
-							elif directiveList[3] in colorMap:
-								self.gridOtherPenColor = colorMap[directiveList[3]]
-							else:
-								return
-							self.gridOtherPen.setColor(QtGui.QColor(self.gridOtherPenColor))
-					elif len(directiveList) > 2:
-						if directiveList[2].find('#') == 0:
-							self.gridOtherPenColor = self.gridPenColor = directiveList[2]
-						elif directiveList[2] in textColorMap:
-							self.gridOtherPenColor = self.gridPenColor = textColorMap[directiveList[2]]
-						elif directiveList[2] in colorMap:
-							self.gridOtherPenColor = self.gridPenColor = colorMap[directiveList[2]]
-						else:
-							return
-						self.gridPen.setColor(QtGui.QColor(self.gridPenColor))
-						self.gridOtherPen.setColor(QtGui.QColor(self.gridOtherPenColor))
-					#print ("self.gridPenColor = ", self.gridPenColor)
-					#print ("self.gridOtherPenColor = ", self.gridOtherPenColor)
+	def showSplash(self):
+		fileName = os.path.join(os.path.dirname(os.path.abspath(__file__)), "splash.jpg")
+		if os.path.isfile(fileName):
+			self.splashItem = QGraphicsPixmapItem(QPixmap.fromImage(QImage(fileName)))
+			self.graphicsScene.addItem(self.splashItem)
+
+	def clearScene(self):
+		self.abandonRedraw()
+		#the drawn items go back to the pool; clear() deletes the rest
+		self.removeItems(self.drawnItems())
+		for entry in self.lineDrawingCache.values():
+			self.removeItems(entry['items'])
+		self.lineDrawingCache.clear()
+		self.graphicsScene.clear()
+		self.splashItem = None
+		self.directionArrowTail = None
+		self.lineItemCache = {}
+		self.globalItems = []
+		self.globalPrimitives = []
+
+	def cacheLineIR (self, key, lineIR):
+		self.lineIRCache[key] = lineIR
+		if len(self.lineIRCache) > max(4096, 2 * self.plainTextEdit.document().blockCount()):
+			self.lineIRCache.popitem(last=False)
+
+	def compileLine (self, data):
+		#parse one line into its intermediate form; the result only depends on the
+		#text and on the directives that change parsing, so it is cached on both
+		key = self.lineIRKey(data, self.waveHalfDuration)
+		lineIR = self.lineIRCache.get(key)
+		if lineIR is not None:
+			self.lineIRCache.move_to_end(key)
+			return lineIR
+		lineIR = self.compileLineIR(data, self.waveHalfDuration)
+		self.cacheLineIR(key, lineIR)
+		return lineIR
+
+	def drawWaves1LineCached(self, block, ordinal, line, data, directiveKey, cursorIsOnThisLine = False, currentColumn = -1,
+			deferItems = False):
+		#returns the line's entry; deferItems leaves a newly drawn line without
+		#items, addLineItems makes them
+		key = (data, directiveKey, ordinal, self.lineStateKey(line))
+		dupCount = 0
+		while (key, dupCount) in self.newLineItemCache:
+			#identical lines that do not advance the line count
+			dupCount += 1
+		key = (key, dupCount)
+
+		entry = self.lineItemCache.pop(key, None)
+		#always redraw the edited line so that the viewport follows the cursor
+		redraw = block in self.redrawDirtyBlocks or cursorIsOnThisLine
+		if entry is not None and redraw == True:
+			self.removeItems(entry['items'])
+			entry = None
+		elif entry is None and redraw == False:
+			entry = self.lineDrawingCache.pop(key, None)
+			if entry is not None:
+				for item in entry['items']:
+					self.graphicsScene.addItem(item)
+		if entry is not None:
+			self.restoreLineState(entry['state'])
+			self.directionArrowsList.extend(entry['directionArrows'])
+			self.overlayAnnotationList.extend(entry['overlayAnnotations'])
+			self.newLineItemCache[key] = entry
+			return entry
+
+		directionArrowsCount = len(self.directionArrowsList)
+		overlayAnnotationCount = len(self.overlayAnnotationList)
+		band = self.lineBand(line)
+		#the worker lays lines out without the cursor
+		prepared = None
+		if cursorIsOnThisLine == False:
+			prepared = self.preparedLines.pop(key, None)
+		if prepared is not None:
+			self.primitives = prepared['primitives']
+			self.deferredWaves = prepared['waves']
+			self.restoreLineState(prepared['state'])
+			self.directionArrowsList.extend(prepared['directionArrows'])
+			self.overlayAnnotationList.extend(prepared['overlayAnnotations'])
+			if prepared['errorMessage'] != '':
+				self.errorMessage = prepared['errorMessage']
+			lineCount = prepared['lineCount']
 		else:
-			if len(directiveList) > 1:
-				try:
-					val2 = int(directiveList[1])
-				except:
-					val2 = 0
-			else:
-				val2 = 0
-			#print ("val2 = ", val2)
-			if val2 > 20 and directiveList[0] == "height":
-				self.waveHeightChange = self.waveHeight #store the old value
-				self.waveHeight = val2
-				self.waveHeightChange -= self.waveHeight #subract the new value
-				self.gapHeight = self.waveHeight
-				self.signalWaveYSpacing = self.waveHeight
-				self.arrowVertOffset = -self.waveHeight/2 - self.signalWaveYSpacing
-				self.arrowLineAdjust = self.waveHeight/2
-			elif val2 > 39 and directiveList[0] == "tick":
-				#print ("processDirective: directiveList[0] is tick = ", directiveList[0])
-				#print ("-- processDirective: setting self.waveHalfPeriod")
-				self.waveHalfPeriod = val2 / 2
-				self.waveHalfDuration = self.waveHalfPeriod - self.waveTransitionTime
-				#print ("-- processDirective: self.waveHalfPeriod = ", self.waveHalfPeriod)
-			elif val2 > 1 and directiveList[0] == "tran":
-				self.waveTransitionTime = val2
-				self.waveHalfDuration = self.waveHalfPeriod - self.waveTransitionTime
-			elif directiveList[0] == "font":
-				#print ("--Found !set -- font = ", val2)
-				if len(directiveList) > 1:
-					val2 = directiveList[1]
-				else:
-					val2 = 'Sans'
-				if val2 != '':
-					self.sigNameFont = val2
-				else:
-					val2 = 'Courier'
-			elif directiveList[0] == "fontsize":
-				if len(directiveList) > 2:
-					try:
-						val2 = int(directiveList[2])
-					except:
-						val2 = 12
-					if val2 > 8 and val2 < 72:
-						self.sigNameFontSize = val2
-					else:
-						self.sigNameFontSize = 12
-				else:
-					self.sigNameFontSize = 12
-			elif directiveList[0] == "clockarrow":
-				if len(directiveList) > 1:
-					try:
-						val2 = int(directiveList[1])
-					except:
-						self.clockArrowSize = 15
-
-					if val2 > 7 and val2 < 25:
-						self.clockArrowSize = val2
-					else:
-						self.clockArrowSize = 15
-				else:
-					self.clockArrowSize = 15
-			elif directiveList[0] == "arrow":
-				if len(directiveList) > 1:
-					try:
-						val2 = int(directiveList[1])
-					except:
-						self.arrowSize = 9
-					if val2 > 7 and val2 < 25:
-						self.arrowSize = val2
-					else:
-						self.arrowSize = 9
-				else:
-					self.arrowSize = 9
-			elif directiveList[0] == "arrowmarker":
-				if len(directiveList) > 1:
-					try:
-						val2 = int(directiveList[1])
-					except:
-						self.arrowLineEnds = 10
-
-					if val2 > 5 and val2 < 50:
-						self.arrowLineEnds = val2
-					else:
-						self.arrowLineEnds = 10
-				else:
-					self.arrowLineEnds = 10
-
-	def drawWaves1Line (self, line, data, cursorIsOnThisLine = False, currentColumn = -1):
-		if self.clockEvenOddFlip == 1:
-			#if already swapped, correct to original pen colors (red/blue)
-			self.gridPen, self.gridOtherPen = self.gridOtherPen, self.gridPen
-			self.clockEvenOddFlip = 0
-		self.pendingArrowDelay = 0
-		dataList = data.strip().split(';')
-		#print ("drawWaves1Line: dataList = ", dataList)
-		cmdNum = 1
-		self.currentLineArrowLineList = []
-		self.currentLineArrowPolyList = []
-		commandBoundary = 0
-		lastCommandBoundary = 0
-		whichCommandHasCursor = 0
-		cmd1Len = 0
-		for cmd in dataList:
-			####if cmd.find('some text data') >= 0 or cmd.find('AOIR1') >= 0:
-			if cmdNum == 1:
-				cmd1Len = len(cmd)
-
-			newPos = cmd.rfind('+')
-			if newPos >= 0:
-				self.directionArrowsList.append(cmd[newPos + 1:])
-				return 0
-
-			newPos = cmd.rfind('^')
-			if newPos >= 0:
-				self.overlayAnnotationList.append(cmd[newPos + 1:])
-				return 0
-
-			cmd4 = ''
-			self.pendingTimeDelta = 0
-			self.currentLineNumber = line #NOTE, starts at 0
-					
-			if cmdNum == 3 and len(dataList) == 4:
-				#for the annotation command, send annot params in cmd4
-				cmd4 = dataList[3]
-			#print ("cmd4 is ", cmd4, "line value passed is ", line, "cmdNum = ", cmdNum)
-			commandBoundary += len(cmd) + 1 #the semicolon is also counted
-			#print ("drawWaves1Line:  -- commandBoundary = ", commandBoundary)
-			if currentColumn < commandBoundary and cursorIsOnThisLine == True:
-				if whichCommandHasCursor == 0:
-					#only first match
-					whichCommandHasCursor = cmdNum
-
-			self.processCommand(cmd, line, cmdNum, cmd4, whichCommandHasCursor, currentColumn - lastCommandBoundary) 
-			cmdNum += 1
-			lastCommandBoundary = commandBoundary
-			if cmdNum > 3:
+			self.primitives = []
+			self.deferredWaves = []
+			if self.maxWaveCount > 0:
+				self.fillAllGrids()
+			lineCount = self.drawWaves1Line(line, data, cursorIsOnThisLine, currentColumn)
+		entry = {}
+		entry['primitives'] = self.primitives
+		entry['waves'] = self.deferredWaves
+		entry['extent'] = None if prepared is None else prepared['extent']
+		entry['band'] = band
+		entry['ordinal'] = ordinal
+		if deferItems == True:
+			entry['items'] = None
+			entry['chunks'] = None
+			entry['chunkItems'] = {}
+			entry['rect'] = None
+		else:
+			self.addLineItems(entry)
+		self.primitives = []
+		self.deferredWaves = []
+		self.applyViewRequests()
+
+		entry['lineCount'] = lineCount
+		entry['state'] = self.saveLineState()
+		entry['directionArrows'] = self.directionArrowsList[directionArrowsCount:]
+		entry['overlayAnnotations'] = self.overlayAnnotationList[overlayAnnotationCount:]
+		self.newLineItemCache[key] = entry
+		return entry
+
+	def addLineItems(self, entry):
+		primitives = entry['primitives']
+		extent = entry.get('extent')
+		if extent is None:
+			extent = self.primitivesExtent(primitives)
+		entry['chunkItems'] = {}
+		if entry['waves'] == []:
+			entry['chunks'] = None
+			entry['items'] = self.addPrimitives(primitives)
+			entry['rect'] = self.extentRect(extent)
+			self.stackLineItems(entry['items'], entry['ordinal'])
+			return
+		#the runs of the deferred waves are the line's chunks, (rect, wave, run,
+		#stacking), and only get items from showVirtualRegion, once they are near
+		#the view
+		lineItems = []
+		entry['chunks'] = []
+		for (stacking, partPrimitives, wave, index) in self.lineParts(entry):
+			if wave is None:
+				items = self.addPrimitives(partPrimitives)
+				self.stackLineItems(items, stacking)
+				lineItems.extend(items)
+				continue
+			(top, bottom) = wave['band']
+			(runLeft, runRight) = wave['runs'][index][4:6]
+			rect = QtCore.QRectF(runLeft, top, runRight - runLeft, bottom - top)
+			entry['chunks'].append((rect, wave, index, stacking))
+		entry['lineItems'] = lineItems
+		entry['items'] = list(lineItems)
+		entry['rect'] = self.extentRect(self.unitedExtent([extent] + [wave['extent'] for wave in entry['waves']]))
+
+	def lineParts(self, entry):
+		#a drawn line as the parts that get items of their own, in the order they
+		#stack: (stacking, primitives, None, None) for what the line keeps and
+		#(stacking, None, wave, run) for the runs of its deferred waves, which go in
+		#between, see deferWaves
+		primitives = entry['primitives']
+		if entry['waves'] == []:
+			return [(entry['ordinal'], primitives, None, None)]
+		count = len(entry['waves']) + 1 + sum([len(wave['runs']) for wave in entry['waves']])
+		parts = []
+		start = 0
+		for wave in entry['waves'] + [None]:
+			stop = len(primitives) if wave is None else wave['at']
+			parts.append((entry['ordinal'] + len(parts) / count, primitives[start:stop], None, None))
+			start = stop
+			if wave is None:
 				break
-
-		return 1
+			for index in range(0, len(wave['runs'])):
+				parts.append((entry['ordinal'] + len(parts) / count, None, wave, index))
+		return parts
+
+	def stackLineItems(self, items, ordinal):
+		#items of equal z stack in insertion order; a line that is redrawn on its own
+		#must still stack above the lines before it and below the lines after it
+		for item in items:
+			item.setZValue(item.zValue() + ordinal * self.lineZStep)
+
+	def removeItems(self, items, recycle = True):
+		#take the items off their scene and keep the ones that can be reused
+		for item in items:
+			try:
+				scene = item.scene()
+			except RuntimeError:
+				#already deleted along with its scene
+				continue
+			if scene is not None:
+				scene.removeItem(item)
+			if recycle == False:
+				continue
+			pool = self.itemPool.get(type(item))
+			if pool is not None and len(pool) < self.itemPoolLimit:
+				pool.append(item)
+
+	def drawnItems(self):
+		items = list(self.globalItems)
+		for entry in self.lineItemCache.values():
+			items.extend(entry['items'])
+		return items
+
+	def removeTransientItems(self):
+		#items that are not owned by any drawn line
+		self.removeItems(self.globalItems)
+		self.globalItems = []
+		if self.splashItem is not None:
+			self.removeItems([self.splashItem])
+			self.splashItem = None
+		if self.directionArrowTail is not None:
+			self.removeItems([self.directionArrowTail])
+			self.directionArrowTail = None
+
+	def contentsChangeHandler(self, position, charsRemoved, charsAdded):
+		document = self.plainTextEdit.document()
+		firstBlock = document.findBlock(position).blockNumber()
+		lastBlock = document.findBlock(position + charsAdded).blockNumber()
+		if lastBlock < firstBlock:
+			#position is past the end of the document
+			lastBlock = document.blockCount() - 1
+		self.dirtyBlocks.update(range(firstBlock, lastBlock + 1))
 
 	def currentDrawnBlock(self, currentBlock):
 		drawnBlock = 0
@@ -1112,30 +1774,23 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 				drawnBlock += 1
 		return drawnBlock
 
-	def fillAllGrids(self):
-		for i in range(self.maxWaveCount):
-			xBasis = self.signalWaveXOffset + self.sigNameColWidth + self.waveHalfPeriod * i
-			yBasis = self.signalWaveYOffset + (self.currentLineNumber - self.linesWithArrow) *\
-				(self.waveHeight + self.signalWaveYSpacing) + self.linesWithArrow * self.arrowLineAdjust
-			#draw the grid
-			if (i % 2) == 0:
-				l = self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
-					yBasis - self.waveHeight - self.signalWaveYSpacing, 
-					xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
-					yBasis), self.gridOtherPen)
-				l.setZValue(-1)
-			elif (i % 2) == 1:
-				l = self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
-					yBasis - self.waveHeight - self.signalWaveYSpacing, 
-					xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
-					yBasis), self.gridPen)
-				l.setZValue(-1)
-
-		#do anchor
-		self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveHalfPeriod + self.xMargin, yBasis,  
-			xBasis + self.waveHalfPeriod + self.xMargin, yBasis), QtGui.QPen(Qt.transparent)) 
-
 	def reDrawCanvas (self, keyVal=''):
+		if self.redrawSteps is not None and self.dirtyBlocks == set() and self.getTextCursorPos() == self.redrawCursor:
+			#nothing has changed since the redraw in progress began; this one
+			#starts from the line state that one ends with, as it always has
+			self.redrawQueued = True
+			return
+		self.abandonRedraw()
+		#an incremental redraw of a drawn scene only touches the edited lines,
+		#so it is done in place and the scene keeps its index
+		self.beginBulkBuild(self.incrementalRedraw == False or len(self.lineItemCache) == 0)
+		try:
+			self.reDrawCanvasBulk(keyVal)
+		finally:
+			self.endBulkBuild()
+		self.redrawShown()
+
+	def reDrawCanvasBulk (self, keyVal=''):
 		self.directionArrowsList = []
 		self.overlayAnnotationList = []
 		self.graphicsView.setAlignment(Qt.AlignTop | Qt.AlignLeft)
@@ -1143,119 +1798,291 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 		if currentColumn == 0:
 			#return was pressed and at start of new line
 			yCurrent = self.signalWaveYOffset + self.currentDrawnBlock(currentBlock) * (self.waveHeight + self.signalWaveYSpacing)
-			self.graphicsView.centerOn(
-				0, yCurrent)
+			self.centerView(0, yCurrent)
 			data = self.plainTextEdit.document().findBlockByNumber(currentBlock).text()
 
-		self.graphicsScene.clear()
+		if self.incrementalRedraw == False:
+			self.clearScene()
+			document = self.plainTextEdit.document()
+			texts = [document.findBlockByNumber(i).text() for i in range (0, document.blockCount())]
+			self.globalPrimitives = self.drawDocument(texts, currentBlock, currentColumn)
+			self.resetStylePool(self.directiveStateKey())
+			#added line by line, so that the items match the incremental redraw
+			starts = [0] + self.documentLineStarts + [len(self.globalPrimitives)]
+			for i in range(0, len(starts) - 1):
+				self.globalItems.extend(self.addPrimitives(self.globalPrimitives[starts[i]:starts[i + 1]]))
+			self.primitives = []
+			self.applyViewRequests()
+			self.graphicsScene.setSceneRect(self.primitivesRect(self.globalPrimitives))
+			return
+
+		self.redrawSteps = self.redrawLines(currentBlock, currentColumn)
+		if self.progressiveRedraw == True:
+			#the rest is left to continueRedraw
+			self.runRedraw(0)
+		else:
+			self.runRedraw()
+
+	def redrawLines(self, currentBlock, currentColumn):
+		#the incremental redraw as steps of one line each, see runRedraw; a step
+		#yields True once the lines in and around the view and those around the
+		#cursor are drawn. Every line before those is still drawn, it sets where
+		#the next one goes, but lines that were not drawn before only get their
+		#items after the rest
+		self.removeTransientItems()
+		self.newLineItemCache = {}
+		self.redrawDirtyBlocks = self.dirtyBlocks
+		self.dirtyBlocks = set()
+		self.redrawRect = QtCore.QRectF()
+		self.redrawCursor = (currentBlock, currentColumn)
+		#each line is drawn from the state the one before leaves, the first one
+		#from where the last redraw ended
+		self.redrawStartState = self.saveLineState()
 		self.linesWithArrow = 0
-		lastBlock = self.plainTextEdit.document().blockCount()
-		dataArray = []
+		document = self.plainTextEdit.document()
+		texts = [document.findBlockByNumber(i).text() for i in range (0, document.blockCount())]
+		view = self.graphicsView.mapToScene(self.graphicsView.viewport().rect()).boundingRect()
+		viewTop = view.top() - view.height() * self.virtualMargin
+		viewBottom = view.bottom() + view.height() * self.virtualMargin
+		#the drawings left from the last redraw by line, those of lines before the
+		#one being drawn can no longer be taken and are put away as it goes
+		oldEntries = sorted(self.lineItemCache.items(), key = lambda item: item[1]['ordinal'])
+		oldIndex = 0
+		deferred = []
+		shown = self.progressiveRedraw == False
 		line = 0
 		
 		acceptDirective = True
-		for i in range (0, lastBlock):
-			data = self.plainTextEdit.document().findBlockByNumber(i).text()
+		directiveKey = None
+		ordinal = 0
+		for i in range (0, len(texts)):
+			data = texts[i]
 			if data.strip() == '':
 				continue
 			#print ("reDrawCanvas: A. acceptDirective = ", acceptDirective, " self.waveHalfPeriod = ", self.waveHalfPeriod)
-			#if i == lastBlock - 1:
-			#	data += keyVal
 			if acceptDirective == True:
 				if data.strip().find('#!') == 0:
 					if data[2:] != '':
 						self.processDirective(data[2:])
 					#print ("reDrawCanvas: B. acceptDirective = ", acceptDirective, " self.waveHalfPeriod = ", self.waveHalfPeriod)
 					continue
-			data = data.replace('\#', chr(1)) #replace literal '#' before separating comments
-			data = data.replace('\;', chr(2)) #replace literal ';' before separating comments
-			data = data.replace('\,', chr(6)) #replace literal ','
-			#print ("========DATALIST = ", dataList)
-			command = data.split('#')[0] #allow all leading and trailing spaces
+			command = self.commandOf(data)
 			#print ("==============command = ", command)
 			if command != '':
 				acceptDirective = False
 				cursorIsOnThisLine = (currentBlock == i)
-				#print ("==============calling drawWaves1Line... currentBlock = ", currentBlock, " cursorIsOnThisLine = ", cursorIsOnThisLine, " i = ", i)
-				if self.maxWaveCount > 0:
-					self.fillAllGrids()
-				line += self.drawWaves1Line (line, command, cursorIsOnThisLine, currentColumn)
-				#line += 1
+				if directiveKey is None:
+					directiveKey = self.directiveStateKey()
+					self.resetStylePool(directiveKey)
+					#lines of the view, above and below the cursor
+					cursorLines = int(view.height() / (self.waveHeight + self.signalWaveYSpacing)) + 1
+				deferItems = False
+				if shown == False:
+					(top, bottom) = self.lineBand(line)
+					if top > viewBottom and i > currentBlock + cursorLines:
+						shown = True
+					elif abs(i - currentBlock) > cursorLines and (bottom < viewTop or top > viewBottom):
+						deferItems = True
+				entry = self.drawWaves1LineCached (i, ordinal, line, command, directiveKey, cursorIsOnThisLine, currentColumn,
+					deferItems)
+				line += entry['lineCount']
+				if entry['items'] is None:
+					#a drawing that is kept already has its items
+					deferred.append(entry)
+				else:
+					self.redrawRect = self.redrawRect.united(entry['rect'])
+				while oldIndex < len(oldEntries) and oldEntries[oldIndex][1]['ordinal'] <= ordinal:
+					(key, oldEntry) = oldEntries[oldIndex]
+					if self.lineItemCache.pop(key, None) is not None:
+						self.putLineDrawingAway(key, oldEntry)
+					oldIndex += 1
+				ordinal += 1
 				self.waveHeightChange = 0
+				yield shown
+
+		for entry in deferred:
+			self.addLineItems(entry)
+			self.redrawRect = self.redrawRect.united(entry['rect'])
+			yield True
+
+		#lines that were deleted, edited or moved
+		for (key, entry) in self.lineItemCache.items():
+			self.putLineDrawingAway(key, entry)
+		self.lineItemCache = self.newLineItemCache
+		self.newLineItemCache = {}
+		self.redrawDirtyBlocks = set()
+		self.preparedLines = {}
+
+		#overlaid annotations and direction arrows belong to no line
+		self.primitives = []
+		self.drawOverlays()
+		self.globalPrimitives = self.primitives
+		self.globalItems = self.addPrimitives(self.globalPrimitives)
+		self.primitives = []
+		self.stackLineItems(self.globalItems, ordinal)
+
+		#union of the per-line extents, no need to walk every item
+		rect = self.primitivesRect(self.globalPrimitives)
+		for entry in self.lineItemCache.values():
+			rect = rect.united(entry['rect'])
+		self.graphicsScene.setSceneRect(rect)
 
-		#print the overlaid annotation
-		#print ("reDrawCanvas: currentLineOverlayAnnotationQTextList entry count = ", len(self.currentLineOverlayAnnotationQTextList))
-		#print ("reDrawCanvas: overlayAnnotationList entry count = ", len(self.overlayAnnotationList))
-		for qtext in self.currentLineOverlayAnnotationQTextList:
-			#print ("reDrawCanvas: removed currentLineOverlayAnnotationQTextList entry = ", qtext)
-			try:
-				self.graphicsScene.removeItem(qtext)
-			except:
-				pass
-
-		self.currentLineOverlayAnnotationQTextList = []
-
-		for s in self.overlayAnnotationList:
-			x0, y0, annot = 0, 0, ''
+	def putLineDrawingAway(self, key, entry):
+		#off the scene and into lineDrawingCache, in case the line comes back
+		self.dropVirtualItems(entry)
+		self.removeItems(entry['items'], False)
+		stale = self.lineDrawingCache.pop(key, None)
+		if stale is not None:
+			self.removeItems(stale['items'])
+		self.lineDrawingCache[key] = entry
+		while len(self.lineDrawingCache) > self.lineDrawingCacheSize:
+			self.removeItems(self.lineDrawingCache.popitem(last=False)[1]['items'])
+
+	def runRedraw(self, deadline = None):
+		#steps the redraw in progress until it is done or, with a deadline, until
+		#the view is drawn and time.perf_counter() has passed the deadline
+		try:
+			for shown in self.redrawSteps:
+				if deadline is not None and shown == True and time.perf_counter() >= deadline:
+					return
+		except:
+			self.redrawSteps = None
+			raise
+		self.redrawSteps = None
+
+	def continueRedraw(self):
+		#one slice of a progressive redraw, run from the event loop
+		if self.redrawSteps is None or self.redrawPending == True:
+			#a newer redraw is on its way and starts over
+			return
+		self.beginBulkBuild(False)
+		try:
+			self.runRedraw(time.perf_counter() + self.progressiveSliceTime)
+		finally:
+			self.endBulkBuild()
+		self.redrawShown()
+
+	def finishRedraw(self):
+		#what needs the whole diagram, exports for one, runs this first
+		while self.redrawSteps is not None:
+			self.progressiveTimer.stop()
+			self.beginBulkBuild(False)
 			try:
-				l =  s.split(' ')
-				x0, y0 = l[0], l[1]
-				annot = ' '.join(l[2:])
-			except:
-				x0, y0, annot = -1, -1, ''
-
-			if x0 != -1:
-				self.tdPrintOverlayAnnot (x0, y0, annot)
+				self.runRedraw()
+			finally:
+				self.endBulkBuild()
+			#which can start the queued redraw
+			self.redrawShown()
+
+	def abandonRedraw(self):
+		#a new redraw starts from what the one in progress has put on the scene;
+		#the lines it has drawn become lines of the last redraw, but those
+		#still without items are dropped, and the line state is put back
+		self.redrawQueued = False
+		if self.redrawSteps is None:
+			return
+		self.progressiveTimer.stop()
+		self.redrawSteps.close()
+		self.redrawSteps = None
+		self.restoreLineState(self.redrawStartState)
+		for (key, entry) in self.newLineItemCache.items():
+			if entry['items'] is not None:
+				self.lineItemCache[key] = entry
+		self.newLineItemCache = {}
+		self.dirtyBlocks.update(self.redrawDirtyBlocks)
+		self.redrawDirtyBlocks = set()
+
+	def redrawShown(self):
+		#after a redraw or a slice of one
+		if self.redrawSteps is not None:
+			#the scene grows as the lines come in
+			self.graphicsScene.setSceneRect(self.graphicsScene.sceneRect().united(self.redrawRect))
+		self.updateNameColumn()
+		self.updateVirtualView()
+		if self.redrawSteps is not None:
+			self.progressiveTimer.start(0)
+		elif self.redrawQueued == True:
+			self.redrawQueued = False
+			self.reDrawCanvas()
+		else:
+			self.scheduleMinimap()
 
+	def scheduleRedraw(self):
+		if self.redrawQuietPeriod <= 0:
+			self.reDrawCanvas()
+			self.label.setText("Status: Ready")
+			return
+		#every edit makes whatever is queued or in flight stale
+		self.renderGeneration += 1
+		if self.renderWorker is not None:
+			self.renderWorker.latestGeneration = self.renderGeneration
+		self.redrawPending = True
+		self.redrawTimer.start(self.redrawQuietPeriod)
+
+	def startBackgroundRender(self):
+		if self.renderThread is None:
+			self.renderThread = QtCore.QThread(self)
+			self.renderWorker = RenderWorker()
+			self.renderWorker.moveToThread(self.renderThread)
+			self.renderRequested.connect(self.renderWorker.prepare)
+			self.renderWorker.prepared.connect(self.backgroundRenderDone)
+			self.renderThread.start()
+		document = self.plainTextEdit.document()
+		texts = [document.findBlockByNumber(i).text() for i in range(0, document.blockCount())]
+		#a frozen copy of what the next redraw starts from: the engine state, the
+		#line state as reDrawCanvas will put it back and what is drawn already
+		snapshot = {}
+		snapshot['engine'] = self.engineState()
+		if self.redrawSteps is not None:
+			snapshot['startState'] = self.redrawStartState
+			entries = list(self.lineItemCache.items()) + [(key, entry) for (key, entry) in self.newLineItemCache.items()
+				if entry['items'] is not None]
+			snapshot['dirtyBlocks'] = self.dirtyBlocks | self.redrawDirtyBlocks
+		else:
+			snapshot['startState'] = self.saveLineState()
+			entries = list(self.lineItemCache.items())
+			snapshot['dirtyBlocks'] = set(self.dirtyBlocks)
+		entries.extend(self.lineDrawingCache.items())
+		snapshot['knownLines'] = dict((key, (entry['lineCount'], entry['state'])) for (key, entry) in entries)
+		self.renderWorker.latestGeneration = self.renderGeneration
+		self.renderRequested.emit(self.renderGeneration, texts, snapshot)
+
+	def backgroundRenderDone(self, generation, lines):
+		if generation != self.renderGeneration or self.redrawPending == False:
+			return
+		self.preparedLines = lines
+		self.redrawPending = False
+		self.reDrawCanvas()
+		self.label.setText("Status: Ready")
 
-		#draw the direction arrows
-		for s in self.directionArrowsList:
-			#print("DEBUG: self.directionArrowsList = ", self.directionArrowsList)
-			x0, y0, x1, y1, xm, ym = 0, 0, 0, 0, 0, 0
-			try:
-				[x0, y0, x1, y1, xm, ym] = s.split(' ')
-			except:
-				try:
-					[x0, y0, x1, y1] = s.split(' ')
-				except:
-					[x0, y0, x1, y1] = [-1, -1, -1, -1]
-			try:
-				x0 = int(x0)
-			except:
-				x0 = -1
-			try:
-				y0 = int(y0)
-			except:
-				y0 = x0
-			try:
-				x1 = int(x1)
-			except:
-				x1 = x0
-			try:
-				y1 = int(y1)
-			except:
-				y1 = y0
-			try:
-				xm = int(xm)
-			except:
-				xm = (x0 + x1)/2
-			try:
-				ym = int(ym)
-			except:
-				ym = (y0 + y1)/2
-			
-			if x0 != -1:
-				if xm == 0:
-					xm = (x0 + x1)/2
-				if ym == 0:
-					ym = (y0 + y1)/2
-				self.tdDrawDirectionArrow (x0, y0, x1, y1, xm, ym)
-		
-		#print ("=======================================================\n")
-		#anchor
-		rect = QtCore.QRectF(self.graphicsScene.itemsBoundingRect())
-		self.graphicsScene.setSceneRect(rect)
+	def flushRedraw(self):
+		#run a scheduled redraw now, dropping whatever the worker is doing
+		if self.redrawPending == False:
+			return
+		self.redrawTimer.stop()
+		self.renderGeneration += 1
+		if self.renderWorker is not None:
+			self.renderWorker.latestGeneration = self.renderGeneration
+		self.redrawPending = False
+		self.reDrawCanvas()
+		self.label.setText("Status: Ready")
 
+	def stopRenderThread(self):
+		self.redrawTimer.stop()
+		self.redrawPending = False
+		if self.renderThread is not None:
+			self.renderWorker.latestGeneration = -1
+			self.renderThread.quit()
+			self.renderThread.wait()
+			self.renderThread = None
+			self.renderWorker = None
+		self.minimapTimer.stop()
+		if self.minimapThread is not None:
+			self.minimapWorker.latestGeneration = -1
+			self.minimapThread.quit()
+			self.minimapThread.wait()
+			self.minimapThread = None
+			self.minimapWorker = None
 
 	def getTextCursorPos(self):
 		qcursor = self.plainTextEdit.textCursor()
@@ -1267,8 +2094,7 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 		self.editorIsModified = True
 		self.setWindowTitle("Timing Diagrammer - " + self.currentFileName + " [modified]")
 		self.plainTextEdit.ensureCursorVisible()
-		self.reDrawCanvas()
-		self.label.setText("Status: Ready")
+		self.scheduleRedraw()
 
 	def closeEvent(self, event):
 		#print ("closeEvent: self.editorIsModified = ", self.editorIsModified)
@@ -1284,6 +2110,7 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 					msg.setText("Saved file " + os.path.join(self.currentDirName, self.currentFileName) + ".")
 					msg.setWindowTitle("File Write Completed")
 					msg.exec_()
+		self.stopRenderThread()
 		self.close()
 
 	def mousePressEvent(self, event):
@@ -1314,6 +2141,14 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 
 	def eventFilter(self, obj, event):
 		eventType = event.type()
+		if obj is self.graphicsView.viewport() and eventType == QtCore.QEvent.Resize:
+			self.placeNameColumn()
+		if obj is self.graphicsView.viewport() and eventType == QtCore.QEvent.Wheel:
+			if event.modifiers() & Qt.ControlModifier:
+				if event.angleDelta().y() != 0:
+					self.zoomBy(self.zoomStep ** (event.angleDelta().y() / 120), True)
+				return True
+			return False
 		if (obj is self.plainTextEdit and self.plainTextEdit.hasFocus()) or (obj is self.graphicsView and self.graphicsView.hasFocus()):
 			modifiers = QtGui.QGuiApplication.keyboardModifiers()
 			eventKey = eventText = None
@@ -1357,17 +2192,17 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 			else:
 				pass
 				#print ("Buffer Save Dialog question returned = NO = ", ret)
-		self.graphicsScene.clear()
+		self.clearScene()
 		self.plainTextEdit.clear()
+		self.flushRedraw()
 		self.resetParameters()
 		self.resetVariables()
 		#print ("fileNew: self.editorIsModified is set to False = ", self.editorIsModified)
 		self.setWindowTitle("Timing Diagrammer - Untitled.tim")
 		self.graphicsView.setAlignment(Qt.AlignCenter)
-		fileName = os.path.join(os.path.dirname(os.path.abspath(__file__)), "splash.jpg")
-		if os.path.isfile(fileName):
-			splash = QGraphicsPixmapItem(QPixmap.fromImage(QImage(fileName)))
-			self.graphicsScene.addItem(splash)
+		self.updateNameColumn()
+		self.showSplash()
+		self.scheduleMinimap()
 
 
 	def fileOpen (self, event=None):
@@ -1416,6 +2251,7 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 				self.plainTextEdit.setPlainText(f.read())
 				f.close()
 				self.editorIsModified = False
+			self.flushRedraw()
 			self.reDrawCanvas()
 		except:
 			msg = QMessageBox()
@@ -1514,17 +2350,243 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 
 		return success
 
-	def fileExport (self, event=None):
-		#size = QtCore.QRectF(self.graphicsScene.sceneRect()).toRect().size()
-		size = QtCore.QRectF(self.graphicsScene.itemsBoundingRect()).toRect().size()
-		#print ("fileExport: sceneRect width = ", size.width(), "sceneRect height = ", size.height())
-
+	def exportSize (self):
+		#the scene rect takes in the anchors, so it has the margins
+		return QtCore.QRectF(self.graphicsScene.sceneRect()).toRect().size()
+
+	def exportImage (self, fullFileName):
+		self.finishRedraw()
+		extension = os.path.splitext(fullFileName)[1].lower()
+		if extension == '.svg':
+			return self.exportSvg(fullFileName)
+		size = self.exportSize()
+		if self.exportStripWidth > 0:
+			return self.exportStrips(fullFileName, self.exportStripWidth)
+		if 4 * size.width() * size.height() > self.exportMaxImageBytes or max(size.width(), size.height()) > 32767:
+			#only PNG is written in tiles, other formats have to fit in one image
+			if extension != '.png':
+				return False
+			return self.exportTiled(fullFileName)
+		if extension == '.png' and self.exportThreads > 1 and size.width() > 2 * self.exportTileWidth:
+			#wide enough for the tiles to be worth spreading over the threads
+			return self.exportTiled(fullFileName)
+		#print ("exportImage: sceneRect width = ", size.width(), "sceneRect height = ", size.height())
+
+		self.showVirtualRegion(None, None)
 		pixmap = QPixmap(size) 
 		pixmap.fill(QtGui.QColor("white"))
 		painter = QPainter(pixmap)
 		#painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
 		self.graphicsScene.render(painter)
 		painter.end()		
+		return pixmap.save(fullFileName)
+
+	def exportMargin (self, size):
+		#a tile is drawn with this many more pixels on each side, enough for the
+		#widest pen and an arrowhead to reach into it from outside and for the
+		#clip that keeps the edge out of the tile; long dotted and dashed lines
+		#are cut to each tile instead, see TileRenderer.clipPrimitive
+		source = self.graphicsScene.sceneRect()
+		if source.isEmpty():
+			return (0, 0)
+		scale = min(size.width() / source.width(), size.height() / source.height())
+		penWidth = 1
+		for primitive in self.scenePrimitives():
+			kind = primitive[0]
+			if kind == 'line' or kind == 'path':
+				penWidth = max(penWidth, primitive[2][1])
+			elif kind == 'grid':
+				penWidth = max(penWidth, primitive[2][0][1], primitive[2][1][1])
+		margin = int(math.ceil((penWidth + max(self.arrowSize, self.clockArrowSize)) * scale)) + 4
+		return (margin, margin)
+
+	def exportSnapshot (self, size, tileWidth, bandHeight, margin):
+		#what the scene shows as plain data that a TileRenderer on another thread
+		#draws tiles from: the engine state, the parts of the lines that the items
+		#were made from, see lineParts, and by (column, band) of the tiles, the
+		#(part, primitive) that reach into each, with a primitive of -1 for the
+		#runs of deferred waves
+		source = self.graphicsScene.sceneRect()
+		scale = min(size.width() / source.width(), size.height() / source.height())
+		snapshot = {}
+		snapshot['engine'] = self.engineState()
+		snapshot['size'] = (size.width(), size.height())
+		snapshot['origin'] = (source.x(), source.y())
+		snapshot['scale'] = scale
+		snapshot['margin'] = margin
+		snapshot['tileWidth'] = tileWidth
+		snapshot['bandHeight'] = bandHeight
+		snapshot['lineZStep'] = self.lineZStep
+		snapshot['textColor'] = self.defaultTextColor.rgba()
+		if self.incrementalRedraw == True:
+			parts = []
+			for entry in sorted(self.lineItemCache.values(), key = lambda entry: entry['ordinal']):
+				parts.extend(self.lineParts(entry))
+			parts.append((len(self.lineItemCache), self.globalPrimitives, None, None))
+		else:
+			#added line by line and never stacked, see reDrawCanvasBulk
+			starts = [0] + self.documentLineStarts + [len(self.globalPrimitives)]
+			parts = [(0, self.globalPrimitives[starts[i]:starts[i + 1]], None, None) for i in range(0, len(starts) - 1)]
+		snapshot['parts'] = parts
+		columns = max(1, math.ceil(size.width() / tileWidth))
+		bands = max(1, math.ceil(size.height() / bandHeight))
+		buckets = {}
+		def addToBuckets(extent, entry):
+			#extent in scene coordinates, with a pixel to spare for the antialiasing
+			x0 = int(((extent[0] - source.x()) * scale - margin[0] - 1) // tileWidth)
+			x1 = int(((extent[2] - source.x()) * scale + margin[0] + 1) // tileWidth)
+			y0 = int(((extent[1] - source.y()) * scale - margin[1] - 1) // bandHeight)
+			y1 = int(((extent[3] - source.y()) * scale + margin[1] + 1) // bandHeight)
+			for column in range(max(0, x0), min(columns - 1, x1) + 1):
+				for band in range(max(0, y0), min(bands - 1, y1) + 1):
+					bucket = buckets.get((column, band))
+					if bucket is None:
+						bucket = buckets[(column, band)] = []
+					bucket.append(entry)
+		for partIndex in range(0, len(parts)):
+			(stacking, primitives, wave, run) = parts[partIndex]
+			if wave is not None:
+				(top, bottom) = wave['band']
+				(runLeft, runRight) = wave['runs'][run][4:6]
+				addToBuckets((runLeft, top, runRight, bottom), (partIndex, -1))
+				continue
+			for index in range(0, len(primitives)):
+				primitive = primitives[index]
+				if primitive[0] == 'anchor':
+					continue
+				extent = self.primitivesExtent([primitive])
+				if extent is None and primitive[0] == 'line':
+					#a line of no length bounds nothing, but a row still paints it as a dot
+					(x, y, half) = (primitive[3], primitive[4], primitive[2][1] / 2)
+					extent = (x - half, y - half, x + half, y + half)
+				if extent is not None:
+					addToBuckets(extent, (partIndex, index))
+		snapshot['buckets'] = buckets
+		return snapshot
+
+	def exportExecutor (self):
+		#threads that draw and encode the tiles, None to do it all on this one
+		if self.exportThreads <= 1:
+			return None
+		return concurrent.futures.ThreadPoolExecutor(self.exportThreads)
+
+	def tileImages (self, executor, snapshot, local, tiles):
+		#a callable that returns the images of tiles, drawn on the threads of
+		#executor if there is one
+		if executor is None:
+			images = [renderSnapshotTile(snapshot, local, tile) for tile in tiles]
+			return lambda: images
+		futures = [executor.submit(renderSnapshotTile, snapshot, local, tile) for tile in tiles]
+		return lambda: [future.result() for future in futures]
+
+	def bandRows (self, tiles, images):
+		#the RGB rows of a band from the images of its tiles, left to right
+		rows = tiles[0][3]
+		bandRows = [[] for y in range(0, rows)]
+		for (left, top, columns, rows), image in zip(tiles, images):
+			image = image.convertToFormat(QImage.Format_RGB888)
+			bits = image.constBits()
+			bits.setsize(image.bytesPerLine() * rows)
+			data = bits.asstring()
+			for y in range(0, rows):
+				start = y * image.bytesPerLine()
+				bandRows[y].append(data[start:start + 3 * columns])
+		return [b''.join(row) for row in bandRows]
+
+	def exportTiled (self, fullFileName):
+		#bands of whole rows, each drawn as tiles and handed to the encoder;
+		#memory stays near exportTileBytes per band being drawn or encoded however
+		#wide the scene is
+		size = self.exportSize()
+		width = size.width()
+		height = size.height()
+		bandHeight = max(1, min(height, self.exportTileBytes // (4 * max(1, width))))
+		snapshot = self.exportSnapshot(size, self.exportTileWidth, bandHeight, self.exportMargin(size))
+		local = threading.local()
+		executor = self.exportExecutor()
+		try:
+			with open(fullFileName, 'wb') as f:
+				writer = PngWriter(f, width, height, executor, self.exportThreads)
+				for top in range(0, height, bandHeight):
+					rows = min(bandHeight, height - top)
+					tiles = [(left, top, min(self.exportTileWidth, width - left), rows)
+						for left in range(0, width, self.exportTileWidth)]
+					images = self.tileImages(executor, snapshot, local, tiles)
+					writer.writeRows(lambda tiles = tiles, images = images: self.bandRows(tiles, images()))
+				writer.close()
+		except OSError:
+			return False
+		finally:
+			if executor is not None:
+				executor.shutdown()
+		return True
+
+	def exportStrips (self, fullFileName, stripWidth):
+		#name-001.png, name-002.png, ... each stripWidth pixels of the diagram,
+		#in the format of the file name's extension
+		size = self.exportSize()
+		(baseName, extension) = os.path.splitext(fullFileName)
+		snapshot = self.exportSnapshot(size, stripWidth, max(1, size.height()), (self.exportMargin(size)[0], 0))
+		local = threading.local()
+		executor = self.exportExecutor()
+		saved = []
+		success = True
+		for left in range(0, size.width(), stripWidth):
+			tile = (left, 0, min(stripWidth, size.width() - left), size.height())
+			strip = baseName + "-%03d" % (left // stripWidth + 1) + extension
+			if executor is None:
+				success = renderSnapshotTile(snapshot, local, tile).save(strip) and success
+				continue
+			#the strips are full height, so only as many as there are threads are
+			#drawn or wait to be saved at a time
+			saved.append(executor.submit(lambda tile = tile, strip = strip: renderSnapshotTile(snapshot, local, tile).save(strip)))
+			if len(saved) > self.exportThreads:
+				saved[-self.exportThreads - 1].result()
+		if executor is not None:
+			executor.shutdown()
+			success = all([future.result() for future in saved]) and success
+		return success
+
+	def scenePrimitives (self):
+		#the primitives behind the items on screen, lines in document order
+		primitives = []
+		for entry in sorted(self.lineItemCache.values(), key = lambda entry: entry['ordinal']):
+			primitives.extend(self.linePrimitives(entry))
+		primitives.extend(self.globalPrimitives)
+		return primitives
+
+	def exportSvg (self, fullFileName):
+		#vector output written from the primitives, so its size follows the
+		#primitive count rather than the pixel area
+		rect = QtCore.QRectF(self.graphicsScene.sceneRect().topLeft(), QtCore.QSizeF(self.exportSize()))
+		try:
+			with open(fullFileName, 'w', encoding="utf-8", newline='\n') as f:
+				f.write(self.svgDocument(self.scenePrimitives(), rect.x(), rect.y(), rect.width(), rect.height(),
+					self.currentFileName))
+		except OSError:
+			return False
+		return True
+
+	def renderFile (self, inFileName, outFileName):
+		#same steps as opening the file and pressing Export, minus the dialogs;
+		#read and write errors are raised to the caller
+		self.currentDirName = os.path.dirname(inFileName)
+		self.currentFileName = os.path.basename(inFileName)
+		self.resetParameters()
+		self.resetVariables()
+		with open(inFileName, 'r', encoding="utf-8", newline='\n') as f:
+			self.plainTextEdit.setPlainText(f.read())
+		self.editorIsModified = False
+		self.flushRedraw()
+		self.reDrawCanvas()
+		if not self.exportImage(outFileName):
+			raise IOError("could not write " + outFileName)
+		return self.errorMessage
+
+	def fileExportSvg (self, event=None):
+		self.fileExport(event, ".svg")
+
+	def fileExport (self, event=None, extension=".png"):
 		canExport = False
 		if self.currentFileName != 'Untitled.tim':
 			if self.currentFileName[-4:] == '.tim' and os.path.exists(self.currentDirName):
@@ -1545,10 +2607,15 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 					canExport = True
 		if canExport == True:
 			fullFileName = os.path.join(self.currentDirName, self.currentFileName[:self.currentFileName.rfind('.')])
-			pixmap.save(fullFileName + ".png")
+			success = self.exportImage(fullFileName + extension)
+			self.updateVirtualView()
 			msg = QMessageBox()
-			msg.setIcon(QMessageBox.Information)
-			msg.setText("Success: Waveform exported to image: " + fullFileName + ".png.")
+			if success:
+				msg.setIcon(QMessageBox.Information)
+				msg.setText("Success: Waveform exported to image: " + fullFileName + extension + ".")
+			else:
+				msg.setIcon(QMessageBox.Critical)
+				msg.setText("Error: Could not export waveform to image: " + fullFileName + extension + ".")
 			msg.setWindowTitle("Waveform Export")
 			msg.exec_()
 
@@ -1578,6 +2645,32 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 		msg.setWindowTitle("About Timing Diagrammer")
 		msg.exec_()
 
+	def zoomBy(self, factor, underMouse = False):
+		factor = min(max(self.zoomFactor * factor, self.zoomMin), self.zoomMax) / self.zoomFactor
+		if factor == 1:
+			return
+		if underMouse == True:
+			#the scene point under the mouse stays where it is
+			self.graphicsView.setTransformationAnchor(QtWidgets.QGraphicsView.AnchorUnderMouse)
+		else:
+			self.graphicsView.setTransformationAnchor(QtWidgets.QGraphicsView.AnchorViewCenter)
+		self.graphicsView.scale(factor, factor)
+		self.zoomFactor *= factor
+		self.placeNameColumn()
+		self.label.setText("Status: Zoom %g%%" % round(100 * self.zoomFactor, 1))
+
+	def viewZoomIn(self, event=None):
+		self.zoomBy(self.zoomStep)
+
+	def viewZoomOut(self, event=None):
+		self.zoomBy(1 / self.zoomStep)
+
+	def viewZoomReset(self, event=None):
+		self.zoomBy(1 / self.zoomFactor)
+
+	def viewMinimap(self, event=None):
+		self.minimap.setVisible(self.actionMinimap.isChecked())
+
 	def optionsAliasing(self, event=None):
 		if self.actionAliasing.isChecked():
 			self.antiAliasedView = True
@@ -1598,1279 +2691,128 @@ class TimingDiagrammer(QtWidgets.QMainWindow, TimingDiagrammerUI.Ui_TimingDiagra
 		msg.setWindowTitle("Timing Diagrammer Notice")
 		msg.exec_()
 
-	def textWidthHeight(self, qtext):
-		boundingRectSize = qtext.boundingRect().toRect().size()
-		#print ("textWidthHeight: called from putText: qtext boundingRectSize = ", boundingRectSize)
-		width = boundingRectSize.width()
-		height = boundingRectSize.height()
-		return width, height
-
-	def putText(self, text, x, y, adjust=True, font="Sans", 
-			fsize=10, color="black", wrapWidth=-1, fill=True, updateViewPort = False):
-		qtext = self.graphicsScene.addText(text, QtGui.QFont(font, fsize, QtGui.QFont.Normal))
-		qtext.setDefaultTextColor(QtGui.QColor(color))
-		if wrapWidth < 10*self.waveHalfPeriod and wrapWidth != -1:
-			qtext.setTextWidth(wrapWidth)
-		elif wrapWidth != -1:
-			qtext.setTextWidth(self.waveHalfPeriod)
-		qtext.setZValue(3)
-		width, height = self.textWidthHeight(qtext)
-		height *= 0.55
-
-		if adjust == True:
-			xCurrent = x - width/2
-			yCurrent = y - height*0.5
-			if fill == True:
-				r = self.graphicsScene.addRect(QtCore.QRectF(xCurrent, yCurrent, width, height*1.2), 
-					QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("white")))
-				r.setZValue(2)
-			qtext.setPos(x - width/2, y - height*0.9)
-			#print ("------------------- putText: xCurrent = ", xCurrent, " -- yCurrent = ", yCurrent)
-		else:
-			xCurrent = x
-			yCurrent = y - height*0.5
-			if fill == True:
-				r = self.graphicsScene.addRect(QtCore.QRectF(xCurrent, yCurrent, width, height*1.2), 
-					QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("white")))
-				r.setZValue(2)
-			qtext.setPos(x, y - height*0.9)
-			#print ("------------------- putText: xCurrent = ", xCurrent, " -- yCurrent = ", yCurrent)
-
-		#anchor
-		self.graphicsScene.addLine(QtCore.QLineF(xCurrent + width + self.xMargin, 0,  xCurrent + width + self.xMargin, 1), QtGui.QPen(Qt.transparent)) 
-		if updateViewPort == True:
-			self.graphicsView.centerOn(
-				xCurrent, 
-				yCurrent)
-
-	def tdDrawSigNamesText(self, text, updateViewPort = False):
-		qtext = self.graphicsScene.addText(text)
-		boundingRectSize = qtext.boundingRect().toRect().size()
-		#print ("tdDrawSigNamesText: called from processCommand: qtext boundingRectSize = ", boundingRectSize)
-		width = boundingRectSize.width()
-		height = boundingRectSize.height()
-
-		x = self.signalNameXSpacing + self.sigNameColWidth
-		y = self.signalWaveYOffset + (self.currentLineNumber - self.linesWithArrow) *\
-			(self.waveHeight + self.signalWaveYSpacing) + self.linesWithArrow * self.arrowLineAdjust
-
-		xCurrent = x - width
-		yCurrent = y - self.waveHeight/2 - height/2
-		qtext.setPos(xCurrent, yCurrent)
-
-		width = max(width, self.signalNameXSpacing + self.sigNameColWidth) - self.signalNameXSpacing - self.sigNameColWidth
-
-		#this anchor is to ensure jpeg export with adequate margins
-		self.graphicsScene.addLine(QtCore.QLineF(-(width + self.xMargin), 0, -(width + self.xMargin), 1), QtGui.QPen(Qt.transparent)) 
-		if updateViewPort == True:
-			self.graphicsView.centerOn(
-				xCurrent, 
-				yCurrent)
-
-	def tdDrawHorizArrow(self, waveCount=-1, thisC=None, nextC=None, basis=(0, 0)):
-		xBasis, yBasis = basis
-		if thisC == '<':
-			if True: #waveCount > 0:
-				if self.maxWaveCount == 0:
-					#draw the grid
-					#FIXME
-					self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
-					#if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
-					#	self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
-					#		yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-					#		xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
-					#		yBasis + self.arrowVertOffset), self.gridOtherPen)
-
-					#elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
-					#	self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
-					#		yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-					#		xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
-					#		yBasis + self.arrowVertOffset), self.gridPen)
-
-			a = xBasis + self.timeDelta
-			c = xBasis + self.waveHalfDuration + self.waveTransitionTime/2 + self.timeDelta
-			if waveCount != 0:
-				a -= self.waveTransitionTime/2
-			self.tdDrawArrowHead((a, yBasis + self.arrowVertOffset), 'L')
-			l = self.graphicsScene.addLine(QtCore.QLineF(a, yBasis + self.arrowVertOffset, 
-									c, yBasis + self.arrowVertOffset))
-			#print ("2. self.currentLineNumber = ", self.currentLineNumber)
-			#print ("2. self.linesWithArrow = ", self.linesWithArrow)
-			#print ("2. yBasis = ", yBasis)
-			#print ("2. offs = ", yBasis + self.arrowVertOffset)
-			self.currentLineArrowLineList.append(l)
-			l.setZValue(1)
-
-			#print ("saw < -- X = ", a, " -- waveCount = ", waveCount, " -- xBasis = ", xBasis, " -- self.timeDelta", self.timeDelta)
-			l = self.graphicsScene.addLine(QtCore.QLineF(a,
-				yBasis + self.arrowVertOffset - self.arrowLineEnds,
-				a, yBasis + self.arrowVertOffset + self.arrowLineEnds))
-			self.currentLineArrowLineList.append(l)
-			l.setZValue(1)
-			self.pendingArrowDelay = self.timeDelta
-			self.timeDelta = 0
-		elif thisC == '-':
-			if waveCount > 0:
-				if self.maxWaveCount == 0:
-					#draw the grid
-					if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
-							yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-							xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
-							yBasis + self.arrowVertOffset + self.waveHeightChange/2), self.gridOtherPen)
-					elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
-							yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-							xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
-							yBasis + self.arrowVertOffset + self.waveHeightChange/2), self.gridPen)
-
-			#print ("saw - -- pendingArrowDelay = ", self.pendingArrowDelay, "timeDelta = ", self.timeDelta)
-			a = xBasis - self.waveTransitionTime/2 + self.pendingArrowDelay
-			c = xBasis + self.waveHalfDuration + self.waveTransitionTime/2 + self.pendingArrowDelay + self.timeDelta
-			if waveCount == 0:
-				a = xBasis + self.timeDelta
-			l = self.graphicsScene.addLine(QtCore.QLineF(a, yBasis + self.arrowVertOffset, c, yBasis + self.arrowVertOffset))
-			self.currentLineArrowLineList.append(l)
-			l.setZValue(1)
-			self.pendingArrowDelay += self.timeDelta
-			self.timeDelta = 0
-
-		elif thisC == '>':
-			a = xBasis - self.waveTransitionTime/2 + self.pendingArrowDelay
-			#print ("saw > -- X = ", a, " -- xBasis = ", xBasis, " -- self.timeDelta", self.timeDelta)
-			
-			self.tdDrawArrowHead((a, yBasis + self.arrowVertOffset), 'R')
-
-			l = self.graphicsScene.addLine(QtCore.QLineF(a, yBasis + self.arrowVertOffset - self.arrowLineEnds,
-				a, yBasis + self.arrowVertOffset + self.arrowLineEnds))
-			self.currentLineArrowLineList.append(l)
-			l.setZValue(1)
-
-			self.timeDelta = 0
-			self.pendingArrowDelay = 0
-
-		self.currentLineHasArrow = True
-
-	def tdPrintOverlayAnnot (self, x0, y0, annot, font="Serif", fsize=15):
-		qtext = self.graphicsScene.addText(annot, QtGui.QFont(font, fsize, QtGui.QFont.Normal))
-		qtext.setPos(int(x0) - fsize, int(y0) - fsize)
-		qtext.setDefaultTextColor(QtGui.QColor(self.dirArrowPenColor))
-		qtext.setZValue(3)
-		self.currentLineOverlayAnnotationQTextList.append(qtext)
-		#print ("tdPrintOverlayAnnot: added currentLineOverlayAnnotationQTextList entry = ", qtext)
-		self.directionArrowTailState = 0
-
-
-	def tdDrawDirectionArrow (self, x0, y0, x1, y1, xm, ym):
-		color = self.dirArrowPenColor
-		xBias = 10 
-		yBias = 10
-
-		xl = (x0 + xm + xBias)/2
-		yl = (y0 + ym + yBias)/2
-
-		path = QPainterPath()
-		path.moveTo(QtCore.QPointF(x0, y0))
-		path.cubicTo(QtCore.QPointF(xl, yl),
-					QtCore.QPointF(xm, ym),
-					QtCore.QPointF(x1, y1))
-		self.graphicsScene.addPath(path, self.dirArrowPen)
-
-		height = ym - y1
-		base = x1 - xm
-		self.tdDrawArrowHeadAngle((x1, y1), (height, base), self.clockArrowSize, color)
-
-	def tdDrawClock(self, waveCount=-1, lastC=None, thisC=None, nextC=None, basis=(0, 0), thisIsLastChar=False):
-		xBasis, yBasis = basis
-		x0 = xBasis
-		localWaveCount = waveCount
-		#print ("tdDrawClock: thisC = ", thisC, " localWaveCount = ", localWaveCount)
-		if (localWaveCount % 2) == 1 and self.clockEvenOddFlip == 0:
-			self.clockEvenOddFlip = 1
-			#swap the pen colors (red/blue)
-			self.gridPen, self.gridOtherPen = self.gridOtherPen, self.gridPen
-			
-		if thisC == 'P': #upper case
-			if lastC == 'l':
-				x0 += self.waveTransitionTime/2
-			
-			#print ("self.riseClockArrow = ", self.riseClockArrow, " self.fallClockArrow = ", self.fallClockArrow)
-			x1 = x0 + self.waveHalfDuration + self.timeDelta
-
-			if lastC == 'l':
-				x1 -= self.waveTransitionTime/2
-
-			if waveCount == 0 or lastC == 'z':
-				x0 += self.waveTransitionTime/2 #tweak to match the start time of non-clock signals or previous tristate signal
-			y0 = yBasis
-			y1 = yBasis
-
-			self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-
-			#print ("Doing P -- EVEN seeing maxWaveCount =", self.maxWaveCount, " localWaveCount", localWaveCount)
-			if self.maxWaveCount == 0:
-				#draw the grid
-				if self.evenGridsEnabled == True and (localWaveCount % 2) == self.clockEvenOddFlip:
-					self.graphicsScene.addLine(QtCore.QLineF(x1 + self.waveTransitionTime/2 - self.timeDelta, 
-						yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2,
-						x1 + self.waveTransitionTime/2 - self.timeDelta, 
-						yBasis), self.gridOtherPen)
-
-			localWaveCount += 1
-
-			x0 = x1 
-			x1 += self.waveTransitionTime
-			y0 = yBasis
-			y1 = yBasis - self.waveHeight
-			self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-			if self.riseClockArrow == True:
-				self.tdDrawArrowHeadAngle((x1, y1), (self.waveHeight, self.waveTransitionTime), self.clockArrowSize)
-
-			x0 = x1
-			x1 += self.waveHalfDuration - self.timeDelta
-			y0 = yBasis - self.waveHeight
-			y1 = yBasis - self.waveHeight
-			self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-
-			#draw the falling edge grid
-			print ("Doing P -- ODD seeing maxWaveCount =", self.maxWaveCount, " localWaveCount", localWaveCount)
-			if self.oddGridsEnabled == True and (localWaveCount % 2) != self.clockEvenOddFlip:
-				self.graphicsScene.addLine(QtCore.QLineF(x1 + self.waveTransitionTime/2, 
-					yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-					x1 + self.waveTransitionTime/2, 
-					yBasis), self.gridPen)
-
-			#print ("thisC is UPPER P and nextC is ", nextC, " cmdNum = ", cmdNum)
-			if nextC in "pP":
-				#print ("CASE UPPER P of P is seen")
-				x0 = x1 
-				x1 += self.waveTransitionTime
-				y0 = yBasis - self.waveHeight
-				y1 = yBasis
-				self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-			elif nextC == 'z':
-				x0 = x1
-				x1 += self.waveTransitionTime
-				y0 = yBasis - self.waveHeight
-				y1 = yBasis - self.waveHeight/2
-				self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-				self.graphicsScene.addLine(QtCore.QLineF(x1, y1, x1 + self.waveTransitionTime/2, y1))
-			elif nextC in 'hfF':
-				x0 = x1
-				x1 += self.waveTransitionTime
-				self.graphicsScene.addLine(QtCore.QLineF(x0, yBasis - self.waveHeight, 
-					x1, yBasis - self.waveHeight))
-				self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis - self.waveHeight, 
-					x1 + self.waveTransitionTime/2, yBasis - self.waveHeight))
-			elif nextC in 'lrR':
-				x0 = x1
-				x1 += self.waveTransitionTime
-				self.graphicsScene.addLine(QtCore.QLineF(x0, yBasis - self.waveHeight, 
-					x1, yBasis))
-				self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis, 
-					x1 + self.waveTransitionTime/2, yBasis))
-			elif nextC in 'DdXx':
-				x0 = x1
-				x1 += self.waveTransitionTime/2
-				#print ("nextC in DdXx")
-				#print ("self.currentColor == ", self.currentColor)
-				if nextC in 'Dd' and self.currentColor != 'x':
-					if self.currentColor in colorMap.keys():
-						color = colorMap[self.currentColor]
-					else:
-						color = "light grey"
-				else:
-					color = "light grey"
-
-				if nextC in 'Xx' or (nextC in 'Dd' and self.currentColor != 'x'):
-					#print ("== seeing nextC in 'Xx' or (nextC in 'Dd' and self.currentColor != 'x')")
-					c = x0 + self.waveTransitionTime
-					#self.canvas.create_polygon(x1, yBasis - self.waveHeight, 
-					#	c + self.waveTransitionTime/2, yBasis - self.waveHeight, c + self.waveTransitionTime/2, yBasis)
-					pointList = [QtCore.QPointF(x1, yBasis - self.waveHeight),
-							QtCore.QPointF(c + self.waveTransitionTime/2, yBasis - self.waveHeight),
-							QtCore.QPointF(c + self.waveTransitionTime/2, yBasis)]
-						
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-
-				self.graphicsScene.addLine(QtCore.QLineF(x0, yBasis - self.waveHeight, x1, yBasis - self.waveHeight))
-				x0 = x1
-				x1 += self.waveTransitionTime
-				self.graphicsScene.addLine(QtCore.QLineF(x0, yBasis - self.waveHeight, 
-					x1, yBasis - self.waveHeight))
-				self.graphicsScene.addLine(QtCore.QLineF(x0, yBasis - self.waveHeight, 
-					x1, yBasis))
-
-			if self.fallClockArrow == True:
-				self.tdDrawArrowHeadAngle((x0+self.waveTransitionTime, y1), (-self.waveHeight, self.waveTransitionTime), self.clockArrowSize)
-				
-		elif thisC == 'p': #lower case
-			#print ("Doing small p -- at the beginning seeing riseClockArrow =", self.riseClockArrow)
-			if lastC == 'l':
-				x0 += self.waveTransitionTime/2
-			
-			x1 = x0 + self.waveHalfDuration + self.waveTransitionTime/2 + self.timeDelta
-			
-			if lastC == 'l':
-				x1 -= self.waveTransitionTime/2
-
-			if waveCount == 0 or lastC == 'z':
-				x0 += self.waveTransitionTime/2 #tweak to match the start time of non-clock signals or previous tristate signal
-			y0 = yBasis
-			y1 = yBasis
-			self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-
-			#print ("Doing small p -- EVEN seeing maxWaveCount =", self.maxWaveCount, " localWaveCount", localWaveCount)
-			if self.maxWaveCount == 0:
-				#draw the grid
-				if self.evenGridsEnabled == True and (localWaveCount % 2) == self.clockEvenOddFlip:
-					self.graphicsScene.addLine(QtCore.QLineF(x1 - self.timeDelta, 
-						yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-						x1 - self.timeDelta, 
-						yBasis), self.gridOtherPen)
-
-			localWaveCount += 1
-
-			x0 = x1 
-			y0 = yBasis
-			y1 = yBasis - self.waveHeight
-			self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-			if self.riseClockArrow == True:
-				self.tdDrawArrowHeadAngle((x1, y1), (1, 0), self.clockArrowSize)
-
-			x1 += self.waveHalfPeriod - self.timeDelta
-			y0 = yBasis - self.waveHeight
-			y1 = yBasis - self.waveHeight
-			self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-			
-			#draw the falling edge grid
-			#print ("Doing small p -- ODD seeing maxWaveCount =", self.maxWaveCount, " localWaveCount", localWaveCount)
-			if self.oddGridsEnabled == True and (localWaveCount % 2) != self.clockEvenOddFlip:
-				self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-					x1,	yBasis), self.gridPen)
-
-			if nextC in "pP":
-				#print ("CASE P of P is seen")
-				x0 = x1
-				y0 = yBasis - self.waveHeight
-				y1 = yBasis
-				self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1)) 
-
-				x1 += self.waveTransitionTime/2 
-				y0 = yBasis
-				y1 = yBasis
-				self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-			elif nextC == 'z':
-				x0 = x1
-				x1 += self.waveTransitionTime
-				y0 = yBasis - self.waveHeight
-				y1 = yBasis - self.waveHeight/2
-				self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1)) 
-			elif nextC in 'hfF':
-				x0 = x1
-				x1 += self.waveTransitionTime
-				self.graphicsScene.addLine(QtCore.QLineF(x0, yBasis - self.waveHeight, 
-					x1, yBasis - self.waveHeight))
-			elif nextC in 'lrR':
-				x0 = x1
-				x1 += self.waveTransitionTime
-				self.graphicsScene.addLine(QtCore.QLineF(x0, yBasis - self.waveHeight, 
-					x1, yBasis))
-			elif nextC in 'DdXx':
-				x0 = x1
-				x1 += self.waveTransitionTime
-				if nextC in 'Dd' and self.currentColor != 'x':
-					if self.currentColor in colorMap.keys():
-						color = colorMap[self.currentColor]
-					else:
-						color = "light grey"
-				else:
-					color = "light grey"
-
-				if nextC in 'Xx' or (nextC in 'Dd' and self.currentColor != 'x'):
-					c = x0# + self.waveTransitionTime
-					pointList = [QtCore.QPointF(x0, yBasis - self.waveHeight),
-							QtCore.QPointF(x0 + self.waveTransitionTime, yBasis - self.waveHeight),
-							QtCore.QPointF(x0 + self.waveTransitionTime, yBasis)]
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-					#self.canvas.create_polygon(x0, yBasis - self.waveHeight, 
-					#	c + self.waveTransitionTime, yBasis - self.waveHeight, c + self.waveTransitionTime, yBasis)
-
-				self.graphicsScene.addLine(QtCore.QLineF(x0, yBasis - self.waveHeight, 
-					x1, yBasis - self.waveHeight))
-				self.graphicsScene.addLine(QtCore.QLineF(x0, yBasis - self.waveHeight, 
-					x1, yBasis))
-					
-			if self.fallClockArrow == True:
-				self.tdDrawArrowHeadAngle((x0, y1), (-1, 0), self.clockArrowSize)
-
-			#add total of waveTransitionTime/2 for pckq pulses
-			if thisIsLastChar == True:
-				x0 += self.waveTransitionTime/2
-				self.graphicsScene.addLine(QtCore.QLineF(x0, y1, x0 + self.waveTransitionTime/2, y1))
-
-		#add waveTransitionTime/4 for PCKQ pulses
-		if thisIsLastChar == True and thisC == "P":
-			x0 = xBasis + 2 * self.waveHalfDuration + 2 * self.waveTransitionTime
-			self.graphicsScene.addLine(QtCore.QLineF(x0, yBasis, 
-				x0 + self.waveTransitionTime/2, yBasis))
-
-		waveCount += 2
-		self.timeDelta = 0
-
-	def tdDrawFall(self, waveCount=-1, thisC=None, nextC=None, basis=(0, 0)):
-		xBasis, yBasis = basis
-		x0 = xBasis + self.waveTransitionTime/2
-		x1 = x0 + self.waveHalfDuration - self.timeDelta
-		y0 = yBasis - self.waveHeight
-		y1 = yBasis - self.waveHeight
-		self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-		color = "light grey"
-
-		if nextC in "dxDXpP":
-			if nextC in 'Dd' and self.currentColor != 'x':
-				if self.currentColor in colorMap.keys():
-					color = colorMap[self.currentColor]
-
-			if nextC in 'xX' or (nextC in 'dD' and self.currentColor != 'x'):
-				c = x1 + self.waveTransitionTime + self.timeDelta
-				pointList = [QtCore.QPointF(x1, yBasis - self.waveHeight), 
-							QtCore.QPointF(c, yBasis - self.waveHeight), 
-							QtCore.QPointF(c, yBasis), 
-							QtCore.QPointF(c - self.timeDelta, yBasis)]
-				self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-
-			if nextC in "pP":
-				self.graphicsScene.addLine(QtCore.QLineF(x1, y1, x1 + self.waveTransitionTime/2, yBasis))
-				self.graphicsScene.addLine(QtCore.QLineF(x1 + self.waveTransitionTime/2, yBasis, x1 + self.timeDelta + self.waveTransitionTime, yBasis))
-			else:
-				self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime, yBasis))
-
-			if nextC in 'dxDX':
-				self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime + self.timeDelta, y0))
-		elif nextC in 'hf':
-			self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2))
-			self.graphicsScene.addLine(QtCore.QLineF(x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2, x1 + self.waveTransitionTime, yBasis - self.waveHeight))
-			self.graphicsScene.addLine(QtCore.QLineF(x1 + self.waveTransitionTime, yBasis - self.waveHeight, x1 + self.waveTransitionTime + self.timeDelta, yBasis - self.waveHeight))
-		elif nextC == 'z':
-			self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight/2))
-			self.graphicsScene.addLine(QtCore.QLineF(x1 + self.waveTransitionTime, yBasis - self.waveHeight/2, 
-				x1 + self.waveTransitionTime + self.timeDelta, yBasis - self.waveHeight/2))
-
-		self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
-		#FIXME
-		#if self.maxWaveCount == 0:
-		#	#draw the grid
-		#	if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
-		#		self.graphicsScene.addLine(QtCore.QLineF(x1 + self.timeDelta, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-		#			x1 + self.timeDelta, yBasis), self.gridOtherPen)
-		#	elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
-		#		self.graphicsScene.addLine(QtCore.QLineF(x1 + self.timeDelta, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-		#			x1 + self.timeDelta, yBasis), self.gridPen)
-
-		x0 = x1
-		x1 += self.waveTransitionTime
-		y0 = yBasis - self.waveHeight
-		y1 = y0 + self.waveHeight
-		#if nextC != 'h' and nextC != 'z' and nextC != 'f':
-		if nextC not in 'hzfFpP':
-			if thisC == 'F':
-				pointList = [QtCore.QPointF(x0, y0),
-							QtCore.QPointF(x0 + self.waveTransitionTime, y0),
-							QtCore.QPointF(x1 + self.waveTransitionTime, y1),
-							QtCore.QPointF(x0 + self.waveTransitionTime, y1)]
-				self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-				self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x0 + self.waveTransitionTime, y0))
-				self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveTransitionTime, y0, x1 + self.waveTransitionTime, y1))
-				if nextC not in 'Fl': #anirb - 27-Dec-2022
-					self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveTransitionTime, y1, x1 + self.waveTransitionTime, y1))
-
-			self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-			self.graphicsScene.addLine(QtCore.QLineF(x1, y1, x1 + self.timeDelta, y1))
-		elif nextC == 'F':
-			self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1 + self.timeDelta, y0))
-		self.pendingTimeDelta = self.timeDelta
-
-	def tdDrawRise (self, waveCount=-1, thisC=None, nextC=None, basis=(0, 0)):
-		#print ("Doing r -- at the beginning seeing timeDelta =", self.timeDelta)
-		#print ("Doing 'r' -- at the beginning -- invertedClockHeight = ", invertedClockHeight)
-		xBasis, yBasis = basis
-		x0 = xBasis + self.waveTransitionTime/2
-		x1 = x0 + self.waveHalfDuration - self.timeDelta
-		y0 = yBasis
-		y1 = yBasis
-		self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-		color = "light grey"
-
-		if nextC in "dxDX":
-			if nextC in 'xX' or (nextC in 'Dd' and self.currentColor != 'x'):
-				if nextC in 'Dd' and self.currentColor != 'x':
-					if self.currentColor in colorMap.keys():
-						color = colorMap[self.currentColor]
-					else:
-						color = "light grey"
-
-				c = x1 + self.waveTransitionTime + self.timeDelta
-				pointList = [QtCore.QPointF(x1, yBasis), 
-							QtCore.QPointF(c, yBasis), 
-							QtCore.QPointF(c, yBasis - self.waveHeight), 
-							QtCore.QPointF(c - self.timeDelta, yBasis - self.waveHeight)]
-				self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-			self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis, x1 + self.waveTransitionTime + self.timeDelta, yBasis))
-		elif nextC in 'lr':
-			self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2))
-			self.graphicsScene.addLine(QtCore.QLineF(x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2, x1 + self.waveTransitionTime, yBasis))
-			self.graphicsScene.addLine(QtCore.QLineF(x1 + self.waveTransitionTime, yBasis, x1 + self.waveTransitionTime + self.timeDelta, yBasis))
-		elif nextC in 'pP':
-			self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis, x1 + self.waveTransitionTime/2 + self.timeDelta, yBasis))
-		elif nextC == 'z':
-			self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight/2))
-			self.graphicsScene.addLine(QtCore.QLineF(x1 + self.waveTransitionTime, yBasis - self.waveHeight/2, 
-				x1 + self.waveTransitionTime + self.timeDelta, yBasis - self.waveHeight/2))
-
-		self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
-		#FIXME
-		#if self.maxWaveCount == 0:
-		#	#draw the grid
-		#	if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
-		#		self.graphicsScene.addLine(QtCore.QLineF(x1 + self.timeDelta, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-		#			x1 + self.timeDelta, yBasis), self.gridOtherPen)
-		#	elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
-		#		self.graphicsScene.addLine(QtCore.QLineF(x1 + self.timeDelta, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-		#			x1 + self.timeDelta, yBasis), self.gridPen)
-
-		x0 = x1 
-		x1 += self.waveTransitionTime
-		y0 = yBasis
-		y1 = yBasis - self.waveHeight
-		if nextC not in 'lzrRpP':
-			if thisC == 'R':
-				pointList = [QtCore.QPointF(x0, y0),
-							QtCore.QPointF(x0 + self.waveTransitionTime, y1),
-							QtCore.QPointF(x1 + self.waveTransitionTime, y1),
-							QtCore.QPointF(x0 + self.waveTransitionTime, y0)]
-				self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-				self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x0 + self.waveTransitionTime, y0))
-				self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveTransitionTime, y0, x1 + self.waveTransitionTime, y1))
-				if nextC not in 'Rh': #anirb - 27-Dec-2022
-					self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveTransitionTime, y1, x1 + self.waveTransitionTime, y1))
-			self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-			if self.timeDelta > 0:
-				self.graphicsScene.addLine(QtCore.QLineF(x1, y1, x1 + self.timeDelta, y1))
-		elif nextC == 'R':
-			self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1 + self.timeDelta, y0))
-		self.pendingTimeDelta = self.timeDelta
-
-	def tdDrawHigh (self, waveCount=-1, nextC=None, basis=(0, 0)):
-		xBasis, yBasis = basis
-		x0 = xBasis + self.waveTransitionTime/2
-		if nextC in "zldxDXrRpP":
-			x1 = x0 + self.waveHalfDuration
-		else:
-			x1 = x0 + self.waveHalfPeriod
-
-		y0 = yBasis - self.waveHeight
-		y1 = y0
-		self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-		if nextC in "ldxDXrR":
-			#print ("== seeing h and nextC in ldxDXrRpP")
-			if nextC in 'Dd' and self.currentColor != 'x':
-				if self.currentColor in colorMap.keys():
-					color = colorMap[self.currentColor]
-				else:
-					color = "light grey"
-			else:
-				color = "light grey"
-
-			if nextC in 'xX' or nextC == 'X' or (nextC in 'Dd' and self.currentColor != 'x'):
-				c = x1 + self.waveTransitionTime
-				pointList = [QtCore.QPointF(x1, yBasis - self.waveHeight), 
-							QtCore.QPointF(c, yBasis - self.waveHeight), 
-							QtCore.QPointF(c, yBasis)]
-				self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-			if nextC in 'dxDX':
-				self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime, y0))
-			self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime, yBasis))
-		elif nextC == 'z':
-			self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight/2))
-		elif nextC in 'pP':
-			self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime/2, yBasis))
-
-		self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
-		#if self.maxWaveCount == 0:
-		#	#draw the grid
-		#	if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
-		#		self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-		#			x0 + self.waveHalfDuration, yBasis), self.gridOtherPen)
-		#	elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
-		#		self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-		#			x0 + self.waveHalfDuration, yBasis), self.gridPen)
-
-	def tdDrawLow (self, waveCount=-1, nextC=None, lastC=None, basis=(0, 0)):
-		xBasis, yBasis = basis
-		if lastC.lower() in "cpkq" and waveCount != 0:
-			x0 = xBasis
-		else:
-			x0 = xBasis + self.waveTransitionTime/2
-
-		if nextC in "zhdxDXfF":
-			x1 = x0 + self.waveHalfDuration
-		else:
-			x1 = x0 + self.waveHalfPeriod
-
-		if lastC.lower() in "cpkq" and waveCount != 0:
-			x1 += self.waveTransitionTime/2
-
-		y0 = yBasis
-		y1 = y0
-		self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1, y1))
-
-		if nextC in "hdxDXfF":
-			#if nextC in "h" and waveCount != 0:
-			#	x1 -= self.waveTransitionTime/2
-
-			if nextC in 'Dd' and self.currentColor != 'x':
-				if self.currentColor in colorMap.keys():
-					color = colorMap[self.currentColor]
-				else:
-					color = "light grey"
-			else:
-				color = "light grey"
-
-			if nextC in 'xX' or (nextC in 'Dd' and self.currentColor != 'x'):
-				#print ("== seeing l and nextC in xdDX")
-				c = x1 + self.waveTransitionTime
-				pointList = [QtCore.QPointF(x1, yBasis), 
-							QtCore.QPointF(c, yBasis), 
-							QtCore.QPointF(c, yBasis - self.waveHeight)]
-				self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-
-			if nextC in 'dxDX':
-				self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis, x1 + self.waveTransitionTime, yBasis))
-			self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight))
-		elif nextC == 'z':
-			self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight/2))
-
-		self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
-
-	def tdDrawDatadx(self, waveCount=-1, lastC=None, thisC=None, nextC=None, basis=(0, 0)):
-		#print ("tdDrawDatadx: thisC=", thisC, " nextC=", nextC, " lastC=", lastC)
-		#print ("tdDrawDatadx: self.currentColor=", self.currentColor, " self.pendingTimeDelta=", self.pendingTimeDelta, " lastC=", lastC)
-		#print ("tdDrawDatadx: self.waveHeightChange = ", self.waveHeightChange)
-		xBasis, yBasis = basis
-		color = "light grey"
-		if self.currentColor in colorMap.keys():
-			color = colorMap[self.currentColor]
-
-		#only clocks with zero rise/fall times
-		lastWasClock = (lastC == "c" or lastC == "p") and waveCount != 0
-		
-		if lastWasClock:
-			x0 = xBasis - self.waveTransitionTime/2
-		else:
-			x0 = xBasis + self.waveTransitionTime/2
-
-		self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
-		#FIXME
-		#if self.maxWaveCount == 0:
-		#	#draw the grid
-		#	if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
-		#		self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-		#			x0 + self.waveHalfDuration, yBasis), self.gridOtherPen)
-		#	elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
-		#		self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-		#			x0 + self.waveHalfDuration, yBasis), self.gridPen)
-
-		if nextC in "zlhrRfFPp" or\
-				(thisC == 'd' and (nextC in 'xX')) or\
-				(thisC == 'x' and (nextC in 'dDX')):
-			x1 = x0 + self.waveHalfDuration
-		else:
-			x1 = x0 + self.waveHalfPeriod
-
-		if lastWasClock:
-			x1 += self.waveTransitionTime
-
-		if thisC == 'x' or (thisC == 'd' and self.currentColor != 'x'):
-			#print ("if A --------")
-			y0 = yBasis
-			y1 = yBasis
-			a = x0
-			b = y0
-			c = x1
-			d = y0
-			y0 = yBasis - self.waveHeight
-			y1 = y0
-			e = c
-			f = y0
-			g = a
-			if lastC == 'R':
-				g += self.waveTransitionTime
-			if lastC == 'F':
-				a += self.waveTransitionTime
-			h = f
-
-			pointList = [QtCore.QPointF(a - self.pendingTimeDelta, b),
-						QtCore.QPointF(c, d),
-						QtCore.QPointF(e, f),
-						QtCore.QPointF(g - self.pendingTimeDelta, h)]
-			if (thisC == 'd' and self.currentColor != 'x'):
-				self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-				if lastC in 'DXzxhlrRfF':
-					if lastC == 'z':
-						pointList = [QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis),
-								QtCore.QPointF(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight/2),
-								QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight)]
-					elif lastC in 'lr':
-						pointList = [QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight),
-								QtCore.QPointF(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis),
-								QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)]
-					elif lastC in 'hf':
-						pointList = [QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight),
-								QtCore.QPointF(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight),
-								QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)]
-					else:
-						pointList = [QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis),
-							QtCore.QPointF(xBasis - self.pendingTimeDelta, yBasis - self.waveHeight/2),
-							QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight)]
-					if lastC != 'R' and lastC != 'F':
-						self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-
-					if lastC in 'lrR':
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
-							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis))
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis,
-							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis))
-						if lastC == 'R':
-							l = self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 + self.waveTransitionTime - self.pendingTimeDelta, yBasis - self.waveHeight, 
-								xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis))
-					elif lastC in 'hfF':
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2, yBasis - self.waveHeight, 
-							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight))
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight,
-							xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis))
-						if lastC == 'F':
-							self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 + self.waveTransitionTime - self.pendingTimeDelta, yBasis, 
-								xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight))
-			else:
-				self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-
-			if nextC == 'z':
-				c = x1 + self.waveTransitionTime
-				d = yBasis - self.waveHeight/2
-				pointList = [QtCore.QPointF(x1, yBasis),
-							QtCore.QPointF(c, d),
-							QtCore.QPointF(x1, yBasis - self.waveHeight)]
-				if (thisC == 'd' and self.currentColor != 'x'):
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-				else:
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-			elif nextC in 'lrR' or nextC == 'p' or nextC == 'P':
-				c = x1 + self.waveTransitionTime
-				pointList = [QtCore.QPointF(x1, yBasis),
-							QtCore.QPointF(c, yBasis),
-							QtCore.QPointF(x1, yBasis - self.waveHeight)]
-				if (thisC == 'd' and self.currentColor != 'x'):
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-				else:
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-			elif nextC in 'hfF':
-				c = x1 + self.waveTransitionTime
-				pointList = [QtCore.QPointF(x1, yBasis),
-							QtCore.QPointF(x1, yBasis - self.waveHeight),
-							QtCore.QPointF(c, yBasis - self.waveHeight)]
-				if (thisC == 'd' and self.currentColor != 'x'):
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-				else:
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-			elif nextC in 'dXD' or (thisC == 'd' and nextC == 'x'): 
-				a = x1 + self.waveTransitionTime/2
-				c = x1 + self.waveTransitionTime
-				if (thisC == 'd' and self.currentColor != 'x'):
-					pointList = [QtCore.QPointF(x1, yBasis),
-								QtCore.QPointF(x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2),
-								QtCore.QPointF(x1, yBasis - self.waveHeight)]
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-					if nextC in 'xX':
-						pointList = [QtCore.QPointF(x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2),
-									QtCore.QPointF(x1 + self.waveTransitionTime, yBasis),
-									QtCore.QPointF(x1 + self.waveTransitionTime, yBasis - self.waveHeight)]
-						self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-						self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis, x1 + self.waveTransitionTime, yBasis - self.waveHeight))
-						self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis))
-				else:
-					#print ("if B --------")
-					if nextC in 'dD':
-						#print ("if C --------")
-						pointList = [QtCore.QPointF(x1, yBasis),
-								QtCore.QPointF(x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2),
-								QtCore.QPointF(x1, yBasis - self.waveHeight)]
-						self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-					else: #'X'
-						#print ("if D --------")
-						pointList = [QtCore.QPointF(x1, yBasis),
-								QtCore.QPointF(x1 + self.waveTransitionTime, yBasis),
-								QtCore.QPointF(x1 + self.waveTransitionTime, yBasis - self.waveHeight),
-								QtCore.QPointF(x1, yBasis - self.waveHeight)]
-						self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-						
-				if thisC == 'x':
-					if nextC in 'dD' and self.currentColor != 'x':
-						pointList = [QtCore.QPointF(x1 + self.waveTransitionTime, yBasis),
-								QtCore.QPointF(a, yBasis - self.waveHeight/2),
-								QtCore.QPointF(x1 + self.waveTransitionTime, yBasis - self.waveHeight)]
-						self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-						self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis, x1 + self.waveTransitionTime, yBasis - self.waveHeight))
-						self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis))
-					elif nextC in 'dD':
-						self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis, x1 + self.waveTransitionTime, yBasis - self.waveHeight))
-						self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis))
-					elif nextC in 'X':
-						pointList = [QtCore.QPointF(x1 + self.waveTransitionTime, yBasis),
-								QtCore.QPointF(a, yBasis - self.waveHeight/2),
-								QtCore.QPointF(x1 + self.waveTransitionTime, yBasis - self.waveHeight)]
-						self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-						self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis - self.waveHeight))
-						self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis, x1 + self.waveTransitionTime, yBasis))
-		elif thisC == 'd'and nextC in 'xX':
-			#print ("if B --------")
-			pointList = [QtCore.QPointF(x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2),
-					QtCore.QPointF(x1 + self.waveTransitionTime, yBasis),
-					QtCore.QPointF(x1 + self.waveTransitionTime, yBasis - self.waveHeight)]
-			self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-			self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis, x1 + self.waveTransitionTime, yBasis - self.waveHeight))
-			self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis))
-
-		y0 = yBasis
-		y1 = y0
-		self.graphicsScene.addLine(QtCore.QLineF(x0 - self.pendingTimeDelta, y0, x1, y1))
-		y0 = yBasis - self.waveHeight
-		y1 = y0
-		self.graphicsScene.addLine(QtCore.QLineF(x0 - self.pendingTimeDelta, y0, x1, y1))
-
-		if nextC in 'pP':
-			self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis, x1 + self.waveTransitionTime, yBasis))
-			self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis))
-		elif nextC in 'lrR':
-			self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime, yBasis))
-			self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis, x1 + self.waveTransitionTime, yBasis))
-		elif nextC in 'hfF':
-			self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight))
-			self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis, x1 + self.waveTransitionTime, yBasis - self.waveHeight))
-		elif nextC == 'z':
-			self.graphicsScene.addLine(QtCore.QLineF(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight/2))
-			self.graphicsScene.addLine(QtCore.QLineF(x1, yBasis, x1 + self.waveTransitionTime, yBasis - self.waveHeight/2))
-		
-		if (thisC == 'd' and self.currentColor != 'x'):
-			if waveCount != 0 and lastC in 'DXzx':
-				if lastC == 'z':
-					self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis, 
-						xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight/2))
-					self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
-						xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight/2))
-				else:
-					self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis, 
-						xBasis - self.pendingTimeDelta, yBasis - self.waveHeight/2))
-					self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
-						xBasis - self.pendingTimeDelta, yBasis - self.waveHeight/2))
-
-				self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis, x1 - self.pendingTimeDelta, yBasis))
-				self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, x1 - self.pendingTimeDelta, yBasis - self.waveHeight))
-		self.pendingTimeDelta = 0
-
-	def tdDrawDataDX(self, waveCount=-1, lastC=None, thisC=None, nextC=None, basis=(0, 0)):
-		#print ("tdDrawDataDX: thisC=", thisC, " ord nextC=", ord(nextC), nextC, " lastC=", lastC)
-		#print ("tdDrawDataDX: at start, self.pendingTimeDelta=", self.pendingTimeDelta)
-		xBasis, yBasis = basis
-		if (lastC == "P" or lastC == "p") and waveCount != 0:
-			x0 = xBasis
-		else:
-			x0 = xBasis + self.waveTransitionTime/2
-		x1 = x0 + self.waveHalfDuration
-		y0 = yBasis
-		y1 = y0
-
-		self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
-		#FIXME
-		#if self.maxWaveCount == 0:
-		#	#draw the grid
-		#	if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
-		#		self.graphicsScene.addLine(QtCore.QLineF(x1, y0 - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, x1, y0), self.gridOtherPen)
-		#	elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
-		#		self.graphicsScene.addLine(QtCore.QLineF(x1, y0 - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, x1, y0), self.gridPen)
-
-		a = x0
-		b = y0
-		c = x1
-		d = y1
-		x0 = x1
-		x1 += self.waveTransitionTime
-		e = c + self.waveTransitionTime/2
-		f = y1 - self.waveHeight/2
-		y1 -= self.waveHeight
-		g = c
-		h = y1 
-		i = a
-		if lastC == 'R':
-			i += self.waveTransitionTime
-		elif lastC == 'F':
-			a += self.waveTransitionTime
-		j = h
-		color = "light grey"
-		if self.currentColor in colorMap.keys():
-			color = colorMap[self.currentColor]
-
-		#print ("tdDrawDataDX: 0. thisC == 'D' and self.currentColor = ", self.currentColor)
-		if thisC == 'X' or (thisC == 'D' and self.currentColor != 'x'):
-			if (thisC == 'D' and self.currentColor != 'x'):
-				#print ("tdDrawDataDX: 1. thisC == 'D' and self.currentColor != 'x'")
-				pointList = [QtCore.QPointF(a - self.pendingTimeDelta, b),
-							QtCore.QPointF(c - self.timeDelta, d),
-							QtCore.QPointF(e - self.timeDelta, y1 + self.waveHeight/2),
-							QtCore.QPointF(g - self.timeDelta, h),
-							QtCore.QPointF(i - self.pendingTimeDelta, j)]
-				self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-				if lastC in 'DXzxhlrRfF':
-					#FIX PR0
-					# to handle cases like: D$rD - when the first D is seen, the color is not yet known, so the
-					#left triangle for the next D cannot be filled - it must be deferred when the next D is being
-					#processed as thisC
-					if lastC == 'z':
-						pointList = [QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis),
-								QtCore.QPointF(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight/2),
-								QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight)]
-					elif lastC in 'lr':
-						pointList = [QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight),
-								QtCore.QPointF(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis),
-								QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)]
-					elif lastC in 'hf':
-						pointList = [QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight),
-								QtCore.QPointF(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight),
-								QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)]
-					else:
-						pointList = [QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis),
-								QtCore.QPointF(xBasis - self.pendingTimeDelta, yBasis - self.waveHeight/2),
-								QtCore.QPointF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight)]
-					if lastC != 'R' and lastC != 'F':
-						self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-
-					if lastC == 'z':
-						#redo the angled lines only if last was D or X or z
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis, 
-							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight/2))
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
-							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight/2))
-					elif lastC in 'DXx':
-						#print ("tdDrawDataDX: 1. waveCount != 0 and lastC in 'DX'")
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis, 
-							xBasis - self.pendingTimeDelta, yBasis - self.waveHeight/2))
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
-							xBasis - self.pendingTimeDelta, yBasis - self.waveHeight/2))
-					elif lastC in 'lrR':
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
-							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis))
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis,
-							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis))
-						if lastC == 'R':
-							self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 + self.waveTransitionTime - self.pendingTimeDelta, yBasis - self.waveHeight, 
-								xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis))
-					elif lastC in 'hfF':
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2, yBasis - self.waveHeight, 
-							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight))
-						self.graphicsScene.addLine(QtCore.QLineF(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight,
-							xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis))
-						if lastC == 'F':
-							self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 + self.waveTransitionTime - self.pendingTimeDelta, yBasis, 
-								xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight))
-				#horizontal lines
-				if lastC in 'DXzrR':
-					self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
-						xBasis + self.waveTransitionTime/2, yBasis - self.waveHeight))
-					self.graphicsScene.addLine(QtCore.QLineF(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis, 
-						xBasis + self.waveTransitionTime/2, yBasis))
-			else:
-				pointList = [QtCore.QPointF(a, b),
-							QtCore.QPointF(c - self.timeDelta, d),
-							QtCore.QPointF(e - self.timeDelta, y1 + self.waveHeight/2),
-							QtCore.QPointF(g - self.timeDelta, h),
-							QtCore.QPointF(i, j)]
-				self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-
-			if nextC == 'z':
-				a = x1 - self.waveTransitionTime
-				c = x1
-				d = yBasis - self.waveHeight/2
-				pointList = [QtCore.QPointF(x1 - self.waveTransitionTime - self.timeDelta, yBasis),
-						QtCore.QPointF(x1 - self.timeDelta, d),
-						QtCore.QPointF(x1 - self.waveTransitionTime - self.timeDelta, yBasis - self.waveHeight)]
-				if (thisC == 'D' and self.currentColor != 'x'):
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-				else:
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-			elif nextC in 'dxXD':
-				#print ("tdDrawDataDX: A. nextC in 'dxXD'")
-				a = x1
-				e = x1 - self.waveTransitionTime/2
-				f = yBasis - self.waveHeight/2
-				if nextC in 'xX':
-					pointList = [QtCore.QPointF(a, yBasis),
-							QtCore.QPointF(a, yBasis - self.waveHeight),
-							QtCore.QPointF(a - self.timeDelta, yBasis - self.waveHeight),
-							QtCore.QPointF(e - self.timeDelta, yBasis - self.waveHeight/2),
-							QtCore.QPointF(a - self.timeDelta, yBasis)]
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-				elif self.currentColor != 'x':
-					pointList = [QtCore.QPointF(a, yBasis),
-							QtCore.QPointF(a, yBasis - self.waveHeight),
-							QtCore.QPointF(a - self.timeDelta, yBasis - self.waveHeight),
-							QtCore.QPointF(e - self.timeDelta, yBasis - self.waveHeight/2),
-							QtCore.QPointF(a - self.timeDelta, yBasis)]
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-			elif nextC in 'hfF':
-				#print ("thisC == 'X' or (thisC == 'D' and self.currentColor != 'x') === and === nextC in 'hfF'")
-				a = x1 - self.waveTransitionTime
-				d = yBasis - self.waveHeight
-				pointList = [QtCore.QPointF(a - self.timeDelta, yBasis),
-						QtCore.QPointF(a - self.timeDelta, d),
-						QtCore.QPointF(x1 - self.timeDelta, d)]
-				if thisC == 'D' and self.currentColor != 'x':
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-				else:
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-			elif nextC in 'lrRpP':
-				a = x1 - self.waveTransitionTime
-				d = yBasis
-				pointList = [QtCore.QPointF(a - self.timeDelta, yBasis - self.waveHeight),
-						QtCore.QPointF(a - self.timeDelta, d),
-						QtCore.QPointF(x1 - self.timeDelta, d)]
-				if thisC == 'D' and self.currentColor != 'x':
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-				else:
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-		elif thisC == 'D':
-			if nextC in 'xXdD':
-				#print ("tdDrawDataDX: B. nextC in 'dxXD', self.currentColor = ", self.currentColor)
-				a = x1 - self.waveTransitionTime/2
-				c = x1
-				f = yBasis - self.waveHeight
-				pointList = [QtCore.QPointF(a - self.timeDelta, yBasis - self.waveHeight/2),
-						QtCore.QPointF(c - self.timeDelta, yBasis),
-						QtCore.QPointF(c, yBasis),
-						QtCore.QPointF(c, yBasis - self.waveHeight),
-						QtCore.QPointF(c - self.timeDelta, yBasis - self.waveHeight)]
-				if nextC in 'xX':
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-				elif self.currentColor != 'x':
-					self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-
-
-		if nextC == 'z':
-			gx1 = xBasis + self.waveTransitionTime/2 + self.waveHalfDuration
-			#draw lines last
-			self.graphicsScene.addLine(QtCore.QLineF(gx1 - self.timeDelta, yBasis - self.waveHeight, 
-						gx1 + self.waveTransitionTime - self.timeDelta, yBasis - self.waveHeight/2))
-			self.graphicsScene.addLine(QtCore.QLineF(gx1 - self.timeDelta, yBasis, 
-						gx1 + self.waveTransitionTime - self.timeDelta, yBasis - self.waveHeight/2))
-			self.graphicsScene.addLine(QtCore.QLineF(gx1 + self.waveTransitionTime - self.timeDelta, yBasis - self.waveHeight/2, 
-				x1, yBasis - self.waveHeight/2), self.triPen)
-
-		if nextC not in 'zlrRpP':
-			#angled line to top
-			self.graphicsScene.addLine(QtCore.QLineF(x0 - self.timeDelta, y0, x1 - self.timeDelta, y1))
-			if nextC in 'hfF':
-				self.graphicsScene.addLine(QtCore.QLineF(x0 - self.timeDelta, y1, x1 - self.timeDelta, y1))
-		elif nextC in 'lrR':
-			self.graphicsScene.addLine(QtCore.QLineF(x0 - self.timeDelta, y0, x1 - self.timeDelta, y0))
-		elif nextC in 'pP':
-			self.graphicsScene.addLine(QtCore.QLineF(x0 - self.timeDelta, y1, x0 + self.waveTransitionTime - self.timeDelta, y0))
-			self.graphicsScene.addLine(QtCore.QLineF(x0 - self.timeDelta, y0, x1 - self.timeDelta, y0))
-
-		x0 = xBasis + self.waveTransitionTime/2
-		x1 = x0 + self.waveHalfDuration
-		y0 = yBasis - self.waveHeight
-		#horizontal line at top
-		self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1 - self.timeDelta, y0)) 
-		x0 = x1
-		x1 += self.waveTransitionTime
-		y0 = yBasis - self.waveHeight
-		y1 = yBasis
-		if nextC not in 'zhfF':
-			#angled line to bottom
-			self.graphicsScene.addLine(QtCore.QLineF(x0 - self.timeDelta, y0, x1 - self.timeDelta, y1))
-
-			#additional bottom lines needed to the right of crossover when timeDelta is enabled
-			self.graphicsScene.addLine(QtCore.QLineF(x1 - self.timeDelta, y1, x1, y1)) 
-
-		if nextC not in 'lrRzpP':
-			#additional top lines needed to the right of crossover when timeDelta is enabled
-			self.graphicsScene.addLine(QtCore.QLineF(x1 - self.timeDelta, y0, x1, y0))
-
-		x0 = xBasis + self.waveTransitionTime/2
-		x1 = x0 + self.waveHalfDuration
-		y0 = yBasis
-		y1 = y0
-
-		#horizontal line at bottom
-		self.graphicsScene.addLine(QtCore.QLineF(x0, y0, x1 - self.timeDelta, y0))
-		self.pendingTimeDelta = self.timeDelta
-		#print ("tdDrawDataDX: exiting... self.pendingTimeDelta=", self.pendingTimeDelta)
-
-	def tdDrawSpace(self, waveCount, cmd, basis=(0, 0)):
-		xBasis, yBasis = basis
-		x0 = xBasis + self.waveTransitionTime/2
-		if cmd.strip().find('<') == -1 and cmd.strip().find('>') == -1 and cmd.strip().find('-') == -1: #no arrow
-			#print ("-- seeing 's', this line has arrows ...")
-			if self.maxWaveCount == 0:
-				self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
-				#FIXME
-				#draw the grid
-				#if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
-				#	self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration,
-				#		yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-				#		x0 + self.waveHalfDuration,
-				#		yBasis), self.gridOtherPen)
-				#elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
-				#	self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration,
-				#		yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-				#		x0 + self.waveHalfDuration,
-				#		yBasis), self.gridPen)
+#one offscreen application and window per rendering process
+renderApp = None
+renderForm = None
+
+def renderInit(stripWidth = 0, threads = 0):
+	global renderApp, renderForm
+	os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+	renderApp = QApplication(sys.argv[:1])
+	renderForm = TimingDiagrammer()
+	#nothing is shown, so keep no per-line scene items around between files,
+	#no index that only picking and scrolling would use and no spare scene
+	renderForm.incrementalRedraw = False
+	renderForm.sceneIndexMethod = QGraphicsScene.NoIndex
+	renderForm.swapScenes = False
+	renderForm.progressiveRedraw = False
+	renderForm.exportStripWidth = stripWidth
+	#0 keeps one per core
+	if threads > 0:
+		renderForm.exportThreads = threads
+
+def renderJob(job):
+	inFileName, outFileName = job
+	fileStartTime = time.perf_counter()
+	errorMessage = ''
+	failure = ''
+	try:
+		errorMessage = renderForm.renderFile(inFileName, outFileName)
+	except Exception as e:
+		failure = str(e)
+	return (inFileName, outFileName, errorMessage, failure, time.perf_counter() - fileStartTime)
+
+def renderInputs(names):
+	#directories stand for the .tim files in them; patterns are expanded here
+	#too since not every shell does it
+	inputs = []
+	for name in names:
+		if os.path.isdir(name):
+			inputs += sorted(glob.glob(os.path.join(name, '*.tim')))
+		elif not os.path.exists(name) and glob.has_magic(name) and glob.glob(name) != []:
+			inputs += sorted(glob.glob(name))
 		else:
-			if self.maxWaveCount == 0:
-				self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
-				#FIXME
-				#if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
-				#	self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration,
-				#		yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2,
-				#		x0 + self.waveHalfDuration,
-				#		yBasis + self.arrowVertOffset), self.gridOtherPen)
-				#elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
-				#	self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration,
-				#		yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2,
-				#		x0 + self.waveHalfDuration,
-				#		yBasis + self.arrowVertOffset), self.gridPen)
-			
-
-	def tdDrawTri(self, waveCount, nextC=None, basis=(0, 0)):
-		xBasis, yBasis = basis
-		x0 = xBasis + self.waveTransitionTime/2
-		if nextC in "dDXxlhrRfFpP":
-			x1 = x0 + self.waveHalfDuration
+			inputs.append(name)
+	return inputs
+
+def renderMain(argv):
+	#headless batch export: TimingDiagrammer.py --render a.tim dir/ [-o out] [-j N] [--stats]
+	startTime = time.perf_counter()
+	parser = argparse.ArgumentParser(prog = os.path.basename(sys.argv[0]),
+		description = "Render .tim files to PNG or SVG images without opening a window.")
+	parser.add_argument('--render', nargs = '+', required = True, metavar = 'TIMFILE',
+		help = "input .tim files, directories of .tim files or glob patterns")
+	parser.add_argument('-o', '--output', default = None,
+		help = "output .png or .svg file for a single input, otherwise a directory "
+			"(default: next to each input)")
+	parser.add_argument('--format', choices = ('png', 'svg'), default = 'png',
+		help = "image format when the output file name is not given (default: png)")
+	parser.add_argument('-j', '--jobs', type = int, default = 1,
+		help = "number of rendering processes, 0 for one per core (default: 1)")
+	parser.add_argument('--strip-width', type = int, default = 0, metavar = 'PIXELS',
+		help = "write each PNG as numbered images of at most PIXELS columns")
+	parser.add_argument('--threads', type = int, default = 0,
+		help = "threads that draw and encode the tiles of one big image, 0 to share "
+			"the cores between the processes (default: 0)")
+	parser.add_argument('--stats', action = 'store_true',
+		help = "print startup and per-file render times")
+	args = parser.parse_args(argv)
+
+	inputs = renderInputs(args.render)
+	outputIsDir = args.output is not None and (len(inputs) > 1 or os.path.isdir(args.output))
+	if outputIsDir:
+		os.makedirs(args.output, exist_ok = True)
+	jobs = []
+	for inFileName in inputs:
+		baseName = os.path.basename(inFileName)
+		baseName = baseName[:baseName.rfind('.')] if baseName.rfind('.') > 0 else baseName
+		if args.output is None:
+			outFileName = os.path.join(os.path.dirname(inFileName), baseName + "." + args.format)
+		elif outputIsDir:
+			outFileName = os.path.join(args.output, baseName + "." + args.format)
 		else:
-			x1 = x0 + self.waveHalfPeriod
-
-		y0 = yBasis - self.waveHeight/2
-		y1 = y0
-
-		if self.maxWaveCount == 0:
-			self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
-			#FIXME
-			#draw the grid
-			#if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
-			#	self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-			#		x0 + self.waveHalfDuration, yBasis), self.gridOtherPen)
-			#elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
-			#	self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
-			#		x0 + self.waveHalfDuration, yBasis), self.gridPen)
-
-		c = x1 + self.waveTransitionTime
-
-		if nextC in 'xX' or (nextC in 'dD' and self.currentColor != 'x'):
-			pointList = [QtCore.QPointF(x1 - self.timeDelta, y0),
-					QtCore.QPointF(c - self.timeDelta, yBasis),
-					QtCore.QPointF(c, yBasis),
-					QtCore.QPointF(c, yBasis - self.waveHeight),
-					QtCore.QPointF(c - self.timeDelta, yBasis - self.waveHeight)]
-			if nextC in 'dD' and self.currentColor != 'x':
-				color = "light grey"
-				if self.currentColor in colorMap.keys():
-					color = colorMap[self.currentColor]
-				self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-			else:
-				self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor("light grey")))
-
-		if nextC in 'dDXx':
-			self.graphicsScene.addLine(QtCore.QLineF(x1 - self.timeDelta, y0, 
-				x1 + self.waveTransitionTime - self.timeDelta, yBasis - self.waveHeight))
-			self.graphicsScene.addLine(QtCore.QLineF(x1 - self.timeDelta, y0, 
-				x1 + self.waveTransitionTime - self.timeDelta, yBasis))
-			self.graphicsScene.addLine(QtCore.QLineF(x1 + self.waveTransitionTime - self.timeDelta, yBasis - self.waveHeight, 
-				x1 + self.waveTransitionTime, yBasis - self.waveHeight))
-			self.graphicsScene.addLine(QtCore.QLineF(x1 + self.waveTransitionTime - self.timeDelta, yBasis, 
-				x1 + self.waveTransitionTime, yBasis))
-			self.graphicsScene.addLine(QtCore.QLineF(x0 - self.pendingTimeDelta, y0, x1 - self.timeDelta, y1), self.triPen)
-		elif nextC in 'hfF':
-			self.graphicsScene.addLine(QtCore.QLineF(x0, y0, c - self.waveTransitionTime - self.timeDelta, y0), self.triPen) 
-			self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration - self.timeDelta, y0, c - self.timeDelta, yBasis - self.waveHeight))
-			self.graphicsScene.addLine(QtCore.QLineF(c - self.timeDelta, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis - self.waveHeight))
-		elif nextC in 'lrRpP':
-			self.graphicsScene.addLine(QtCore.QLineF(x0, y0, c - self.waveTransitionTime - self.timeDelta, y0), self.triPen)
-			self.graphicsScene.addLine(QtCore.QLineF(x0 + self.waveHalfDuration - self.timeDelta, y0, c - self.timeDelta, yBasis))
-			self.graphicsScene.addLine(QtCore.QLineF(c - self.timeDelta, yBasis, x1 + self.waveTransitionTime, yBasis))
-		else:
-			self.graphicsScene.addLine(QtCore.QLineF(x0, y0, c - self.waveTransitionTime, y0), self.triPen)
-	
-		self.pendingTimeDelta = self.timeDelta
-		#print ("tdDrawTri: exiting... self.pendingTimeDelta=", self.pendingTimeDelta)
-
-	def tdDrawGap(self, waveCount, lastC=None, nextC=None, basis=(0, 0)):
-		xBasis, yBasis = basis
-		xShift = -6
-		x0 = xBasis - self.waveHalfDuration/2 + xShift
-		color = self.gapPenColor
-
-		pointList = [QtCore.QPointF(x0 - 5, yBasis - self.waveHeight - self.signalWaveYSpacing/4),
-			QtCore.QPointF(x0 + 2, yBasis - 3*self.waveHeight/4),
-			QtCore.QPointF(x0 - 12, yBasis - self.waveHeight/4),
-			QtCore.QPointF(x0 - 5, yBasis + self.signalWaveYSpacing/4),
-
-			QtCore.QPointF(x0 + 7, yBasis + self.signalWaveYSpacing/4),
-			QtCore.QPointF(x0, yBasis - self.waveHeight/4),
-			QtCore.QPointF(x0 + 17, yBasis - 3*self.waveHeight/4),
-			QtCore.QPointF(x0 + 7, yBasis - self.waveHeight - self.signalWaveYSpacing/4)]
-
-		self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList),
-			QtGui.QPen(Qt.transparent), QtGui.QBrush(QtGui.QColor(color)))
-
-		path = QPainterPath()
-		path.moveTo(QtCore.QPointF(x0 - 5, yBasis - self.waveHeight - self.signalWaveYSpacing/4))
-		path.cubicTo(
-					QtCore.QPointF(x0 + 20, yBasis - 3*self.waveHeight/4),
-					QtCore.QPointF(x0 - 28, yBasis - self.waveHeight/4),
-					QtCore.QPointF(x0 - 5, yBasis + self.signalWaveYSpacing/4))
-		self.graphicsScene.addPath(path, self.gapPen)
-		path.moveTo(QtCore.QPointF(x0 + 7, yBasis - self.waveHeight - self.signalWaveYSpacing/4))
-		path.cubicTo(
-					QtCore.QPointF(x0 + 30, yBasis - 3*self.waveHeight/4),
-					QtCore.QPointF(x0 - 15, yBasis - self.waveHeight/4),
-					QtCore.QPointF(x0 + 7, yBasis + self.signalWaveYSpacing/4))
-		self.graphicsScene.addPath(path, self.gapPen)
-
-
-	def tdDrawGapDontUse(self, waveCount, lastC=None, nextC=None, basis=(0, 0)):
-		xBasis, yBasis = basis
-		x0 = xBasis - self.waveHalfDuration - 5
-		xstep = -25
-		xstep2 = 15
-
-		pointList = [
-			QtCore.QPointF(x0 + self.waveHalfDuration/2 + xstep, yBasis - self.gapHeight - self.signalWaveYSpacing/2),
-			QtCore.QPointF(x0 + self.waveHalfDuration/2 + 7 + xstep, yBasis - 3*self.gapHeight/4),
-			QtCore.QPointF(x0 + self.waveHalfDuration/2 - 7 + xstep, yBasis - self.gapHeight/4),
-			QtCore.QPointF(x0 + self.waveHalfDuration/2 + xstep, yBasis + self.signalWaveYSpacing/2),
-
-			QtCore.QPointF(x0 + self.waveHalfDuration/2 + xstep2, yBasis + self.signalWaveYSpacing/2),
-			QtCore.QPointF(x0 + self.waveHalfDuration/2 - 7 + xstep2, yBasis - self.gapHeight/4),
-			QtCore.QPointF(x0 + self.waveHalfDuration/2 + 7 + xstep2, yBasis - 3*self.gapHeight/4),
-			QtCore.QPointF(x0 + self.waveHalfDuration/2 + xstep2, yBasis - self.gapHeight - self.signalWaveYSpacing/2)]
-
-		p = self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), self.gapBrush)
-		p.setZValue(2)
-		p = self.graphicsScene.addPolygon(QtGui.QPolygonF(pointList), QtGui.QPen(Qt.transparent), self.gapBrush)
-		###p.setBrush(QtGui.QBrush(Qt.DiagCrossPattern))
-		p.setBrush(QtGui.QBrush(QtGui.QColor(self.gapBrushColor)))
-		p.setZValue(3)
+			outFileName = args.output
+		jobs.append((inFileName, outFileName))
+
+	processCount = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+	processCount = max(1, min(processCount, len(jobs)))
+	threadCount = args.threads if args.threads > 0 else max(1, (os.cpu_count() or 1) // processCount)
+	pool = None
+	if processCount > 1:
+		#Qt is not fork safe, every worker starts a fresh interpreter
+		pool = multiprocessing.get_context('spawn').Pool(processCount, renderInit, (args.strip_width, threadCount))
+		results = pool.imap(renderJob, jobs)
+	else:
+		renderInit(args.strip_width, threadCount)
+		results = map(renderJob, jobs)
+	if args.stats:
+		print ("startup: %.3f s, %d process(es)" % (time.perf_counter() - startTime, processCount))
+
+	#results come back in input order whichever worker finished first
+	failed = 0
+	for inFileName, outFileName, errorMessage, failure, seconds in results:
+		if failure != '':
+			sys.stderr.write(inFileName + ": Error: " + failure + "\n")
+			failed += 1
+			continue
+		if errorMessage != '':
+			sys.stderr.write(inFileName + ": " + errorMessage + "\n")
+		if args.stats:
+			print ("%s -> %s: %.3f s" % (inFileName, outFileName, seconds))
+	if pool is not None:
+		pool.close()
+		pool.join()
+	else:
+		renderForm.stopRenderThread()
+	if failed > 0:
+		sys.stderr.write("%d of %d file(s) failed\n" % (failed, len(jobs)))
+	if args.stats:
+		print ("total: %.3f s" % (time.perf_counter() - startTime))
+	return 1 if failed > 0 else 0
 
 def main():
+	if '--render' in sys.argv[1:]:
+		sys.exit(renderMain(sys.argv[1:]))
 	app = QApplication(sys.argv)
 	icon = QtGui.QIcon(os.path.join(os.path.dirname(os.path.abspath(__file__)), "td.ico"))
 	form = TimingDiagrammer()
@@ -0,0 +1,3037 @@
+#   Copyright (C) 2021, 2022, 2023 Anirban Banerjee
+#   
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#   
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#   GNU General Public License for more details.
+#   
+#   You should have received a copy of the GNU General Public License
+#   along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import math, copy
+from xml.sax.saxutils import escape
+
+fontMap = {'sans':'Sans', 'serif':'Serif', 
+			'mono':'Monospace', 'fixed': 'Fixed',
+			}
+
+#color map has pastel/light values
+colorMap = {
+	'a': 'antiquewhite', 
+	'A': 'aquamarine', 
+	'b': 'blue', 
+	'B': 'brown', 
+	'c': 'lightcyan', 
+	'C': 'cornflowerblue', 
+	'd': 'skyblue', 
+	'D': 'deepskyblue', 
+	'g': 'mediumaquamarine', 
+	'G': 'springgreen', 
+	'h': 'honeydew', 
+	'H': 'hotpink', 
+	'i': 'indigo', 
+	'I': 'indianred', 
+	'l': 'lavender', 
+	'L': 'lawngreen', 
+	'm': 'mistyrose', 
+	'M': 'magenta', 
+	'k': 'khaki', 
+	'o': 'orange',
+	'O': 'orchid',
+	'p': 'pink', 
+	'P': 'peachpuff', 
+	'r': 'red', 
+	'R': 'rosybrown', 
+	's': 'snow',
+	't': 'thistle',
+	'v': 'violet', 
+	'w': 'white',
+	'W': 'wheat',
+	'x': 'black',
+	'y': 'light yellow', 
+	'Y': 'yellow', 
+	'z': 'plum',
+	'Z': 'cornsilk'
+}
+
+#text color map has dark color values
+textColorMap = {
+	'a': 'aqua', 
+	'A': 'aquamarine', 
+	'b': 'blue', 
+	'B': 'brown', 
+	'c': 'chocolate', 
+	'C': 'crimson', 
+	'd': 'darkblue', 
+	'D': 'darkred', 
+	'g': 'green', 
+	'G': 'goldenrod', 
+	'h': 'honeydew', 
+	'i': 'indigo', 
+	'l': 'limegreen', 
+	'L': 'lawngreen', 
+	'm': 'maroon', 
+	'M': 'magenta', 
+	'n': 'navy', 
+	'k': 'khaki', 
+	'o': 'orangered',
+	'O': 'olive',
+	'p': 'deeppink', 
+	'P': 'purple', 
+	'r': 'red', 
+	'R': 'firebrick', 
+	's': 'slateblue',
+	't': 'teal',
+	'v': 'darkviolet', 
+	'V': 'fuchsia', 
+	'w': 'darkslategrey',
+	'W': 'saddlebrown',
+	'x': 'black',
+	'y': 'mediumvioletred', 
+	'Y': 'gold', 
+	'z': 'navy',
+	'Z': 'darkorchid'
+}
+
+penStyles = ('solid', 'dot', 'dash')
+
+def makePen(color = "black", width = 1, style = 'solid'):
+	#pens are plain (color, width, style) tuples so that primitives can be
+	#compared, hashed and sent to other threads or processes
+	return (color, width, style)
+
+defaultPen = makePen()
+transparentPen = makePen("transparent")
+
+def lineExtent(x0, y0, x1, y1, width):
+	#what a square capped line covers, the way Qt bounds a line item;
+	#a line of no length covers nothing
+	length = math.hypot(x1 - x0, y1 - y0)
+	if length == 0:
+		return None
+	ux = (x1 - x0) / length * width / 2
+	uy = (y1 - y0) / length * width / 2
+	xs = (x0 - ux - uy, x0 - ux + uy, x1 + ux - uy, x1 + ux + uy)
+	ys = (y0 - uy + ux, y0 - uy - ux, y1 + uy + ux, y1 + uy - ux)
+	return (min(xs), min(ys), max(xs), max(ys))
+
+#generic families to fall back on when an SVG viewer lacks the Qt font
+svgFontFamilies = {'Serif': 'serif', 'Monospace': 'monospace', 'Fixed': 'monospace'}
+
+def svgNumber(value):
+	return ('%.2f' % value).rstrip('0').rstrip('.')
+
+def svgColor(color):
+	#Qt also accepts names with spaces, such as 'light yellow'
+	if color is None:
+		return 'black'
+	return color.replace(' ', '').lower()
+
+def svgPenAttributes(pen):
+	color, width, style = pen
+	width = max(width, 1)
+	attributes = ' stroke="' + svgColor(color) + '"'
+	if width != 1:
+		attributes += ' stroke-width="' + svgNumber(width) + '"'
+	#Qt dash patterns are in units of the pen width
+	if style == 'dot':
+		attributes += ' stroke-dasharray="' + svgNumber(width) + ',' + svgNumber(2 * width) + '" stroke-linecap="butt"'
+	elif style == 'dash':
+		attributes += ' stroke-dasharray="' + svgNumber(4 * width) + ',' + svgNumber(2 * width) + '" stroke-linecap="butt"'
+	return attributes
+
+def svgPointsData(points):
+	#path data through the points, as steps from the first one, rounded the
+	#same as the first so that the rounding does not add up along the way; a
+	#point that repeats the last one adds nothing and is left out
+	(lastX, lastY) = (round(points[0][0], 2), round(points[0][1], 2))
+	data = 'M' + svgNumber(lastX) + ' ' + svgNumber(lastY)
+	steps = ''
+	for (px, py) in points[1:]:
+		(px, py) = (round(px, 2), round(py, 2))
+		if py == lastY:
+			if px != lastX:
+				steps += 'h' + svgNumber(px - lastX)
+		elif px == lastX:
+			steps += 'v' + svgNumber(py - lastY)
+		else:
+			steps += 'l' + svgNumber(px - lastX) + ' ' + svgNumber(py - lastY)
+		(lastX, lastY) = (px, py)
+	#no separator is needed before a minus sign
+	return (data + steps).replace(' -', '-')
+
+def svgPolygonData(points):
+	#path data of a polygon, turned so that all of them go the same way round
+	area = 0
+	for i in range(0, len(points)):
+		area += points[i - 1][0] * points[i][1] - points[i][0] * points[i - 1][1]
+	if area < 0:
+		points = points[::-1]
+	return svgPointsData(points) + 'z'
+
+def svgCurveData(start, control1, control2, end):
+	#path data of a cubic curve, its points as steps from the start
+	(x0, y0) = (round(start[0], 2), round(start[1], 2))
+	data = 'M' + svgNumber(x0) + ' ' + svgNumber(y0) + 'c' + ' '.join(svgNumber(round(px, 2) - x0) + ' ' + svgNumber(round(py, 2) - y0)
+		for (px, py) in (control1, control2, end))
+	return data.replace(' -', '-')
+
+def svgShape(style, data):
+	#a path element for fragments that are stroked with a pen or filled with a color
+	if isinstance(style, tuple):
+		return '<path d="' + ''.join(data) + '"' + svgPenAttributes(style) + '/>'
+	return '<path d="' + ''.join(data) + '" fill="' + svgColor(style) + '"/>'
+
+class TimingEngine(object):
+	#all of the wave geometry, free of Qt; drawing appends primitives to
+	#self.primitives, each a list that starts with its kind and z value:
+	#	['line', z, pen, x0, y0, x1, y1]
+	#	['poly', z, color, points]
+	#	['arrow', z, color, points]
+	#	['rect', z, color, x, y, width, height]
+	#	['path', z, pen, [(start, control1, control2, end), ...]]
+	#	['text', z, text, x, y, font, size, color, wrapWidth]
+	#points are (x, y) tuples, a font or color of None means the default one
+	#polygons, arrow heads and rects have no outline
+
+	#names of the attributes engineState copies, found on first use
+	engineStateNames = None
+
+	def __init__(self, measureText = None, **kwargs):
+		super(TimingEngine, self).__init__(**kwargs)
+		if measureText is not None:
+			self.measureText = measureText
+		self.primitives = []
+		#what a text primitive without a font is drawn with
+		self.defaultFontFamily = 'Sans'
+		self.defaultFontSize = 9
+		#dots per inch that font point sizes are laid out at
+		self.fontResolution = 96
+		#wave commands of more tokens than deferWaveTokens are only laid out, see
+		#deferWaves, in runs of about deferRunTokens; 0 draws every command whole
+		self.deferWaveTokens = 0
+		self.deferRunTokens = 256
+		#keep labels off the line between the names and the waves, see clearNameColumn
+		self.clearNameColumnLabels = False
+		self.resetParameters()
+		self.resetVariables()
+
+	def resetVariables(self):
+		#runtime variables
+		self.currentLineHasArrow = False
+		self.currentLineNumber = 0
+		self.linesWithArrow = 0
+		self.yBasisRegistered = 0
+		self.timeDelta = 0
+		self.pendingArrowDelay = 0
+		self.clockEvenOddFlip = 0
+		self.pendingTimeDelta = 0
+		self.currentLineArrowLineList = []
+		self.currentLineArrowPolyList = []
+		#the open grid runs of self.gridRunsOf, by (z, y0, y1)
+		self.gridRuns = {}
+		self.gridRunsOf = None
+		self.directionArrowsList = []
+		self.overlayAnnotationList = []
+		#the waves deferWaves has laid out but not drawn
+		self.deferredWaves = []
+		self.maxWaveCount = 0
+		self.currentColor = 'w'
+		#what the last drawn line asks of the view, left for the caller to act on
+		self.centerOnRequest = None
+		self.errorMessage = ''
+
+	def measureText(self, text, font = None, size = None, wrapWidth = -1):
+		#rough metrics for when there is no display; TimingDiagrammer
+		#measures with Qt instead
+		if size is None:
+			size = 12
+		rows = text.split('\n')
+		width = max(len(row) for row in rows) * size * 0.6 + 8
+		height = len(rows) * size * 1.5 + 8
+		if wrapWidth != -1 and width > wrapWidth:
+			height *= math.ceil(width / wrapWidth)
+			width = wrapWidth
+		return int(round(width)), int(round(height))
+
+	def emitLine(self, x0, y0, x1, y1, pen = defaultPen, z = 0):
+		primitive = ['line', z, pen, x0, y0, x1, y1]
+		self.primitives.append(primitive)
+		return primitive
+
+	def emitPolygon(self, points, color, z = 0):
+		primitive = ['poly', z, color, points]
+		self.primitives.append(primitive)
+		return primitive
+
+	def emitArrowHead(self, points, color, z = 0):
+		primitive = ['arrow', z, color, points]
+		self.primitives.append(primitive)
+		return primitive
+
+	def emitRect(self, x, y, width, height, color, z = 0):
+		primitive = ['rect', z, color, x, y, width, height]
+		self.primitives.append(primitive)
+		return primitive
+
+	def emitPath(self, path, pen = defaultPen, z = 0):
+		primitive = ['path', z, pen, path]
+		self.primitives.append(primitive)
+		return primitive
+
+	def emitGrid(self, x, y0, y1, pen, z = 0.25):
+		#grid lines are kept as runs of evenly spaced lines that alternate between
+		#two pens, ['grid', z, [pen, otherPen], x0, pitch, count, y0, y1]; a line
+		#that carries on the last run of its height is added to that run. The grid
+		#of a wave is drawn over the wave and under the gaps at z 0.5
+		if self.gridRunsOf is not self.primitives:
+			self.gridRuns = {}
+			self.gridRunsOf = self.primitives
+		run = self.gridRuns.get((z, y0, y1))
+		if run is not None:
+			(pens, x0, pitch, count) = run[2:6]
+			if count == 1 and x > x0:
+				pens[1] = pen
+				run[4] = x - x0
+				run[5] = 2
+				return run
+			if count > 1 and abs(x - (x0 + pitch * count)) < 1e-6 and pens[count % 2] == pen:
+				run[5] = count + 1
+				return run
+		primitive = ['grid', z, [pen, pen], x, 0, 1, y0, y1]
+		self.primitives.append(primitive)
+		self.gridRuns[(z, y0, y1)] = primitive
+		return primitive
+
+	def gridLines(self, primitive):
+		#the line primitives a grid run stands for
+		(pens, x0, pitch, count, y0, y1) = primitive[2:]
+		return [['line', primitive[1], pens[i % 2], x0 + pitch * i, y0, x0 + pitch * i, y1] for i in range(0, count)]
+
+	def expandGrids(self, primitives):
+		expanded = []
+		for primitive in primitives:
+			if primitive[0] == 'grid':
+				expanded.extend(self.gridLines(primitive))
+			else:
+				expanded.append(primitive)
+		return expanded
+
+	def emitAnchor(self, x0, y0, x1, y1):
+		#draws nothing, but the diagram extends over it so that exports keep
+		#their margins; it covers what a 1 pixel line from (x0, y0) to (x1, y1) would
+		primitive = ['anchor', 0, x0, y0, x1, y1]
+		self.primitives.append(primitive)
+		return primitive
+
+	def primitivesExtent(self, primitives):
+		#(x0, y0, x1, y1) that the primitives cover, or None
+		extent = None
+		for primitive in primitives:
+			kind = primitive[0]
+			if kind == 'line':
+				bounds = lineExtent(primitive[3], primitive[4], primitive[5], primitive[6], primitive[2][1])
+			elif kind == 'anchor':
+				bounds = lineExtent(primitive[2], primitive[3], primitive[4], primitive[5], 1)
+			elif kind == 'grid':
+				(pens, x0, pitch, count, y0, y1) = primitive[2:]
+				margin = max(pens[0][1], pens[1][1]) / 2
+				bounds = (x0 - margin, y0 - margin, x0 + pitch * (count - 1) + margin, y1 + margin)
+			elif kind == 'rect':
+				(x, y, width, height) = primitive[3:7]
+				bounds = (x - 0.5, y - 0.5, x + width + 0.5, y + height + 0.5)
+			elif kind == 'text':
+				(text, x, y, font, size, color, wrapWidth) = primitive[2:]
+				width, height = self.measureText(text, font, size, wrapWidth)
+				bounds = (x, y, x + width, y + height)
+			else:
+				if kind == 'path':
+					points = [point for segment in primitive[3] for point in segment]
+					margin = primitive[2][1] / 2
+				else:
+					#fills have a 1 pixel transparent outline
+					points = primitive[3]
+					margin = 0.5
+				xs = [x for (x, y) in points]
+				ys = [y for (x, y) in points]
+				bounds = (min(xs) - margin, min(ys) - margin, max(xs) + margin, max(ys) + margin)
+			if bounds is None:
+				continue
+			if extent is None:
+				extent = bounds
+			else:
+				extent = (min(extent[0], bounds[0]), min(extent[1], bounds[1]),
+					max(extent[2], bounds[2]), max(extent[3], bounds[3]))
+		return extent
+
+	def emitText(self, text, x, y, font = None, size = None, color = None, wrapWidth = -1, z = 0):
+		primitive = ['text', z, text, x, y, font, size, color, wrapWidth]
+		self.primitives.append(primitive)
+		return primitive
+
+	def setZValue(self, primitive, z):
+		primitive[1] = z
+
+	def removePrimitive(self, primitive):
+		for i in range(len(self.primitives) - 1, -1, -1):
+			if self.primitives[i] is primitive:
+				del self.primitives[i]
+				return
+
+	def wrapText(self, text, font, size, wrapWidth):
+		#break text into rows the way a text item of width wrapWidth would
+		rows = []
+		for paragraph in text.split('\n'):
+			row = ''
+			for word in paragraph.split(' '):
+				candidate = word if row == '' else row + ' ' + word
+				if wrapWidth != -1 and row != '' and self.measureText(candidate, font, size)[0] > wrapWidth:
+					rows.append(row)
+					row = word
+				else:
+					row = candidate
+			rows.append(row)
+		return rows
+
+	def svgShapes(self, primitive):
+		#[(style, path data fragments), ...] for a primitive that is stroked or
+		#filled, None for the other kinds; the style is the pen of a stroke or
+		#the color of a fill
+		kind = primitive[0]
+		if kind == 'line':
+			(lx0, ly0, lx1, ly1) = primitive[3:7]
+			if lx0 == lx1 and ly0 == ly1:
+				#Qt draws the square cap of a line of no length, which SVG
+				#viewers leave out of a path; a solid line is given a
+				#hundredth of a pixel, a dashed one with its flat caps a square
+				if primitive[2][2] == 'solid':
+					return [(primitive[2], [svgPointsData([(lx0, ly0)]) + 'h.01'])]
+				half = max(primitive[2][1], 1) / 2
+				return [(primitive[2][0], [svgPolygonData([(lx0 - half, ly0 - half), (lx0 + half, ly0 - half),
+					(lx0 + half, ly0 + half), (lx0 - half, ly0 + half)])])]
+			return [(primitive[2], [svgPointsData([(lx0, ly0), (lx1, ly1)])])]
+		if kind == 'path':
+			return [(primitive[2], [svgCurveData(*segment) for segment in primitive[3]])]
+		if kind == 'grid':
+			(pens, x0, pitch, count, y0, y1) = primitive[2:]
+			#an upright line for each, of the same height
+			top = ' ' + svgNumber(y0) + 'V' + svgNumber(y1)
+			if pens[0] == pens[1]:
+				return [(pens[0], ['M' + svgNumber(x0 + pitch * i) + top for i in range(0, count)])]
+			return [(pens[0], ['M' + svgNumber(x0 + pitch * i) + top for i in range(0, count, 2)]),
+				(pens[1], ['M' + svgNumber(x0 + pitch * i) + top for i in range(1, count, 2)])]
+		if kind == 'poly' or kind == 'arrow':
+			return [(primitive[2], [svgPolygonData(primitive[3])])]
+		if kind == 'rect':
+			(rx, ry, rw, rh) = primitive[3:7]
+			return [(primitive[2], [svgPolygonData([(rx, ry), (rx + rw, ry), (rx + rw, ry + rh), (rx, ry + rh)])])]
+		return None
+
+	def svgDocument(self, primitives, x, y, width, height, title = ''):
+		#serialize primitives straight to SVG, in scene coordinates; the view box
+		#is the caller's scene bounds so the output matches the raster export
+		out = []
+		out.append('<?xml version="1.0" encoding="UTF-8" standalone="no"?>')
+		out.append('<svg xmlns="http://www.w3.org/2000/svg" version="1.1" width="%s" height="%s" viewBox="%s %s %s %s">' %
+			(svgNumber(width), svgNumber(height), svgNumber(x), svgNumber(y), svgNumber(width), svgNumber(height)))
+		if title != '':
+			out.append('<title>' + escape(title) + '</title>')
+		out.append('<rect x="%s" y="%s" width="%s" height="%s" fill="white"/>' %
+			(svgNumber(x), svgNumber(y), svgNumber(width), svgNumber(height)))
+		out.append('<g fill="none" stroke-linecap="square">')
+		#(style, fragments) in the order drawn, or (None, element) for text
+		shapes = []
+		#grid lines are all upright and do not cross one another, so the lines
+		#of runs that follow one another are gathered by pen
+		gridShapes = None
+		#same stacking as the scene: by z, then in the order drawn
+		for primitive in sorted(primitives, key = lambda primitive: primitive[1]):
+			kind = primitive[0]
+			if kind == 'grid':
+				if gridShapes is None:
+					gridShapes = {}
+					gridZ = primitive[1]
+				elif primitive[1] != gridZ:
+					shapes.extend(gridShapes.items())
+					gridShapes = {}
+					gridZ = primitive[1]
+				for (pen, data) in self.svgShapes(primitive):
+					gridShapes.setdefault(pen, []).extend(data)
+				continue
+			if kind == 'anchor':
+				continue
+			if gridShapes is not None:
+				shapes.extend(gridShapes.items())
+				gridShapes = None
+			if kind == 'text':
+				shapes.append((None, self.svgText(primitive)))
+			else:
+				shapes.extend(self.svgShapes(primitive))
+		if gridShapes is not None:
+			shapes.extend(gridShapes.items())
+		#shapes that follow one another in the same style are written as one path,
+		#so that the style is given once rather than for every line; a subpath
+		#starts its dash pattern afresh, like a line of its own, and polygons
+		#all go the same way round so that overlapping ones fill as before
+		style = None
+		fragments = []
+		for (shapeStyle, data) in shapes:
+			if shapeStyle is not None and (shapeStyle[0] if isinstance(shapeStyle, tuple) else shapeStyle) == 'transparent':
+				continue
+			if shapeStyle != style or shapeStyle is None:
+				if fragments != []:
+					out.append(svgShape(style, fragments))
+				style = shapeStyle
+				fragments = []
+			if shapeStyle is None:
+				out.append(data)
+			else:
+				fragments.extend(data)
+		if fragments != []:
+			out.append(svgShape(style, fragments))
+		out.append('</g>')
+		out.append('</svg>')
+		return '\n'.join(out) + '\n'
+
+	def svgText(self, primitive):
+		(text, tx, ty, font, size, color, wrapWidth) = primitive[2:]
+		family = self.defaultFontFamily if font is None else font
+		pointSize = self.defaultFontSize if size is None else size
+		#text items have a 4 pixel document margin; line height as Qt lays it out
+		lineHeight = self.measureText('X', font, size)[1] - 8
+		element = ('<text x="%s" y="%s" font-family="%s, %s" font-size="%s" fill="%s" stroke="none" xml:space="preserve">' %
+			(svgNumber(tx + 4), svgNumber(ty + 4 + lineHeight * 0.8), escape(family),
+			svgFontFamilies.get(family, 'sans-serif'), svgNumber(pointSize * self.fontResolution / 72), svgColor(color)))
+		#no white space between the rows, it would be kept
+		rows = self.wrapText(text, font, size, wrapWidth)
+		for i in range(0, len(rows)):
+			element += ('<tspan x="%s" dy="%s">%s</tspan>' %
+				(svgNumber(tx + 4), svgNumber(0 if i == 0 else lineHeight), escape(rows[i])))
+		return element + '</text>'
+
+	def resetParameters(self):
+		self.riseClockArrow = False
+		self.fallClockArrow = False
+		self.evenGridsEnabled = True
+		self.oddGridsEnabled = True
+		self.clockArrowSize = 15
+		self.gridPenColor = "#ff0000"
+		self.gridPen = makePen(self.gridPenColor, 1, 'dot')
+		self.gridOtherPenColor = "#0000ff"
+		self.gridOtherPen = makePen(self.gridOtherPenColor, 1, 'dot')
+
+		self.triPenColor = "olive"
+		self.triPen = makePen(self.triPenColor, 1, 'dash')
+
+		self.dirArrowPenColor = "blue"
+		self.dirArrowPen = makePen(self.dirArrowPenColor)
+
+		self.markerPenColor = "blue"
+		self.markerPen = makePen(self.markerPenColor)
+
+		self.gapBrushColor = "#aaaaaa"
+
+		self.gapPenColor = "#dddddd"
+		self.gapPen = makePen(self.gapPenColor, 7)
+
+		self.arrowSize = 9
+		self.waveHalfDuration = 40
+		self.waveTransitionTime = 10
+		self.waveHalfPeriod = self.waveHalfDuration + self.waveTransitionTime
+		self.sigNameColWidth = 50
+		self.sigNameFont = "Sans"
+		self.sigNameFontSize = 12
+		self.signalNameXSpacing = 50
+		self.signalWaveXOffset = 50
+		self.signalWaveYOffset = 150
+		self.xMargin = 30
+		self.yMargin = 50
+		self.waveHeight = 30
+		self.waveHeightChange = 0
+		self.gapHeight = self.waveHeight
+		self.signalWaveYSpacing = self.waveHeight
+		self.arrowVertOffset = -self.waveHeight/2 - self.signalWaveYSpacing
+		self.arrowLineAdjust = self.waveHeight/2
+		self.arrowLineEnds = 10
+		self.fontName = 'Sans'
+		self.fontSize = 10
+
+	def resolvednextCList (self, cmd):
+		#one backward pass over the wave string; entry cNum is the next significant
+		#code after cmd[cNum], the same value a forward scan of cmd[cNum + 1:] returns:
+		#digits, '|', '/' and '$' are skipped, and a color code after '$' resolves
+		#to the character that follows it
+		length = len(cmd)
+		#resolvedFrom[p] is the result of that scan when it reaches p; when the scan runs
+		#off the end it returns the last character it looked ahead to (isTerminal False)
+		resolvedFrom = [chr(0)] * (length + 1)
+		isTerminal = [False] * (length + 1)
+		hasRet = [False] * (length + 1)
+		for p in range(length - 1, -1, -1):
+			c = cmd[p]
+			if c in '0123456789|/$':
+				resolvedFrom[p] = resolvedFrom[p + 1]
+				isTerminal[p] = isTerminal[p + 1]
+				hasRet[p] = hasRet[p + 1]
+			elif p > 0 and cmd[p - 1] == '$':
+				#color code
+				if p < length - 1:
+					ret = cmd[p + 1]
+					if ret not in '0123456789|/$':
+						resolvedFrom[p] = ret
+						isTerminal[p] = True
+					elif isTerminal[p + 1] or hasRet[p + 1]:
+						resolvedFrom[p] = resolvedFrom[p + 1]
+						isTerminal[p] = isTerminal[p + 1]
+					else:
+						resolvedFrom[p] = ret
+					hasRet[p] = True
+			else:
+				resolvedFrom[p] = c
+				isTerminal[p] = True
+				hasRet[p] = True
+
+		nextCList = [chr(0)] * length
+		for cNum in range(length - 1):
+			c = cmd[cNum + 1]
+			if c not in '0123456789|/$':
+				#the first character of the lookahead is never taken as a color code
+				nextCList[cNum] = c
+			else:
+				nextCList[cNum] = resolvedFrom[cNum + 2]
+		return nextCList
+
+	def drawGrid (self, x0, yBasis, waveCount):
+		if self.maxWaveCount == 0:
+			#draw the grid, over the waves
+			if (self.evenGridsEnabled == True and (waveCount % 2) == self.clockEvenOddFlip):
+				self.emitGrid(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2 + self.waveHeightChange/2, 
+					yBasis, self.gridOtherPen)
+			elif (self.oddGridsEnabled == True and (waveCount % 2) != self.clockEvenOddFlip):
+				self.emitGrid(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+					yBasis, self.gridPen)
+
+	def tdDrawArrowHeadAngle(self, startPoint = (100, 100), direction = (0, 1), size = 9, color = "black"):
+		#direction is an angle specified as (height, base) tuple
+		#where height/base = tan(angle)
+		deg2rad = 3.141592653/180
+		height, base = direction
+		if base == 0:
+			theta = -height * 1.5707963267949
+		else:
+			theta = -math.atan2(height, base)
+		x, y = startPoint
+		pointList = [(x, y),
+						(x + size * math.cos(160*deg2rad + theta), 
+							y + size * math.sin(160*deg2rad + theta)),
+						(x + 3 * size * math.cos(180*deg2rad + theta)/5, 
+							y + 3 * size * math.sin(180*deg2rad + theta)/5),
+						(x + size * math.cos(200*deg2rad + theta), 
+							y + size * math.sin(200*deg2rad + theta)),
+							(x, y)]
+
+		### startPoint,  direction = (0, 1), size = 9
+		self.emitArrowHead(pointList, color, 1)
+
+	def tdDrawArrowHead(self, startPoint, direction='L'):
+		x, y = startPoint
+		yArrowSize = xArrowSize = self.arrowSize
+		if direction == 'R':
+			yArrowSize = -yArrowSize
+			xArrowSize = -xArrowSize
+
+		pointList = [(x, y),
+						(x + xArrowSize, y - yArrowSize/2),
+						(x + xArrowSize*3/4, y),
+						(x + xArrowSize, y + yArrowSize/2),
+						(x, y)]
+
+		p = self.emitArrowHead(pointList, "black", 1)
+		self.currentLineArrowPolyList.append(p)
+
+	def parseFVData(self, annotSpec):
+		leftBrktPos = annotSpec.find('[')
+		rightBrktPos = annotSpec.find(']')
+		if rightBrktPos == -1:
+			spec = annotSpec[leftBrktPos + 1:]
+		else:
+			spec = annotSpec[leftBrktPos + 1: rightBrktPos]
+
+		delay = 0
+		width = -1
+		color = 'black'
+		font = self.fontName
+		size = self.fontSize
+		vert = 0
+		arrow = 0
+		center = True
+
+		if spec == '':
+			return (delay,
+					width,
+					color,
+					font,
+					size,
+			        vert,
+			        arrow,
+					center)
+
+		spec = spec.replace('  ', ' ')
+		spec = spec.replace(' =', '=')
+		for fvPair in spec.split(' '):
+			#print ("parseFVData: fvPair is ", fvPair)
+			if fvPair == '':
+				continue
+			fvPair = fvPair.replace(' ', '')
+			fvPair = fvPair.split('=')
+			if len(fvPair) < 2:
+				continue
+			field = fvPair[0]
+			value = fvPair[1]
+		
+			if field == "delay":
+				try:
+					delay = int(value)
+				except:
+					delay = 0
+			elif field == "width":
+				try:
+					width = int(value)
+				except:
+					width = -1
+			elif field == "color":
+				if value in textColorMap:
+					color = textColorMap[value]
+				else:
+					color = 'black'
+			elif field == "font":
+				if value in fontMap:
+					font = fontMap[value]
+				else:
+					font = self.fontName
+			elif field == "center":
+				center = value in "yY"
+			elif field == "size":
+				try:
+					size = int(value)
+					if size < 6:
+						size = 6
+				except:
+					size = self.fontSize
+			elif field == "vert":
+				try:
+					vert = int(value)
+				except:
+					vert = 0
+			elif field == "arrow":
+				try:
+					arrow = int(value)
+				except:
+					arrow = 0
+
+		return (delay,
+				width,
+				color,
+				font,
+				size,
+		        vert,
+		        arrow,
+				center)
+
+	def getFVData(self, annotSpecCmd):
+		#print ("getFVData: annotSpecCmd = ", annotSpecCmd)
+		attributeMapList = []
+		if annotSpecCmd == '':
+			#print ("getFVData: null cmd4")
+			return attributeMapList
+		for step in annotSpecCmd.split(','):
+			#print ("step is ", step)
+			attributeMap = {}
+			attributeMap['delay'] = 0
+			attributeMap['width'] = -1
+			attributeMap['color'] = 'black'
+			attributeMap['font'] = self.fontName
+			attributeMap['size'] = self.fontSize
+			attributeMap['vert'] = 0
+			attributeMap['arrow'] = 0
+			attributeMap['center'] = True
+			if step == '':
+				attributeMapList.append(attributeMap)
+				continue
+			step = step.replace('  ', ' ')
+			step = step.replace(' =', '=')
+			#print ("after adj, step is ", step)
+			for fvPair in step.split(' '):
+				if fvPair == '':
+					continue
+				fvPair = fvPair.replace(' ', '')
+				fvPair = fvPair.split('=')
+				if len(fvPair) < 2:
+					continue
+				field = fvPair[0]
+				value = fvPair[1]
+				#print ("fvPair is ", fvPair)
+		
+				if field == "delay":
+					try:
+						value = int(value)
+					except:
+						value = 0
+					attributeMap['delay'] = int(value)
+				elif field == "width":
+					try:
+						value = int(value)
+					except:
+						value = -1
+					attributeMap['width'] = int(value)
+				elif field == "color":
+					if value in textColorMap:
+						value = textColorMap[value]
+					else:
+						color = 'black'
+					attributeMap['color'] = value
+				elif field == "font":
+					if value in fontMap:
+						attributeMap['font'] = fontMap[value]
+					else:
+						attributeMap['font'] = self.fontName
+				elif field == "center":
+					if value in "yY":
+						attributeMap['center'] = True
+					else:
+						attributeMap['center'] = False
+				elif field == "size":
+					try:
+						value = int(value)
+						if value < 6:
+							value = 6
+						#print ("appended fontSize = ", value)
+					except:
+						value = self.fontSize
+						#print ("appended width = 0 default",)
+					attributeMap['size'] = int(value)
+				elif field == "vert":
+					try:
+						value = int(value)
+					except:
+						value = 0
+					attributeMap['vert'] = value
+					#print ("appended vert = ", value)
+				elif field == "arrow":
+					try:
+						value = int(value)
+					except:
+						value = 0
+					attributeMap['arrow'] = value
+					#print ("appended arrow = ", value)
+
+			attributeMapList.append(attributeMap)
+	
+		#print ("===============================")
+		#print ("len attributeMapList = ", len(attributeMapList))
+	
+		return attributeMapList
+
+	def compileAnnotations (self, cmd, annotSpecCmd):
+		length = len(cmd)
+		cmd = cmd.replace('\[', chr(3))
+		attributeMapList = self.getFVData(annotSpecCmd.strip())
+		annotations = []
+		arrowShift = 0
+		annotNum = 0
+		for annot in cmd.split(','):
+			annot = annot.replace(chr(1), '#')
+			annot = annot.replace(chr(2), ';')
+			annot = annot.replace(chr(6), ',')
+			if len(attributeMapList) > annotNum:
+				delay = attributeMapList[annotNum]['delay']
+				width = attributeMapList[annotNum]['width']
+				color = attributeMapList[annotNum]['color']
+				font = attributeMapList[annotNum]['font']
+				size = attributeMapList[annotNum]['size']
+				vert = attributeMapList[annotNum]['vert']
+				arrow = attributeMapList[annotNum]['arrow']
+				center = attributeMapList[annotNum]['center']
+			else:
+				delay = 0
+				width = -1
+				color = 'black'
+				font = self.fontName
+				size = self.fontSize
+				vert = 0
+				arrow = 0
+				center = True
+
+			if annotNum == 0:
+				#the arrow shift of the line comes from the first annotation spec
+				arrowShift = arrow
+
+			if annot != '':
+				brktPos = annot.find('[')
+				if brktPos > 0:
+					(delay, 
+					width, 
+					color, 
+					font, 
+					size,
+					vert, 
+					arrow,
+					center) = self.parseFVData(annot[brktPos:])
+					annot = annot[:brktPos]
+
+			if annot != '':
+				annot = annot.replace(chr(3), '[')
+				annotations.append((annotNum, annot, delay, width, color, font, size, vert, center))
+			annotNum += 1
+
+		cmdIR = {}
+		cmdIR['cmdNum'] = 3
+		cmdIR['length'] = length
+		cmdIR['text'] = cmd
+		cmdIR['arrowShift'] = arrowShift
+		cmdIR['annotations'] = annotations
+		return cmdIR
+
+	def doAnnotationCmd (self, cmdIR, updateViewPort = False, charPosWithinCmd = -1):
+		#count number of commas in cmd before charPosWithinCmd
+		waveNum = -1
+		if charPosWithinCmd > 0:
+			waveNum = cmdIR['text'][:charPosWithinCmd].count(',')
+
+		arrow = cmdIR['arrowShift']
+		if arrow != 0:
+			for l in self.currentLineArrowLineList:
+				#['line', z, pen, x0, y0, x1, y1]
+				l[4] -= arrow
+				l[6] -= arrow
+				self.setZValue(l, 1)
+			for p in self.currentLineArrowPolyList:
+				#print ("@@@@@ polygon = ", p, " arrow = ", arrow)
+				poly = [(x, y - arrow) for (x, y) in p[3]]
+				self.removePrimitive(p)
+				self.emitArrowHead(poly, "black", 1)
+
+		for (annotNum, annot, delay, width, color, font, size, vert, center) in cmdIR['annotations']:
+			updateViewPortLocal = updateViewPort and (annotNum == waveNum or annotNum == waveNum + 1)
+			#print ("annotNum = ", annotNum, " waveNum = ", waveNum, " annot = ", annot)
+			if self.currentLineHasArrow == True:
+				self.putText(annot, self.sigNameColWidth + 
+					self.signalWaveXOffset + 
+					delay +
+					self.waveHalfPeriod * annotNum + (self.waveHalfPeriod/2 if center == True else 0),
+					self.yBasisRegistered + self.arrowVertOffset - 1 - vert,
+					center, font, size, color, width, True, updateViewPortLocal)
+			else:
+				self.putText(annot, self.sigNameColWidth + 
+					self.signalWaveXOffset + 
+					delay +
+					self.waveHalfPeriod * annotNum + (self.waveHalfPeriod/2 if center == True else 0),
+					self.signalWaveYOffset +
+						(self.currentLineNumber - self.linesWithArrow) * (self.waveHeight + self.signalWaveYSpacing) + 
+						self.linesWithArrow * self.arrowLineAdjust - self.waveHeight/2 - vert, 
+					center, font, size, color, width, False, updateViewPortLocal)
+
+	def compileSigName (self, cmd):
+		cmdIR = {}
+		cmdIR['cmdNum'] = 1
+		cmdIR['length'] = len(cmd)
+		#simplifies parsing multi-char tokens
+		cmd = cmd.replace(chr(1), '#')
+		cmd = cmd.replace(chr(2), ';')
+		cmd = cmd.replace(chr(6), ',')
+		cmdIR['name'] = cmd
+		return cmdIR
+
+	def compileWaves (self, cmd, waveHalfDuration):
+		#each token is (cNum, thisC, nextC, lastC, color, waveCount, delay, resetPendingTimeDelta)
+		#color codes ($x) are folded into the color of the tokens that follow them
+		cmdIR = {}
+		cmdIR['cmdNum'] = 2
+		cmdIR['length'] = len(cmd)
+		cmdIR['hasArrow'] = cmd.find('<') >= 0 or cmd.find('-') >= 0 or cmd.find('>') >= 0
+		tokens = []
+		error = ''
+		waveCount = 0
+		color = 'w'
+		cNum = 0
+		cmd = cmd.strip()
+		nextCList = self.resolvednextCList(cmd)
+		#lastC and the color are carried forward in the same single pass
+		lastC = chr(0)
+		lLastC = chr(0)
+		for thisC in cmd:
+			if lastC == '$':
+				cNum += 1
+				color = thisC
+				if thisC not in colorMap.keys():
+					error = "Error: Wrong color code: " + thisC + "."
+				lastC = lLastC #restore from stored variable with value previous to $
+				lLastC = chr(0)
+				continue
+
+			if thisC == '$':
+				cNum += 1
+				lLastC = lastC #store thisC previous to $
+				lastC = '$'
+				continue
+			
+			nextC = nextCList[cNum]
+
+			#for meta chars, don't reset since following chars will decide
+			#for DXz, pendingTimeDelta will be used and pendingTimeDelta will be assigned from timeDelta at end of function
+			#for dx, pendingTimeDelta will be used only if the last char was R or F 
+			#and pendingTimeDelta will be set to 0 at the end of the function
+			resetPendingTimeDelta = thisC not in "DXz0123456789/<->|+dx" or (thisC in "dx" and lastC not in "RFDXz")
+
+			delay = 0
+			if thisC in "0123456789":
+				#a number follows a command for additional delay
+				if thisC == '0' and nextC in "|<->":
+					delay = 10 * waveHalfDuration / 9
+				else:
+					delay = int(thisC) * waveHalfDuration / 9
+			elif thisC not in "|PpCcKkQqrRfFDXdxlhzSs<>-/":
+				error = "Error: Wrong code: " + thisC + "."
+
+			tokens.append((cNum, thisC, nextC, lastC, color, waveCount, delay, resetPendingTimeDelta))
+
+			if thisC in 'PpCcKkQq':
+				waveCount += 2
+			elif thisC in 'rRfFDXdxlhzs<-':
+				waveCount += 1
+			
+			if thisC not in '0123456789/|':
+				lastC = thisC
+			cNum += 1
+
+		cmdIR['tokens'] = tokens
+		cmdIR['waveCount'] = waveCount
+		cmdIR['color'] = color
+		cmdIR['error'] = error
+		return cmdIR
+
+	def processCommand (self, cmdIR, line, whichCommandHasCursor = 0, charPosWithinCmd = -1):
+		cmdNum = cmdIR['cmdNum']
+		if cmdNum == 1:
+			#process signal name
+			self.tdDrawSigNamesText(cmdIR['name'], whichCommandHasCursor == 1)
+		elif cmdNum == 2:
+			#process waves
+			self.currentLineArrowLineList = []
+			self.currentLineHasArrow = cmdIR['hasArrow']
+			self.riseClockArrow = False
+			self.fallClockArrow = False
+			self.invertedClockHeight = 0
+			tokens = cmdIR['tokens']
+			if self.deferWaveTokens > 0 and len(tokens) > self.deferWaveTokens and cmdIR['hasArrow'] == False:
+				(xCurrent, yCurrent) = self.deferWaves(tokens, cmdIR['waveCount'], whichCommandHasCursor, charPosWithinCmd)
+			else:
+				(xCurrent, yCurrent) = self.drawWaveTokens(tokens, cmdIR['hasArrow'], whichCommandHasCursor, charPosWithinCmd)
+
+			if tokens:
+				# vertical line on the signal name, once per row
+				yBasis = self.yBasisRegistered
+				self.emitLine(self.signalWaveXOffset + self.sigNameColWidth, 
+					yBasis - self.signalWaveYSpacing - self.waveHeight, 
+					self.signalWaveXOffset + self.sigNameColWidth, 
+					yBasis + self.waveHeight)
+
+			self.currentColor = cmdIR['color']
+			if cmdIR['error'] != '':
+				self.errorMessage = cmdIR['error']
+
+			if whichCommandHasCursor == 2 and xCurrent > 0:
+				#print ("processCommand: yCurrent = ", yCurrent, " self.currentLineNumber = ", self.currentLineNumber)
+				self.centerOnRequest = (xCurrent, yCurrent)
+
+			#print ("-- cmdNum is 2 -- A seeing cmd = ", cmd, " self.currentLineHasArrow = ", self.currentLineHasArrow)
+			if self.currentLineHasArrow == True:
+				self.linesWithArrow += 1
+
+			#anchor/
+			xCurrent = self.signalWaveXOffset + self.sigNameColWidth + self.waveHalfPeriod * cmdIR['waveCount']
+			yCurrent = self.signalWaveYOffset + (self.currentLineNumber - self.linesWithArrow) *\
+				(self.waveHeight + self.signalWaveYSpacing) + self.linesWithArrow * self.arrowLineAdjust
+			self.emitAnchor(xCurrent + self.waveHalfPeriod + self.xMargin, 
+								yCurrent + self.waveHeight + self.yMargin,  
+								xCurrent + self.waveHalfPeriod + self.xMargin + 1, 
+								yCurrent + self.waveHeight + self.yMargin + 1)
+				
+			self.timeDelta = 0
+
+		elif cmdNum == 3:
+			self.doAnnotationCmd (cmdIR, whichCommandHasCursor == 3, charPosWithinCmd)
+			#print ("-- B self.linesWithArrow = ", self.linesWithArrow)
+		#print ("==============================================================================================")
+
+	def drawWaveTokens (self, tokens, hasArrow, whichCommandHasCursor = 0, charPosWithinCmd = -1):
+		#draws the tokens of a wave command, see compileWaves, and returns where the
+		#one at charPosWithinCmd starts; (0, 0) if the cursor is not on them
+		xCurrent = 0
+		yCurrent = 0
+		for (cNum, thisC, nextC, lastC, color, waveCount, delay, resetPendingTimeDelta) in tokens:
+			self.currentColor = color
+			xBasis = self.signalWaveXOffset + self.sigNameColWidth + self.waveHalfPeriod * waveCount
+			yBasis = self.signalWaveYOffset + (self.currentLineNumber - self.linesWithArrow) *\
+				(self.waveHeight + self.signalWaveYSpacing) + self.linesWithArrow * self.arrowLineAdjust
+			self.yBasisRegistered = yBasis
+
+			if resetPendingTimeDelta:
+				self.pendingTimeDelta = 0
+
+			if thisC == '|':
+				if waveCount > 0 or self.timeDelta > 0:
+					if self.currentColor in textColorMap:
+						self.markerPen = makePen(textColorMap[self.currentColor])
+					else:
+						self.markerPen = makePen(self.markerPenColor)
+					#x0 = xBasis
+					#x0 = xBasis + self.waveHalfPeriod + self.timeDelta
+					x0 = xBasis + self.timeDelta
+					if waveCount != 0:
+						x0 -= self.waveTransitionTime/2
+					#print ("saw | -- X = ", x0, " -- waveCount = ", waveCount, " -- xBasis = ", xBasis, " -- self.timeDelta", self.timeDelta)
+					l = self.emitLine(x0,
+						yBasis - self.waveHeight - self.waveHeight,
+						x0,
+						yBasis + self.waveHeight/4, self.markerPen)
+					self.setZValue(l, 3) #topmost
+				self.timeDelta = 0
+			elif thisC in 'PpCcKkQq': #clock pulses
+				#print ("processCommand: thisC = ", thisC, " ord (nextC) = ", ord(nextC))
+				if thisC == "Q":
+					self.riseClockArrow = True
+					self.fallClockArrow = True
+					self.tdDrawClock(waveCount, lastC, 'P', 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
+				elif thisC == "q":
+					self.riseClockArrow = True
+					self.fallClockArrow = True
+					self.tdDrawClock(waveCount, lastC, 'p', 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
+				elif thisC == "K":
+					self.riseClockArrow = False
+					self.fallClockArrow = True
+					self.tdDrawClock(waveCount, lastC, 'P', 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
+				elif thisC == "k":
+					self.riseClockArrow = False
+					self.fallClockArrow = True
+					self.tdDrawClock(waveCount, lastC, 'p', 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
+				elif thisC == "C":
+					self.riseClockArrow = True
+					self.fallClockArrow = False
+					self.tdDrawClock(waveCount, lastC, 'P', 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
+				elif thisC == "c":
+					self.riseClockArrow = True
+					self.fallClockArrow = False
+					self.tdDrawClock(waveCount, lastC, 'p', 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
+				else:
+					self.riseClockArrow = False
+					self.fallClockArrow = False
+					self.tdDrawClock(waveCount, lastC, thisC, 'Pp'['CcKkQq'.find(nextC)%2], (xBasis, yBasis), nextC==chr(0))
+				self.timeDelta = 0
+			elif thisC in 'rR': 
+				self.tdDrawRise(waveCount, thisC, nextC, (xBasis, yBasis))
+				self.timeDelta = 0
+			elif thisC in 'fF':
+				self.tdDrawFall(waveCount, thisC, nextC, (xBasis, yBasis))
+				self.timeDelta = 0
+			elif thisC in 'DX':
+				self.tdDrawDataDX(waveCount, lastC, thisC, nextC, (xBasis, yBasis))
+				self.timeDelta = 0
+			elif thisC in 'dx': #lower case
+				self.tdDrawDatadx(waveCount, lastC, thisC, nextC, (xBasis, yBasis))
+				self.timeDelta = 0
+			elif thisC == 'l': #lower case
+				self.tdDrawLow(waveCount, nextC, lastC, (xBasis, yBasis))
+				self.timeDelta = 0
+			elif thisC == 'h': #lower case
+				self.tdDrawHigh(waveCount, nextC, (xBasis, yBasis))
+				self.timeDelta = 0
+			elif thisC == 'z': #lower case
+				self.tdDrawTri(waveCount, nextC, (xBasis, yBasis))
+				self.timeDelta = 0
+			elif thisC == 'S':
+				#char to draw the grid lines, but does not advance waveCount
+				#does not add space
+				self.tdDrawSpace(waveCount, hasArrow, (xBasis, yBasis))
+				self.timeDelta = 0
+			elif thisC == 's':
+				self.tdDrawSpace(waveCount, hasArrow, (xBasis, yBasis))
+				self.timeDelta = 0
+			elif thisC == '<' or thisC == '>' or thisC == '-':
+				self.tdDrawHorizArrow(waveCount, thisC, nextC, (xBasis, yBasis))
+				self.timeDelta = 0
+			elif thisC in "0123456789":
+				#a number follows a command for additional delay
+				self.timeDelta = delay
+			elif thisC == '/':
+				self.tdDrawGap(waveCount, lastC, nextC, (xBasis, yBasis))
+
+			if whichCommandHasCursor == 2:
+				if charPosWithinCmd == cNum or charPosWithinCmd == cNum + 1:
+					xCurrent = xBasis
+					yCurrent = yBasis
+					#print ("==== snapshot xCurrent = ", xCurrent, "==== snapshot yCurrent = ", yCurrent)
+
+		return (xCurrent, yCurrent)
+
+	def deferWaves (self, tokens, commandWaveCount, whichCommandHasCursor = 0, charPosWithinCmd = -1):
+		#lays a long wave command out without drawing it and adds it to deferredWaves;
+		#drawDeferredRun draws it later, a run of tokens at a time. A run starts on a
+		#token that clears pendingTimeDelta, so all it takes from the tokens before
+		#it is timeDelta and clockEvenOddFlip, followed here the way drawWaveTokens
+		#changes them and kept with it. Returns what drawWaveTokens returns
+		xOffset = self.signalWaveXOffset + self.sigNameColWidth
+		yBasis = self.signalWaveYOffset + (self.currentLineNumber - self.linesWithArrow) *\
+			(self.waveHeight + self.signalWaveYSpacing) + self.linesWithArrow * self.arrowLineAdjust
+		wave = {}
+		wave['tokens'] = tokens
+		wave['state'] = self.engineState()
+		#where it goes in the primitives of its line
+		wave['at'] = len(self.primitives)
+		#the waves are drawn within the name line drawn after them and the anchor
+		#of the line, but for markers, which can reach above the name line and past
+		#the anchor; the extent is that of the markers, None without any
+		wave['extent'] = None
+		#top and bottom of all it draws, a little wide, and runs as (first token,
+		#token after the last, timeDelta, clockEvenOddFlip, left, right), left and
+		#right as wide of the run by a period
+		wave['band'] = (yBasis - 2 * self.waveHeight - self.signalWaveYSpacing, yBasis + self.waveHeight + self.signalWaveYSpacing)
+		runs = []
+		start = 0
+		timeDelta = self.timeDelta
+		flip = self.clockEvenOddFlip
+		startTimeDelta = timeDelta
+		startFlip = flip
+		markerPen = self.markerPen
+		clockArrows = (self.riseClockArrow, self.fallClockArrow)
+		xCurrent = 0
+		yCurrent = 0
+		for index in range(0, len(tokens)):
+			(cNum, thisC, nextC, lastC, color, waveCount, delay, resetPendingTimeDelta) = tokens[index]
+			if index - start >= self.deferRunTokens and resetPendingTimeDelta:
+				runs.append((start, index, startTimeDelta, startFlip,
+					xOffset + self.waveHalfPeriod * (tokens[start][5] - 2), xOffset + self.waveHalfPeriod * (waveCount + 2)))
+				start = index
+				startTimeDelta = timeDelta
+				startFlip = flip
+			if thisC == '|':
+				if waveCount > 0 or timeDelta > 0:
+					if color in textColorMap:
+						markerPen = makePen(textColorMap[color])
+					else:
+						markerPen = makePen(self.markerPenColor)
+					x0 = xOffset + self.waveHalfPeriod * waveCount + timeDelta
+					if waveCount != 0:
+						x0 -= self.waveTransitionTime/2
+					bounds = lineExtent(x0, yBasis - self.waveHeight - self.waveHeight, x0, yBasis + self.waveHeight/4, markerPen[1])
+					if wave['extent'] is None:
+						wave['extent'] = bounds
+					elif bounds is not None:
+						wave['extent'] = (min(wave['extent'][0], bounds[0]), min(wave['extent'][1], bounds[1]),
+							max(wave['extent'][2], bounds[2]), max(wave['extent'][3], bounds[3]))
+				timeDelta = 0
+			elif thisC in "0123456789":
+				timeDelta = delay
+			elif thisC in 'PpCcKkQqrRfFDXdxlhzSs<>-':
+				timeDelta = 0
+			if thisC in 'PpCcKkQq':
+				clockArrows = (thisC in 'QqCc', thisC in 'QqKk')
+				if waveCount % 2 == 1:
+					flip = 1
+			if whichCommandHasCursor == 2:
+				if charPosWithinCmd == cNum or charPosWithinCmd == cNum + 1:
+					xCurrent = xOffset + self.waveHalfPeriod * waveCount
+					yCurrent = yBasis
+		runs.append((start, len(tokens), startTimeDelta, startFlip,
+			xOffset + self.waveHalfPeriod * (tokens[start][5] - 2), xOffset + self.waveHalfPeriod * (commandWaveCount + 2)))
+		wave['runs'] = runs
+		self.deferredWaves.append(wave)
+
+		#the last run is drawn and dropped, for the state the command leaves
+		primitives = self.primitives
+		self.primitives = []
+		self.markerPen = markerPen
+		(self.riseClockArrow, self.fallClockArrow) = clockArrows
+		self.drawRunTokens(wave, len(runs) - 1)
+		self.primitives = primitives
+		return (xCurrent, yCurrent)
+
+	def drawRunTokens (self, wave, index):
+		(start, stop, timeDelta, flip) = wave['runs'][index][0:4]
+		if flip != self.clockEvenOddFlip:
+			self.gridPen, self.gridOtherPen = self.gridOtherPen, self.gridPen
+		self.clockEvenOddFlip = flip
+		self.timeDelta = timeDelta
+		self.pendingTimeDelta = 0
+		self.drawWaveTokens(wave['tokens'][start:stop], False)
+
+	def drawDeferredRun (self, wave, index):
+		#the primitives of run index of a wave laid out by deferWaves. The engine
+		#takes over the state the wave was laid out in, so it should be one that
+		#draws nothing else
+		self.loadEngineState(wave['state'])
+		self.drawRunTokens(wave, index)
+		primitives = self.primitives
+		self.primitives = []
+		return primitives
+
+	def processDirective (self, data):
+		#print ("processDirective: data is ", data)
+		directiveList = data.strip().split(' ')
+		#print ("processDirective: directiveList[] is ", directiveList)
+		if directiveList[0] == "grid":
+			#print ("----show grid directive found")
+			if len(directiveList) > 1:
+				if directiveList[1] == "off" or directiveList[1] == "none":
+					self.evenGridsEnabled = False
+					self.oddGridsEnabled = False
+				elif directiveList[1] == "both":
+					self.evenGridsEnabled = True
+					self.oddGridsEnabled = True
+				elif directiveList[1] == "odd":
+					self.evenGridsEnabled = False
+					self.oddGridsEnabled = True
+				elif directiveList[1] == "even":
+					self.evenGridsEnabled = True
+					self.oddGridsEnabled = False
+				else:
+					try:
+						self.maxWaveCount = int(directiveList[1])
+					except:
+						self.maxWaveCount = 0
+		elif directiveList[0] == "margin":
+			#print ("----show grid directive found")
+			if len(directiveList) > 2:
+				try:
+					val2 = int(directiveList[2])
+				except:
+					val2 = 0
+				if directiveList[1] == "top":
+					if val2 < 50 or val2 > 300:
+						val2 = 150
+					self.signalWaveYOffset = val2
+				elif directiveList[1] == "signal":
+					if val2 < 46 or val2 > 100:
+						val2 = 50
+					self.signalWaveXOffset = val2
+				elif directiveList[1] == "side":
+					if val2 < 20 or val2 > 100:
+						val2 = 30
+					self.xMargin = val2
+				elif directiveList[1] == "bottom":
+					if val2 < 20 or val2 > 200:
+						val2 = 50
+					self.yMargin = val2
+		elif directiveList[0] == "color":
+			if len(directiveList) > 1:
+				if directiveList[1] == "dirarr":
+					#print ("----color debug directive found")
+					if len(directiveList) > 2:
+						#print ("----color debug directive found, directiveList[2] = ", directiveList[2], " len = ", len(directiveList[2]))
+						if directiveList[2].find('#') == 0:
+							self.dirArrowPenColor = directiveList[2]
+						elif directiveList[2] in textColorMap:
+							#print ("----color debug directive found in textColorMap")
+							self.dirArrowPenColor = textColorMap[directiveList[2]]
+						elif directiveList[2] in colorMap:
+							#print ("----color debug directive found in colorMap")
+							self.dirArrowPenColor = colorMap[directiveList[2]]
+						else:
+							return
+						self.dirArrowPen = makePen(self.dirArrowPenColor)
+				elif directiveList[1] == "tri":
+					if len(directiveList) > 2:
+						if directiveList[2].find('#') == 0:
+							self.triPenColor = directiveList[2]
+						elif directiveList[2] in textColorMap:
+							self.triPenColor = textColorMap[directiveList[2]]
+						elif directiveList[2] in colorMap:
+							self.triPenColor = colorMap[directiveList[2]]
+						else:
+							return
+						self.triPen = makePen(self.triPenColor, 1, 'dash')
+				elif directiveList[1] == "gap":
+					if len(directiveList) > 2:
+						if directiveList[2].find('#') == 0:
+							self.gapBrushColor = directiveList[2]
+						elif directiveList[2] in textColorMap:
+							self.gapBrushColor = textColorMap[directiveList[2]]
+						elif directiveList[2] in colorMap:
+							self.gapBrushColor = colorMap[directiveList[2]]
+						else:
+							return
+				elif directiveList[1] == "grid":
+					if len(directiveList) > 3:
+						if directiveList[2] == "both":
+							if directiveList[3].find('#') == 0:
+								self.gridOtherPenColor = self.gridPenColor = directiveList[3]
+							elif directiveList[3] in textColorMap:
+								self.gridOtherPenColor = self.gridPenColor = textColorMap[directiveList[3]]
+							elif directiveList[3] in colorMap:
+								self.gridOtherPenColor = self.gridPenColor = colorMap[directiveList[3]]
+							else:
+								return
+							self.gridPen = makePen(self.gridPenColor, 1, 'dot')
+							self.gridOtherPen = makePen(self.gridOtherPenColor, 1, 'dot')
+						elif directiveList[2] == "odd":
+							if directiveList[3].find('#') == 0:
+								self.gridPenColor = directiveList[3]
+							elif directiveList[3] in textColorMap:
+								self.gridPenColor = textColorMap[directiveList[3]]
+							elif directiveList[3] in colorMap:
+								self.gridPenColor = colorMap[directiveList[3]]
+							else:
+								return
+							self.gridPen = makePen(self.gridPenColor, 1, 'dot')
+						elif directiveList[2] == "even":
+							if directiveList[3].find('#') == 0:
+								self.gridOtherPenColor = directiveList[3]
+							elif directiveList[3] in textColorMap:
+								self.gridOtherPenColor = textColorMap[directiveList[3]]
+							elif directiveList[3] in colorMap:
+								self.gridOtherPenColor = colorMap[directiveList[3]]
+							else:
+								return
+							self.gridOtherPen = makePen(self.gridOtherPenColor, 1, 'dot')
+					elif len(directiveList) > 2:
+						if directiveList[2].find('#') == 0:
+							self.gridOtherPenColor = self.gridPenColor = directiveList[2]
+						elif directiveList[2] in textColorMap:
+							self.gridOtherPenColor = self.gridPenColor = textColorMap[directiveList[2]]
+						elif directiveList[2] in colorMap:
+							self.gridOtherPenColor = self.gridPenColor = colorMap[directiveList[2]]
+						else:
+							return
+						self.gridPen = makePen(self.gridPenColor, 1, 'dot')
+						self.gridOtherPen = makePen(self.gridOtherPenColor, 1, 'dot')
+					#print ("self.gridPenColor = ", self.gridPenColor)
+					#print ("self.gridOtherPenColor = ", self.gridOtherPenColor)
+		else:
+			if len(directiveList) > 1:
+				try:
+					val2 = int(directiveList[1])
+				except:
+					val2 = 0
+			else:
+				val2 = 0
+			#print ("val2 = ", val2)
+			if val2 > 20 and directiveList[0] == "height":
+				self.waveHeightChange = self.waveHeight #store the old value
+				self.waveHeight = val2
+				self.waveHeightChange -= self.waveHeight #subract the new value
+				self.gapHeight = self.waveHeight
+				self.signalWaveYSpacing = self.waveHeight
+				self.arrowVertOffset = -self.waveHeight/2 - self.signalWaveYSpacing
+				self.arrowLineAdjust = self.waveHeight/2
+			elif val2 > 39 and directiveList[0] == "tick":
+				#print ("processDirective: directiveList[0] is tick = ", directiveList[0])
+				#print ("-- processDirective: setting self.waveHalfPeriod")
+				self.waveHalfPeriod = val2 / 2
+				self.waveHalfDuration = self.waveHalfPeriod - self.waveTransitionTime
+				#print ("-- processDirective: self.waveHalfPeriod = ", self.waveHalfPeriod)
+			elif val2 > 1 and directiveList[0] == "tran":
+				self.waveTransitionTime = val2
+				self.waveHalfDuration = self.waveHalfPeriod - self.waveTransitionTime
+			elif directiveList[0] == "font":
+				#print ("--Found !set -- font = ", val2)
+				if len(directiveList) > 1:
+					val2 = directiveList[1]
+				else:
+					val2 = 'Sans'
+				if val2 != '':
+					self.sigNameFont = val2
+				else:
+					val2 = 'Courier'
+			elif directiveList[0] == "fontsize":
+				if len(directiveList) > 2:
+					try:
+						val2 = int(directiveList[2])
+					except:
+						val2 = 12
+					if val2 > 8 and val2 < 72:
+						self.sigNameFontSize = val2
+					else:
+						self.sigNameFontSize = 12
+				else:
+					self.sigNameFontSize = 12
+			elif directiveList[0] == "clockarrow":
+				if len(directiveList) > 1:
+					try:
+						val2 = int(directiveList[1])
+					except:
+						self.clockArrowSize = 15
+
+					if val2 > 7 and val2 < 25:
+						self.clockArrowSize = val2
+					else:
+						self.clockArrowSize = 15
+				else:
+					self.clockArrowSize = 15
+			elif directiveList[0] == "arrow":
+				if len(directiveList) > 1:
+					try:
+						val2 = int(directiveList[1])
+					except:
+						self.arrowSize = 9
+					if val2 > 7 and val2 < 25:
+						self.arrowSize = val2
+					else:
+						self.arrowSize = 9
+				else:
+					self.arrowSize = 9
+			elif directiveList[0] == "arrowmarker":
+				if len(directiveList) > 1:
+					try:
+						val2 = int(directiveList[1])
+					except:
+						self.arrowLineEnds = 10
+
+					if val2 > 5 and val2 < 50:
+						self.arrowLineEnds = val2
+					else:
+						self.arrowLineEnds = 10
+				else:
+					self.arrowLineEnds = 10
+
+	def compileLine (self, data):
+		#TimingDiagrammer caches this
+		return self.compileLineIR(data, self.waveHalfDuration)
+
+	def lineIRKey (self, data, waveHalfDuration):
+		return (data, waveHalfDuration, self.fontName, self.fontSize)
+
+	def compileLineIR (self, data, waveHalfDuration):
+		#no Qt calls and no writes to self in here, the render worker thread runs this too
+		dataList = data.strip().split(';')
+		commands = []
+		lineIR = {}
+		lineIR['commands'] = commands
+		lineIR['lineCount'] = 1
+		lineIR['directionArrow'] = None
+		lineIR['overlayAnnotation'] = None
+		cmdNum = 1
+		for cmd in dataList:
+			newPos = cmd.rfind('+')
+			if newPos >= 0:
+				lineIR['directionArrow'] = cmd[newPos + 1:]
+				lineIR['lineCount'] = 0
+				break
+
+			newPos = cmd.rfind('^')
+			if newPos >= 0:
+				lineIR['overlayAnnotation'] = cmd[newPos + 1:]
+				lineIR['lineCount'] = 0
+				break
+
+			if cmdNum == 1:
+				commands.append(self.compileSigName(cmd))
+			elif cmdNum == 2:
+				commands.append(self.compileWaves(cmd, waveHalfDuration))
+			else:
+				cmd4 = ''
+				if len(dataList) == 4:
+					#for the annotation command, send annot params in cmd4
+					cmd4 = dataList[3]
+				commands.append(self.compileAnnotations(cmd, cmd4))
+			cmdNum += 1
+			if cmdNum > 3:
+				break
+		return lineIR
+
+	def drawWaves1Line (self, line, data, cursorIsOnThisLine = False, currentColumn = -1):
+		if self.clockEvenOddFlip == 1:
+			#if already swapped, correct to original pen colors (red/blue)
+			self.gridPen, self.gridOtherPen = self.gridOtherPen, self.gridPen
+			self.clockEvenOddFlip = 0
+		self.pendingArrowDelay = 0
+		lineIR = self.compileLine(data)
+		self.currentLineArrowLineList = []
+		self.currentLineArrowPolyList = []
+		commandBoundary = 0
+		lastCommandBoundary = 0
+		whichCommandHasCursor = 0
+		for cmdIR in lineIR['commands']:
+			self.pendingTimeDelta = 0
+			self.currentLineNumber = line #NOTE, starts at 0
+			commandBoundary += cmdIR['length'] + 1 #the semicolon is also counted
+			if currentColumn < commandBoundary and cursorIsOnThisLine == True:
+				if whichCommandHasCursor == 0:
+					#only first match
+					whichCommandHasCursor = cmdIR['cmdNum']
+
+			self.processCommand(cmdIR, line, whichCommandHasCursor, currentColumn - lastCommandBoundary) 
+			lastCommandBoundary = commandBoundary
+
+		if lineIR['directionArrow'] is not None:
+			self.directionArrowsList.append(lineIR['directionArrow'])
+		if lineIR['overlayAnnotation'] is not None:
+			self.overlayAnnotationList.append(lineIR['overlayAnnotation'])
+		return lineIR['lineCount']
+
+	def directiveStateKey(self):
+		#everything set by #! directives that changes how a line is drawn
+		if self.clockEvenOddFlip == 1:
+			gridPens = (self.gridOtherPen, self.gridPen)
+		else:
+			gridPens = (self.gridPen, self.gridOtherPen)
+		return (gridPens,
+			self.evenGridsEnabled, self.oddGridsEnabled, self.maxWaveCount,
+			self.clockArrowSize, self.arrowSize, self.arrowLineEnds,
+			self.triPen, self.gapBrushColor, self.dirArrowPenColor,
+			self.waveHalfDuration, self.waveTransitionTime, self.waveHalfPeriod,
+			self.waveHeight, self.gapHeight, self.signalWaveYSpacing,
+			self.arrowVertOffset, self.arrowLineAdjust,
+			self.sigNameColWidth, self.signalNameXSpacing,
+			self.signalWaveXOffset, self.signalWaveYOffset,
+			self.xMargin, self.yMargin, self.fontName, self.fontSize)
+
+	def lineBand(self, line):
+		#(top, bottom) of the wave of the next line to draw, placed as processCommand
+		#places it from the line count and the arrow lines before it; annotations
+		#can reach past it
+		yBasis = self.signalWaveYOffset + (line - self.linesWithArrow) *\
+			(self.waveHeight + self.signalWaveYSpacing) + self.linesWithArrow * self.arrowLineAdjust
+		return (yBasis - self.waveHeight - self.signalWaveYSpacing, yBasis + self.waveHeight)
+
+	def lineStateKey(self, line):
+		#runtime state carried from one line into the next
+		return (line, self.currentLineNumber, self.linesWithArrow, self.yBasisRegistered,
+			self.clockEvenOddFlip, self.waveHeightChange, self.timeDelta, self.currentLineHasArrow)
+
+	def saveLineState(self):
+		return (self.clockEvenOddFlip, self.linesWithArrow, self.currentLineHasArrow,
+			self.currentLineNumber, self.yBasisRegistered, self.timeDelta,
+			self.pendingTimeDelta, self.pendingArrowDelay, self.currentColor,
+			self.riseClockArrow, self.fallClockArrow, self.markerPen)
+
+	def restoreLineState(self, state):
+		if state[0] != self.clockEvenOddFlip:
+			self.gridPen, self.gridOtherPen = self.gridOtherPen, self.gridPen
+		(self.clockEvenOddFlip, self.linesWithArrow, self.currentLineHasArrow,
+			self.currentLineNumber, self.yBasisRegistered, self.timeDelta,
+			self.pendingTimeDelta, self.pendingArrowDelay, self.currentColor,
+			self.riseClockArrow, self.fallClockArrow, self.markerPen) = state
+
+	def engineState(self):
+		#a copy of what drawing reads and carries from line to line, directives
+		#and fonts included, for an engine on another thread to lay out lines
+		#from; the primitives and the lists that collect them are left out
+		if TimingEngine.engineStateNames is None:
+			TimingEngine.engineStateNames = [name for name in vars(TimingEngine())
+				if name not in ('primitives', 'gridRuns', 'gridRunsOf', 'directionArrowsList',
+					'overlayAnnotationList', 'deferredWaves', 'centerOnRequest', 'errorMessage')]
+		return copy.deepcopy(dict((name, getattr(self, name)) for name in TimingEngine.engineStateNames))
+
+	def loadEngineState(self, state):
+		#takes over a copy made by engineState
+		self.__dict__.update(state)
+		self.primitives = []
+		self.gridRuns = {}
+		self.gridRunsOf = None
+		self.directionArrowsList = []
+		self.overlayAnnotationList = []
+		self.deferredWaves = []
+		self.centerOnRequest = None
+		self.errorMessage = ''
+
+	def fillAllGrids(self):
+		for i in range(self.maxWaveCount):
+			xBasis = self.signalWaveXOffset + self.sigNameColWidth + self.waveHalfPeriod * i
+			yBasis = self.signalWaveYOffset + (self.currentLineNumber - self.linesWithArrow) *\
+				(self.waveHeight + self.signalWaveYSpacing) + self.linesWithArrow * self.arrowLineAdjust
+			#draw the grid, under the waves
+			if (i % 2) == 0:
+				self.emitGrid(xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
+					yBasis - self.waveHeight - self.signalWaveYSpacing, 
+					yBasis, self.gridOtherPen, z = -1)
+			elif (i % 2) == 1:
+				self.emitGrid(xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
+					yBasis - self.waveHeight - self.signalWaveYSpacing, 
+					yBasis, self.gridPen, z = -1)
+
+		#do anchor
+		self.emitAnchor(xBasis + self.waveHalfPeriod + self.xMargin, yBasis,  
+			xBasis + self.waveHalfPeriod + self.xMargin, yBasis)
+
+	def commandOf(self, data):
+		data = data.replace('\#', chr(1)) #replace literal '#' before separating comments
+		data = data.replace('\;', chr(2)) #replace literal ';' before separating comments
+		data = data.replace('\,', chr(6)) #replace literal ','
+		return data.split('#')[0] #allow all leading and trailing spaces
+
+	def putText(self, text, x, y, adjust=True, font="Sans", 
+			fsize=10, color="black", wrapWidth=-1, fill=True, updateViewPort = False):
+		textWidth = -1
+		if wrapWidth < 10*self.waveHalfPeriod and wrapWidth != -1:
+			textWidth = wrapWidth
+		elif wrapWidth != -1:
+			textWidth = self.waveHalfPeriod
+		width, height = self.measureText(text, font, fsize, textWidth)
+		if adjust == True:
+			x = x - width/2
+		cleared = self.clearNameColumn(text, x, font, fsize, textWidth)
+		if cleared != (text, x, textWidth):
+			(text, x, textWidth) = cleared
+			width, height = self.measureText(text, font, fsize, textWidth)
+		height *= 0.55
+
+		xCurrent = x
+		yCurrent = y - height*0.5
+		self.emitText(text, xCurrent, y - height*0.9, font, fsize, color, textWidth, 3)
+		#print ("------------------- putText: xCurrent = ", xCurrent, " -- yCurrent = ", yCurrent)
+		if fill == True:
+			self.emitRect(xCurrent, yCurrent, width, height*1.2, "white", 2)
+
+		#anchor
+		self.emitAnchor(xCurrent + width + self.xMargin, 0,  xCurrent + width + self.xMargin, 1)
+		if updateViewPort == True:
+			self.centerOnRequest = (xCurrent, yCurrent)
+
+	def clearNameColumn(self, text, x, font = None, size = None, wrapWidth = -1):
+		#with the name column pinned beside the view, a label that reaches across
+		#the line between the names and the waves would be torn in two as the
+		#waves scroll. One that is mostly among the waves is moved right of the
+		#line, one that is mostly among the names ends at it: elided, or wrapped if
+		#it wraps. Returns (text, x, wrapWidth); the text box has a 4 pixel blank margin
+		if self.clearNameColumnLabels == False:
+			return (text, x, wrapWidth)
+		separator = self.signalWaveXOffset + self.sigNameColWidth
+		width = self.measureText(text, font, size, wrapWidth)[0]
+		if x + 4 >= separator or x + width - 4 <= separator:
+			return (text, x, wrapWidth)
+		if x + width/2 >= separator:
+			return (text, separator, wrapWidth)
+		room = separator - x + 4
+		if wrapWidth != -1:
+			return (text, x, room)
+		return (self.elideText(text, room, font, size), x, wrapWidth)
+
+	def elideText(self, text, width, font = None, size = None):
+		#the longest start of each line of text that fits width with an ellipsis
+		rows = []
+		for row in text.split('\n'):
+			if self.measureText(row, font, size)[0] > width:
+				(low, high) = (0, len(row))
+				while low < high:
+					middle = (low + high + 1) // 2
+					if self.measureText(row[:middle] + '\u2026', font, size)[0] <= width:
+						low = middle
+					else:
+						high = middle - 1
+				row = row[:low] + '\u2026'
+			rows.append(row)
+		return '\n'.join(rows)
+
+	def tdDrawSigNamesText(self, text, updateViewPort = False):
+		#signal names use the default font
+		width, height = self.measureText(text)
+
+		x = self.signalNameXSpacing + self.sigNameColWidth
+		y = self.signalWaveYOffset + (self.currentLineNumber - self.linesWithArrow) *\
+			(self.waveHeight + self.signalWaveYSpacing) + self.linesWithArrow * self.arrowLineAdjust
+
+		xCurrent = x - width
+		yCurrent = y - self.waveHeight/2 - height/2
+		self.emitText(text, xCurrent, yCurrent)
+
+		width = max(width, self.signalNameXSpacing + self.sigNameColWidth) - self.signalNameXSpacing - self.sigNameColWidth
+
+		#this anchor is to ensure jpeg export with adequate margins
+		self.emitAnchor(-(width + self.xMargin), 0, -(width + self.xMargin), 1)
+		if updateViewPort == True:
+			self.centerOnRequest = (xCurrent, yCurrent)
+
+	def tdDrawHorizArrow(self, waveCount=-1, thisC=None, nextC=None, basis=(0, 0)):
+		xBasis, yBasis = basis
+		if thisC == '<':
+			if True: #waveCount > 0:
+				if self.maxWaveCount == 0:
+					#draw the grid
+					#FIXME
+					self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
+					#if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
+					#	self.emitLine(xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
+					#		yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+					#		xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
+					#		yBasis + self.arrowVertOffset, self.gridOtherPen)
+
+					#elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
+					#	self.emitLine(xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
+					#		yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+					#		xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
+					#		yBasis + self.arrowVertOffset, self.gridPen)
+
+			a = xBasis + self.timeDelta
+			c = xBasis + self.waveHalfDuration + self.waveTransitionTime/2 + self.timeDelta
+			if waveCount != 0:
+				a -= self.waveTransitionTime/2
+			self.tdDrawArrowHead((a, yBasis + self.arrowVertOffset), 'L')
+			l = self.emitLine(a, yBasis + self.arrowVertOffset, 
+									c, yBasis + self.arrowVertOffset)
+			#print ("2. self.currentLineNumber = ", self.currentLineNumber)
+			#print ("2. self.linesWithArrow = ", self.linesWithArrow)
+			#print ("2. yBasis = ", yBasis)
+			#print ("2. offs = ", yBasis + self.arrowVertOffset)
+			self.currentLineArrowLineList.append(l)
+			self.setZValue(l, 1)
+
+			#print ("saw < -- X = ", a, " -- waveCount = ", waveCount, " -- xBasis = ", xBasis, " -- self.timeDelta", self.timeDelta)
+			l = self.emitLine(a,
+				yBasis + self.arrowVertOffset - self.arrowLineEnds,
+				a, yBasis + self.arrowVertOffset + self.arrowLineEnds)
+			self.currentLineArrowLineList.append(l)
+			self.setZValue(l, 1)
+			self.pendingArrowDelay = self.timeDelta
+			self.timeDelta = 0
+		elif thisC == '-':
+			if waveCount > 0:
+				if self.maxWaveCount == 0:
+					#draw the grid
+					if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
+						self.emitGrid(xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
+							yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+							yBasis + self.arrowVertOffset + self.waveHeightChange/2, self.gridOtherPen)
+					elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
+						self.emitGrid(xBasis + self.waveTransitionTime/2 + self.waveHalfDuration, 
+							yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+							yBasis + self.arrowVertOffset + self.waveHeightChange/2, self.gridPen)
+
+			#print ("saw - -- pendingArrowDelay = ", self.pendingArrowDelay, "timeDelta = ", self.timeDelta)
+			a = xBasis - self.waveTransitionTime/2 + self.pendingArrowDelay
+			c = xBasis + self.waveHalfDuration + self.waveTransitionTime/2 + self.pendingArrowDelay + self.timeDelta
+			if waveCount == 0:
+				a = xBasis + self.timeDelta
+			l = self.emitLine(a, yBasis + self.arrowVertOffset, c, yBasis + self.arrowVertOffset)
+			self.currentLineArrowLineList.append(l)
+			self.setZValue(l, 1)
+			self.pendingArrowDelay += self.timeDelta
+			self.timeDelta = 0
+
+		elif thisC == '>':
+			a = xBasis - self.waveTransitionTime/2 + self.pendingArrowDelay
+			#print ("saw > -- X = ", a, " -- xBasis = ", xBasis, " -- self.timeDelta", self.timeDelta)
+			
+			self.tdDrawArrowHead((a, yBasis + self.arrowVertOffset), 'R')
+
+			l = self.emitLine(a, yBasis + self.arrowVertOffset - self.arrowLineEnds,
+				a, yBasis + self.arrowVertOffset + self.arrowLineEnds)
+			self.currentLineArrowLineList.append(l)
+			self.setZValue(l, 1)
+
+			self.timeDelta = 0
+			self.pendingArrowDelay = 0
+
+		self.currentLineHasArrow = True
+
+	def tdPrintOverlayAnnot (self, x0, y0, annot, font="Serif", fsize=15):
+		(annot, x, wrapWidth) = self.clearNameColumn(annot, int(x0) - fsize, font, fsize)
+		self.emitText(annot, x, int(y0) - fsize, font, fsize, self.dirArrowPenColor, wrapWidth, 3)
+		self.directionArrowTailState = 0
+
+	def tdDrawDirectionArrow (self, x0, y0, x1, y1, xm, ym):
+		color = self.dirArrowPenColor
+		xBias = 10 
+		yBias = 10
+
+		xl = (x0 + xm + xBias)/2
+		yl = (y0 + ym + yBias)/2
+
+		path = [((x0, y0),
+					(xl, yl),
+					(xm, ym),
+					(x1, y1))]
+		self.emitPath(path, self.dirArrowPen)
+
+		height = ym - y1
+		base = x1 - xm
+		self.tdDrawArrowHeadAngle((x1, y1), (height, base), self.clockArrowSize, color)
+
+	def tdDrawClock(self, waveCount=-1, lastC=None, thisC=None, nextC=None, basis=(0, 0), thisIsLastChar=False):
+		xBasis, yBasis = basis
+		x0 = xBasis
+		localWaveCount = waveCount
+		#print ("tdDrawClock: thisC = ", thisC, " localWaveCount = ", localWaveCount)
+		if (localWaveCount % 2) == 1 and self.clockEvenOddFlip == 0:
+			self.clockEvenOddFlip = 1
+			#swap the pen colors (red/blue)
+			self.gridPen, self.gridOtherPen = self.gridOtherPen, self.gridPen
+			
+		if thisC == 'P': #upper case
+			if lastC == 'l':
+				x0 += self.waveTransitionTime/2
+			
+			#print ("self.riseClockArrow = ", self.riseClockArrow, " self.fallClockArrow = ", self.fallClockArrow)
+			x1 = x0 + self.waveHalfDuration + self.timeDelta
+
+			if lastC == 'l':
+				x1 -= self.waveTransitionTime/2
+
+			if waveCount == 0 or lastC == 'z':
+				x0 += self.waveTransitionTime/2 #tweak to match the start time of non-clock signals or previous tristate signal
+			y0 = yBasis
+			y1 = yBasis
+
+			self.emitLine(x0, y0, x1, y1)
+
+			#print ("Doing P -- EVEN seeing maxWaveCount =", self.maxWaveCount, " localWaveCount", localWaveCount)
+			if self.maxWaveCount == 0:
+				#draw the grid
+				if self.evenGridsEnabled == True and (localWaveCount % 2) == self.clockEvenOddFlip:
+					self.emitLine(x1 + self.waveTransitionTime/2 - self.timeDelta, 
+						yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2,
+						x1 + self.waveTransitionTime/2 - self.timeDelta, 
+						yBasis, self.gridOtherPen)
+
+			localWaveCount += 1
+
+			x0 = x1 
+			x1 += self.waveTransitionTime
+			y0 = yBasis
+			y1 = yBasis - self.waveHeight
+			self.emitLine(x0, y0, x1, y1)
+			if self.riseClockArrow == True:
+				self.tdDrawArrowHeadAngle((x1, y1), (self.waveHeight, self.waveTransitionTime), self.clockArrowSize)
+
+			x0 = x1
+			x1 += self.waveHalfDuration - self.timeDelta
+			y0 = yBasis - self.waveHeight
+			y1 = yBasis - self.waveHeight
+			self.emitLine(x0, y0, x1, y1)
+
+			#draw the falling edge grid
+			#print ("Doing P -- ODD seeing maxWaveCount =", self.maxWaveCount, " localWaveCount", localWaveCount)
+			if self.oddGridsEnabled == True and (localWaveCount % 2) != self.clockEvenOddFlip:
+				self.emitLine(x1 + self.waveTransitionTime/2, 
+					yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+					x1 + self.waveTransitionTime/2, 
+					yBasis, self.gridPen)
+
+			#print ("thisC is UPPER P and nextC is ", nextC, " cmdNum = ", cmdNum)
+			if nextC in "pP":
+				#print ("CASE UPPER P of P is seen")
+				x0 = x1 
+				x1 += self.waveTransitionTime
+				y0 = yBasis - self.waveHeight
+				y1 = yBasis
+				self.emitLine(x0, y0, x1, y1)
+			elif nextC == 'z':
+				x0 = x1
+				x1 += self.waveTransitionTime
+				y0 = yBasis - self.waveHeight
+				y1 = yBasis - self.waveHeight/2
+				self.emitLine(x0, y0, x1, y1)
+				self.emitLine(x1, y1, x1 + self.waveTransitionTime/2, y1)
+			elif nextC in 'hfF':
+				x0 = x1
+				x1 += self.waveTransitionTime
+				self.emitLine(x0, yBasis - self.waveHeight, 
+					x1, yBasis - self.waveHeight)
+				self.emitLine(x1, yBasis - self.waveHeight, 
+					x1 + self.waveTransitionTime/2, yBasis - self.waveHeight)
+			elif nextC in 'lrR':
+				x0 = x1
+				x1 += self.waveTransitionTime
+				self.emitLine(x0, yBasis - self.waveHeight, 
+					x1, yBasis)
+				self.emitLine(x1, yBasis, 
+					x1 + self.waveTransitionTime/2, yBasis)
+			elif nextC in 'DdXx':
+				x0 = x1
+				x1 += self.waveTransitionTime/2
+				#print ("nextC in DdXx")
+				#print ("self.currentColor == ", self.currentColor)
+				if nextC in 'Dd' and self.currentColor != 'x':
+					if self.currentColor in colorMap.keys():
+						color = colorMap[self.currentColor]
+					else:
+						color = "light grey"
+				else:
+					color = "light grey"
+
+				if nextC in 'Xx' or (nextC in 'Dd' and self.currentColor != 'x'):
+					#print ("== seeing nextC in 'Xx' or (nextC in 'Dd' and self.currentColor != 'x')")
+					c = x0 + self.waveTransitionTime
+					#self.canvas.create_polygon(x1, yBasis - self.waveHeight, 
+					#	c + self.waveTransitionTime/2, yBasis - self.waveHeight, c + self.waveTransitionTime/2, yBasis)
+					pointList = [(x1, yBasis - self.waveHeight),
+							(c + self.waveTransitionTime/2, yBasis - self.waveHeight),
+							(c + self.waveTransitionTime/2, yBasis)]
+						
+					self.emitPolygon(pointList, color)
+
+				self.emitLine(x0, yBasis - self.waveHeight, x1, yBasis - self.waveHeight)
+				x0 = x1
+				x1 += self.waveTransitionTime
+				self.emitLine(x0, yBasis - self.waveHeight, 
+					x1, yBasis - self.waveHeight)
+				self.emitLine(x0, yBasis - self.waveHeight, 
+					x1, yBasis)
+
+			if self.fallClockArrow == True:
+				self.tdDrawArrowHeadAngle((x0+self.waveTransitionTime, y1), (-self.waveHeight, self.waveTransitionTime), self.clockArrowSize)
+				
+		elif thisC == 'p': #lower case
+			#print ("Doing small p -- at the beginning seeing riseClockArrow =", self.riseClockArrow)
+			if lastC == 'l':
+				x0 += self.waveTransitionTime/2
+			
+			x1 = x0 + self.waveHalfDuration + self.waveTransitionTime/2 + self.timeDelta
+			
+			if lastC == 'l':
+				x1 -= self.waveTransitionTime/2
+
+			if waveCount == 0 or lastC == 'z':
+				x0 += self.waveTransitionTime/2 #tweak to match the start time of non-clock signals or previous tristate signal
+			y0 = yBasis
+			y1 = yBasis
+			self.emitLine(x0, y0, x1, y1)
+
+			#print ("Doing small p -- EVEN seeing maxWaveCount =", self.maxWaveCount, " localWaveCount", localWaveCount)
+			if self.maxWaveCount == 0:
+				#draw the grid
+				if self.evenGridsEnabled == True and (localWaveCount % 2) == self.clockEvenOddFlip:
+					self.emitLine(x1 - self.timeDelta, 
+						yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+						x1 - self.timeDelta, 
+						yBasis, self.gridOtherPen)
+
+			localWaveCount += 1
+
+			x0 = x1 
+			y0 = yBasis
+			y1 = yBasis - self.waveHeight
+			self.emitLine(x0, y0, x1, y1)
+			if self.riseClockArrow == True:
+				self.tdDrawArrowHeadAngle((x1, y1), (1, 0), self.clockArrowSize)
+
+			x1 += self.waveHalfPeriod - self.timeDelta
+			y0 = yBasis - self.waveHeight
+			y1 = yBasis - self.waveHeight
+			self.emitLine(x0, y0, x1, y1)
+			
+			#draw the falling edge grid
+			#print ("Doing small p -- ODD seeing maxWaveCount =", self.maxWaveCount, " localWaveCount", localWaveCount)
+			if self.oddGridsEnabled == True and (localWaveCount % 2) != self.clockEvenOddFlip:
+				self.emitLine(x1, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+					x1,	yBasis, self.gridPen)
+
+			if nextC in "pP":
+				#print ("CASE P of P is seen")
+				x0 = x1
+				y0 = yBasis - self.waveHeight
+				y1 = yBasis
+				self.emitLine(x0, y0, x1, y1) 
+
+				x1 += self.waveTransitionTime/2 
+				y0 = yBasis
+				y1 = yBasis
+				self.emitLine(x0, y0, x1, y1)
+			elif nextC == 'z':
+				x0 = x1
+				x1 += self.waveTransitionTime
+				y0 = yBasis - self.waveHeight
+				y1 = yBasis - self.waveHeight/2
+				self.emitLine(x0, y0, x1, y1) 
+			elif nextC in 'hfF':
+				x0 = x1
+				x1 += self.waveTransitionTime
+				self.emitLine(x0, yBasis - self.waveHeight, 
+					x1, yBasis - self.waveHeight)
+			elif nextC in 'lrR':
+				x0 = x1
+				x1 += self.waveTransitionTime
+				self.emitLine(x0, yBasis - self.waveHeight, 
+					x1, yBasis)
+			elif nextC in 'DdXx':
+				x0 = x1
+				x1 += self.waveTransitionTime
+				if nextC in 'Dd' and self.currentColor != 'x':
+					if self.currentColor in colorMap.keys():
+						color = colorMap[self.currentColor]
+					else:
+						color = "light grey"
+				else:
+					color = "light grey"
+
+				if nextC in 'Xx' or (nextC in 'Dd' and self.currentColor != 'x'):
+					c = x0# + self.waveTransitionTime
+					pointList = [(x0, yBasis - self.waveHeight),
+							(x0 + self.waveTransitionTime, yBasis - self.waveHeight),
+							(x0 + self.waveTransitionTime, yBasis)]
+					self.emitPolygon(pointList, color)
+					#self.canvas.create_polygon(x0, yBasis - self.waveHeight, 
+					#	c + self.waveTransitionTime, yBasis - self.waveHeight, c + self.waveTransitionTime, yBasis)
+
+				self.emitLine(x0, yBasis - self.waveHeight, 
+					x1, yBasis - self.waveHeight)
+				self.emitLine(x0, yBasis - self.waveHeight, 
+					x1, yBasis)
+					
+			if self.fallClockArrow == True:
+				self.tdDrawArrowHeadAngle((x0, y1), (-1, 0), self.clockArrowSize)
+
+			#add total of waveTransitionTime/2 for pckq pulses
+			if thisIsLastChar == True:
+				x0 += self.waveTransitionTime/2
+				self.emitLine(x0, y1, x0 + self.waveTransitionTime/2, y1)
+
+		#add waveTransitionTime/4 for PCKQ pulses
+		if thisIsLastChar == True and thisC == "P":
+			x0 = xBasis + 2 * self.waveHalfDuration + 2 * self.waveTransitionTime
+			self.emitLine(x0, yBasis, 
+				x0 + self.waveTransitionTime/2, yBasis)
+
+		waveCount += 2
+		self.timeDelta = 0
+
+	def tdDrawFall(self, waveCount=-1, thisC=None, nextC=None, basis=(0, 0)):
+		xBasis, yBasis = basis
+		x0 = xBasis + self.waveTransitionTime/2
+		x1 = x0 + self.waveHalfDuration - self.timeDelta
+		y0 = yBasis - self.waveHeight
+		y1 = yBasis - self.waveHeight
+		self.emitLine(x0, y0, x1, y1)
+		color = "light grey"
+
+		if nextC in "dxDXpP":
+			if nextC in 'Dd' and self.currentColor != 'x':
+				if self.currentColor in colorMap.keys():
+					color = colorMap[self.currentColor]
+
+			if nextC in 'xX' or (nextC in 'dD' and self.currentColor != 'x'):
+				c = x1 + self.waveTransitionTime + self.timeDelta
+				pointList = [(x1, yBasis - self.waveHeight), 
+							(c, yBasis - self.waveHeight), 
+							(c, yBasis), 
+							(c - self.timeDelta, yBasis)]
+				self.emitPolygon(pointList, color)
+
+			if nextC in "pP":
+				self.emitLine(x1, y1, x1 + self.waveTransitionTime/2, yBasis)
+				self.emitLine(x1 + self.waveTransitionTime/2, yBasis, x1 + self.timeDelta + self.waveTransitionTime, yBasis)
+			else:
+				self.emitLine(x1, y0, x1 + self.waveTransitionTime, yBasis)
+
+			if nextC in 'dxDX':
+				self.emitLine(x1, y0, x1 + self.waveTransitionTime + self.timeDelta, y0)
+		elif nextC in 'hf':
+			self.emitLine(x1, y0, x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2)
+			self.emitLine(x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2, x1 + self.waveTransitionTime, yBasis - self.waveHeight)
+			self.emitLine(x1 + self.waveTransitionTime, yBasis - self.waveHeight, x1 + self.waveTransitionTime + self.timeDelta, yBasis - self.waveHeight)
+		elif nextC == 'z':
+			self.emitLine(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight/2)
+			self.emitLine(x1 + self.waveTransitionTime, yBasis - self.waveHeight/2, 
+				x1 + self.waveTransitionTime + self.timeDelta, yBasis - self.waveHeight/2)
+
+		self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
+		#FIXME
+		#if self.maxWaveCount == 0:
+		#	#draw the grid
+		#	if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
+		#		self.emitLine(x1 + self.timeDelta, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+		#			x1 + self.timeDelta, yBasis, self.gridOtherPen)
+		#	elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
+		#		self.emitLine(x1 + self.timeDelta, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+		#			x1 + self.timeDelta, yBasis, self.gridPen)
+
+		x0 = x1
+		x1 += self.waveTransitionTime
+		y0 = yBasis - self.waveHeight
+		y1 = y0 + self.waveHeight
+		#if nextC != 'h' and nextC != 'z' and nextC != 'f':
+		if nextC not in 'hzfFpP':
+			if thisC == 'F':
+				pointList = [(x0, y0),
+							(x0 + self.waveTransitionTime, y0),
+							(x1 + self.waveTransitionTime, y1),
+							(x0 + self.waveTransitionTime, y1)]
+				self.emitPolygon(pointList, color)
+				self.emitLine(x0, y0, x0 + self.waveTransitionTime, y0)
+				self.emitLine(x0 + self.waveTransitionTime, y0, x1 + self.waveTransitionTime, y1)
+				if nextC not in 'Fl': #anirb - 27-Dec-2022
+					self.emitLine(x0 + self.waveTransitionTime, y1, x1 + self.waveTransitionTime, y1)
+
+			self.emitLine(x0, y0, x1, y1)
+			self.emitLine(x1, y1, x1 + self.timeDelta, y1)
+		elif nextC == 'F':
+			self.emitLine(x0, y0, x1 + self.timeDelta, y0)
+		self.pendingTimeDelta = self.timeDelta
+
+	def tdDrawRise (self, waveCount=-1, thisC=None, nextC=None, basis=(0, 0)):
+		#print ("Doing r -- at the beginning seeing timeDelta =", self.timeDelta)
+		#print ("Doing 'r' -- at the beginning -- invertedClockHeight = ", invertedClockHeight)
+		xBasis, yBasis = basis
+		x0 = xBasis + self.waveTransitionTime/2
+		x1 = x0 + self.waveHalfDuration - self.timeDelta
+		y0 = yBasis
+		y1 = yBasis
+		self.emitLine(x0, y0, x1, y1)
+		color = "light grey"
+
+		if nextC in "dxDX":
+			if nextC in 'xX' or (nextC in 'Dd' and self.currentColor != 'x'):
+				if nextC in 'Dd' and self.currentColor != 'x':
+					if self.currentColor in colorMap.keys():
+						color = colorMap[self.currentColor]
+					else:
+						color = "light grey"
+
+				c = x1 + self.waveTransitionTime + self.timeDelta
+				pointList = [(x1, yBasis), 
+							(c, yBasis), 
+							(c, yBasis - self.waveHeight), 
+							(c - self.timeDelta, yBasis - self.waveHeight)]
+				self.emitPolygon(pointList, color)
+			self.emitLine(x1, yBasis, x1 + self.waveTransitionTime + self.timeDelta, yBasis)
+		elif nextC in 'lr':
+			self.emitLine(x1, y0, x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2)
+			self.emitLine(x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2, x1 + self.waveTransitionTime, yBasis)
+			self.emitLine(x1 + self.waveTransitionTime, yBasis, x1 + self.waveTransitionTime + self.timeDelta, yBasis)
+		elif nextC in 'pP':
+			self.emitLine(x1, yBasis, x1 + self.waveTransitionTime/2 + self.timeDelta, yBasis)
+		elif nextC == 'z':
+			self.emitLine(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight/2)
+			self.emitLine(x1 + self.waveTransitionTime, yBasis - self.waveHeight/2, 
+				x1 + self.waveTransitionTime + self.timeDelta, yBasis - self.waveHeight/2)
+
+		self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
+		#FIXME
+		#if self.maxWaveCount == 0:
+		#	#draw the grid
+		#	if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
+		#		self.emitLine(x1 + self.timeDelta, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+		#			x1 + self.timeDelta, yBasis, self.gridOtherPen)
+		#	elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
+		#		self.emitLine(x1 + self.timeDelta, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+		#			x1 + self.timeDelta, yBasis, self.gridPen)
+
+		x0 = x1 
+		x1 += self.waveTransitionTime
+		y0 = yBasis
+		y1 = yBasis - self.waveHeight
+		if nextC not in 'lzrRpP':
+			if thisC == 'R':
+				pointList = [(x0, y0),
+							(x0 + self.waveTransitionTime, y1),
+							(x1 + self.waveTransitionTime, y1),
+							(x0 + self.waveTransitionTime, y0)]
+				self.emitPolygon(pointList, color)
+				self.emitLine(x0, y0, x0 + self.waveTransitionTime, y0)
+				self.emitLine(x0 + self.waveTransitionTime, y0, x1 + self.waveTransitionTime, y1)
+				if nextC not in 'Rh': #anirb - 27-Dec-2022
+					self.emitLine(x0 + self.waveTransitionTime, y1, x1 + self.waveTransitionTime, y1)
+			self.emitLine(x0, y0, x1, y1)
+			if self.timeDelta > 0:
+				self.emitLine(x1, y1, x1 + self.timeDelta, y1)
+		elif nextC == 'R':
+			self.emitLine(x0, y0, x1 + self.timeDelta, y0)
+		self.pendingTimeDelta = self.timeDelta
+
+	def tdDrawHigh (self, waveCount=-1, nextC=None, basis=(0, 0)):
+		xBasis, yBasis = basis
+		x0 = xBasis + self.waveTransitionTime/2
+		if nextC in "zldxDXrRpP":
+			x1 = x0 + self.waveHalfDuration
+		else:
+			x1 = x0 + self.waveHalfPeriod
+
+		y0 = yBasis - self.waveHeight
+		y1 = y0
+		self.emitLine(x0, y0, x1, y1)
+		if nextC in "ldxDXrR":
+			#print ("== seeing h and nextC in ldxDXrRpP")
+			if nextC in 'Dd' and self.currentColor != 'x':
+				if self.currentColor in colorMap.keys():
+					color = colorMap[self.currentColor]
+				else:
+					color = "light grey"
+			else:
+				color = "light grey"
+
+			if nextC in 'xX' or nextC == 'X' or (nextC in 'Dd' and self.currentColor != 'x'):
+				c = x1 + self.waveTransitionTime
+				pointList = [(x1, yBasis - self.waveHeight), 
+							(c, yBasis - self.waveHeight), 
+							(c, yBasis)]
+				self.emitPolygon(pointList, color)
+			if nextC in 'dxDX':
+				self.emitLine(x1, y0, x1 + self.waveTransitionTime, y0)
+			self.emitLine(x1, y0, x1 + self.waveTransitionTime, yBasis)
+		elif nextC == 'z':
+			self.emitLine(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight/2)
+		elif nextC in 'pP':
+			self.emitLine(x1, y0, x1 + self.waveTransitionTime/2, yBasis)
+
+		self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
+		#if self.maxWaveCount == 0:
+		#	#draw the grid
+		#	if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
+		#		self.emitLine(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+		#			x0 + self.waveHalfDuration, yBasis, self.gridOtherPen)
+		#	elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
+		#		self.emitLine(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+		#			x0 + self.waveHalfDuration, yBasis, self.gridPen)
+
+	def tdDrawLow (self, waveCount=-1, nextC=None, lastC=None, basis=(0, 0)):
+		xBasis, yBasis = basis
+		if lastC.lower() in "cpkq" and waveCount != 0:
+			x0 = xBasis
+		else:
+			x0 = xBasis + self.waveTransitionTime/2
+
+		if nextC in "zhdxDXfF":
+			x1 = x0 + self.waveHalfDuration
+		else:
+			x1 = x0 + self.waveHalfPeriod
+
+		if lastC.lower() in "cpkq" and waveCount != 0:
+			x1 += self.waveTransitionTime/2
+
+		y0 = yBasis
+		y1 = y0
+		self.emitLine(x0, y0, x1, y1)
+
+		if nextC in "hdxDXfF":
+			#if nextC in "h" and waveCount != 0:
+			#	x1 -= self.waveTransitionTime/2
+
+			if nextC in 'Dd' and self.currentColor != 'x':
+				if self.currentColor in colorMap.keys():
+					color = colorMap[self.currentColor]
+				else:
+					color = "light grey"
+			else:
+				color = "light grey"
+
+			if nextC in 'xX' or (nextC in 'Dd' and self.currentColor != 'x'):
+				#print ("== seeing l and nextC in xdDX")
+				c = x1 + self.waveTransitionTime
+				pointList = [(x1, yBasis), 
+							(c, yBasis), 
+							(c, yBasis - self.waveHeight)]
+				self.emitPolygon(pointList, color)
+
+			if nextC in 'dxDX':
+				self.emitLine(x1, yBasis, x1 + self.waveTransitionTime, yBasis)
+			self.emitLine(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight)
+		elif nextC == 'z':
+			self.emitLine(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight/2)
+
+		self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
+
+	def tdDrawDatadx(self, waveCount=-1, lastC=None, thisC=None, nextC=None, basis=(0, 0)):
+		#print ("tdDrawDatadx: thisC=", thisC, " nextC=", nextC, " lastC=", lastC)
+		#print ("tdDrawDatadx: self.currentColor=", self.currentColor, " self.pendingTimeDelta=", self.pendingTimeDelta, " lastC=", lastC)
+		#print ("tdDrawDatadx: self.waveHeightChange = ", self.waveHeightChange)
+		xBasis, yBasis = basis
+		color = "light grey"
+		if self.currentColor in colorMap.keys():
+			color = colorMap[self.currentColor]
+
+		#only clocks with zero rise/fall times
+		lastWasClock = (lastC == "c" or lastC == "p") and waveCount != 0
+		
+		if lastWasClock:
+			x0 = xBasis - self.waveTransitionTime/2
+		else:
+			x0 = xBasis + self.waveTransitionTime/2
+
+		self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
+		#FIXME
+		#if self.maxWaveCount == 0:
+		#	#draw the grid
+		#	if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
+		#		self.emitLine(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+		#			x0 + self.waveHalfDuration, yBasis, self.gridOtherPen)
+		#	elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
+		#		self.emitLine(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+		#			x0 + self.waveHalfDuration, yBasis, self.gridPen)
+
+		if nextC in "zlhrRfFPp" or\
+				(thisC == 'd' and (nextC in 'xX')) or\
+				(thisC == 'x' and (nextC in 'dDX')):
+			x1 = x0 + self.waveHalfDuration
+		else:
+			x1 = x0 + self.waveHalfPeriod
+
+		if lastWasClock:
+			x1 += self.waveTransitionTime
+
+		if thisC == 'x' or (thisC == 'd' and self.currentColor != 'x'):
+			#print ("if A --------")
+			y0 = yBasis
+			y1 = yBasis
+			a = x0
+			b = y0
+			c = x1
+			d = y0
+			y0 = yBasis - self.waveHeight
+			y1 = y0
+			e = c
+			f = y0
+			g = a
+			if lastC == 'R':
+				g += self.waveTransitionTime
+			if lastC == 'F':
+				a += self.waveTransitionTime
+			h = f
+
+			pointList = [(a - self.pendingTimeDelta, b),
+						(c, d),
+						(e, f),
+						(g - self.pendingTimeDelta, h)]
+			if (thisC == 'd' and self.currentColor != 'x'):
+				self.emitPolygon(pointList, color)
+				if lastC in 'DXzxhlrRfF':
+					if lastC == 'z':
+						pointList = [(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis),
+								(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight/2),
+								(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight)]
+					elif lastC in 'lr':
+						pointList = [(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight),
+								(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis),
+								(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)]
+					elif lastC in 'hf':
+						pointList = [(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight),
+								(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight),
+								(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)]
+					else:
+						pointList = [(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis),
+							(xBasis - self.pendingTimeDelta, yBasis - self.waveHeight/2),
+							(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight)]
+					if lastC != 'R' and lastC != 'F':
+						self.emitPolygon(pointList, color)
+
+					if lastC in 'lrR':
+						self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
+							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)
+						self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis,
+							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)
+						if lastC == 'R':
+							l = self.emitLine(xBasis + self.waveTransitionTime/2 + self.waveTransitionTime - self.pendingTimeDelta, yBasis - self.waveHeight, 
+								xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)
+					elif lastC in 'hfF':
+						self.emitLine(xBasis + self.waveTransitionTime/2, yBasis - self.waveHeight, 
+							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight)
+						self.emitLine(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight,
+							xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)
+						if lastC == 'F':
+							self.emitLine(xBasis + self.waveTransitionTime/2 + self.waveTransitionTime - self.pendingTimeDelta, yBasis, 
+								xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight)
+			else:
+				self.emitPolygon(pointList, "light grey")
+
+			if nextC == 'z':
+				c = x1 + self.waveTransitionTime
+				d = yBasis - self.waveHeight/2
+				pointList = [(x1, yBasis),
+							(c, d),
+							(x1, yBasis - self.waveHeight)]
+				if (thisC == 'd' and self.currentColor != 'x'):
+					self.emitPolygon(pointList, color)
+				else:
+					self.emitPolygon(pointList, "light grey")
+			elif nextC in 'lrR' or nextC == 'p' or nextC == 'P':
+				c = x1 + self.waveTransitionTime
+				pointList = [(x1, yBasis),
+							(c, yBasis),
+							(x1, yBasis - self.waveHeight)]
+				if (thisC == 'd' and self.currentColor != 'x'):
+					self.emitPolygon(pointList, color)
+				else:
+					self.emitPolygon(pointList, "light grey")
+			elif nextC in 'hfF':
+				c = x1 + self.waveTransitionTime
+				pointList = [(x1, yBasis),
+							(x1, yBasis - self.waveHeight),
+							(c, yBasis - self.waveHeight)]
+				if (thisC == 'd' and self.currentColor != 'x'):
+					self.emitPolygon(pointList, color)
+				else:
+					self.emitPolygon(pointList, "light grey")
+			elif nextC in 'dXD' or (thisC == 'd' and nextC == 'x'): 
+				a = x1 + self.waveTransitionTime/2
+				c = x1 + self.waveTransitionTime
+				if (thisC == 'd' and self.currentColor != 'x'):
+					pointList = [(x1, yBasis),
+								(x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2),
+								(x1, yBasis - self.waveHeight)]
+					self.emitPolygon(pointList, color)
+					if nextC in 'xX':
+						pointList = [(x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2),
+									(x1 + self.waveTransitionTime, yBasis),
+									(x1 + self.waveTransitionTime, yBasis - self.waveHeight)]
+						self.emitPolygon(pointList, "light grey")
+						self.emitLine(x1, yBasis, x1 + self.waveTransitionTime, yBasis - self.waveHeight)
+						self.emitLine(x1, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis)
+				else:
+					#print ("if B --------")
+					if nextC in 'dD':
+						#print ("if C --------")
+						pointList = [(x1, yBasis),
+								(x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2),
+								(x1, yBasis - self.waveHeight)]
+						self.emitPolygon(pointList, "light grey")
+					else: #'X'
+						#print ("if D --------")
+						pointList = [(x1, yBasis),
+								(x1 + self.waveTransitionTime, yBasis),
+								(x1 + self.waveTransitionTime, yBasis - self.waveHeight),
+								(x1, yBasis - self.waveHeight)]
+						self.emitPolygon(pointList, "light grey")
+						
+				if thisC == 'x':
+					if nextC in 'dD' and self.currentColor != 'x':
+						pointList = [(x1 + self.waveTransitionTime, yBasis),
+								(a, yBasis - self.waveHeight/2),
+								(x1 + self.waveTransitionTime, yBasis - self.waveHeight)]
+						self.emitPolygon(pointList, color)
+						self.emitLine(x1, yBasis, x1 + self.waveTransitionTime, yBasis - self.waveHeight)
+						self.emitLine(x1, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis)
+					elif nextC in 'dD':
+						self.emitLine(x1, yBasis, x1 + self.waveTransitionTime, yBasis - self.waveHeight)
+						self.emitLine(x1, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis)
+					elif nextC in 'X':
+						pointList = [(x1 + self.waveTransitionTime, yBasis),
+								(a, yBasis - self.waveHeight/2),
+								(x1 + self.waveTransitionTime, yBasis - self.waveHeight)]
+						self.emitPolygon(pointList, "light grey")
+						self.emitLine(x1, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis - self.waveHeight)
+						self.emitLine(x1, yBasis, x1 + self.waveTransitionTime, yBasis)
+		elif thisC == 'd'and nextC in 'xX':
+			#print ("if B --------")
+			pointList = [(x1 + self.waveTransitionTime/2, yBasis - self.waveHeight/2),
+					(x1 + self.waveTransitionTime, yBasis),
+					(x1 + self.waveTransitionTime, yBasis - self.waveHeight)]
+			self.emitPolygon(pointList, "light grey")
+			self.emitLine(x1, yBasis, x1 + self.waveTransitionTime, yBasis - self.waveHeight)
+			self.emitLine(x1, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis)
+
+		y0 = yBasis
+		y1 = y0
+		self.emitLine(x0 - self.pendingTimeDelta, y0, x1, y1)
+		y0 = yBasis - self.waveHeight
+		y1 = y0
+		self.emitLine(x0 - self.pendingTimeDelta, y0, x1, y1)
+
+		if nextC in 'pP':
+			self.emitLine(x1, yBasis, x1 + self.waveTransitionTime, yBasis)
+			self.emitLine(x1, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis)
+		elif nextC in 'lrR':
+			self.emitLine(x1, y0, x1 + self.waveTransitionTime, yBasis)
+			self.emitLine(x1, yBasis, x1 + self.waveTransitionTime, yBasis)
+		elif nextC in 'hfF':
+			self.emitLine(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight)
+			self.emitLine(x1, yBasis, x1 + self.waveTransitionTime, yBasis - self.waveHeight)
+		elif nextC == 'z':
+			self.emitLine(x1, y0, x1 + self.waveTransitionTime, yBasis - self.waveHeight/2)
+			self.emitLine(x1, yBasis, x1 + self.waveTransitionTime, yBasis - self.waveHeight/2)
+		
+		if (thisC == 'd' and self.currentColor != 'x'):
+			if waveCount != 0 and lastC in 'DXzx':
+				if lastC == 'z':
+					self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis, 
+						xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight/2)
+					self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
+						xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight/2)
+				else:
+					self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis, 
+						xBasis - self.pendingTimeDelta, yBasis - self.waveHeight/2)
+					self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
+						xBasis - self.pendingTimeDelta, yBasis - self.waveHeight/2)
+
+				self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis, x1 - self.pendingTimeDelta, yBasis)
+				self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, x1 - self.pendingTimeDelta, yBasis - self.waveHeight)
+		self.pendingTimeDelta = 0
+
+	def tdDrawDataDX(self, waveCount=-1, lastC=None, thisC=None, nextC=None, basis=(0, 0)):
+		#print ("tdDrawDataDX: thisC=", thisC, " ord nextC=", ord(nextC), nextC, " lastC=", lastC)
+		#print ("tdDrawDataDX: at start, self.pendingTimeDelta=", self.pendingTimeDelta)
+		xBasis, yBasis = basis
+		if (lastC == "P" or lastC == "p") and waveCount != 0:
+			x0 = xBasis
+		else:
+			x0 = xBasis + self.waveTransitionTime/2
+		x1 = x0 + self.waveHalfDuration
+		y0 = yBasis
+		y1 = y0
+
+		self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
+		#FIXME
+		#if self.maxWaveCount == 0:
+		#	#draw the grid
+		#	if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
+		#		self.emitLine(x1, y0 - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, x1, y0, self.gridOtherPen)
+		#	elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
+		#		self.emitLine(x1, y0 - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, x1, y0, self.gridPen)
+
+		a = x0
+		b = y0
+		c = x1
+		d = y1
+		x0 = x1
+		x1 += self.waveTransitionTime
+		e = c + self.waveTransitionTime/2
+		f = y1 - self.waveHeight/2
+		y1 -= self.waveHeight
+		g = c
+		h = y1 
+		i = a
+		if lastC == 'R':
+			i += self.waveTransitionTime
+		elif lastC == 'F':
+			a += self.waveTransitionTime
+		j = h
+		color = "light grey"
+		if self.currentColor in colorMap.keys():
+			color = colorMap[self.currentColor]
+
+		#print ("tdDrawDataDX: 0. thisC == 'D' and self.currentColor = ", self.currentColor)
+		if thisC == 'X' or (thisC == 'D' and self.currentColor != 'x'):
+			if (thisC == 'D' and self.currentColor != 'x'):
+				#print ("tdDrawDataDX: 1. thisC == 'D' and self.currentColor != 'x'")
+				pointList = [(a - self.pendingTimeDelta, b),
+							(c - self.timeDelta, d),
+							(e - self.timeDelta, y1 + self.waveHeight/2),
+							(g - self.timeDelta, h),
+							(i - self.pendingTimeDelta, j)]
+				self.emitPolygon(pointList, color)
+				if lastC in 'DXzxhlrRfF':
+					#FIX PR0
+					# to handle cases like: D$rD - when the first D is seen, the color is not yet known, so the
+					#left triangle for the next D cannot be filled - it must be deferred when the next D is being
+					#processed as thisC
+					if lastC == 'z':
+						pointList = [(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis),
+								(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight/2),
+								(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight)]
+					elif lastC in 'lr':
+						pointList = [(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight),
+								(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis),
+								(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)]
+					elif lastC in 'hf':
+						pointList = [(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight),
+								(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight),
+								(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)]
+					else:
+						pointList = [(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis),
+								(xBasis - self.pendingTimeDelta, yBasis - self.waveHeight/2),
+								(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight)]
+					if lastC != 'R' and lastC != 'F':
+						self.emitPolygon(pointList, color)
+
+					if lastC == 'z':
+						#redo the angled lines only if last was D or X or z
+						self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis, 
+							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight/2)
+						self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
+							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight/2)
+					elif lastC in 'DXx':
+						#print ("tdDrawDataDX: 1. waveCount != 0 and lastC in 'DX'")
+						self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis, 
+							xBasis - self.pendingTimeDelta, yBasis - self.waveHeight/2)
+						self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
+							xBasis - self.pendingTimeDelta, yBasis - self.waveHeight/2)
+					elif lastC in 'lrR':
+						self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
+							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)
+						self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis,
+							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)
+						if lastC == 'R':
+							self.emitLine(xBasis + self.waveTransitionTime/2 + self.waveTransitionTime - self.pendingTimeDelta, yBasis - self.waveHeight, 
+								xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)
+					elif lastC in 'hfF':
+						self.emitLine(xBasis + self.waveTransitionTime/2, yBasis - self.waveHeight, 
+							xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight)
+						self.emitLine(xBasis - self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight,
+							xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis)
+						if lastC == 'F':
+							self.emitLine(xBasis + self.waveTransitionTime/2 + self.waveTransitionTime - self.pendingTimeDelta, yBasis, 
+								xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight)
+				#horizontal lines
+				if lastC in 'DXzrR':
+					self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis - self.waveHeight, 
+						xBasis + self.waveTransitionTime/2, yBasis - self.waveHeight)
+					self.emitLine(xBasis + self.waveTransitionTime/2 - self.pendingTimeDelta, yBasis, 
+						xBasis + self.waveTransitionTime/2, yBasis)
+			else:
+				pointList = [(a, b),
+							(c - self.timeDelta, d),
+							(e - self.timeDelta, y1 + self.waveHeight/2),
+							(g - self.timeDelta, h),
+							(i, j)]
+				self.emitPolygon(pointList, "light grey")
+
+			if nextC == 'z':
+				a = x1 - self.waveTransitionTime
+				c = x1
+				d = yBasis - self.waveHeight/2
+				pointList = [(x1 - self.waveTransitionTime - self.timeDelta, yBasis),
+						(x1 - self.timeDelta, d),
+						(x1 - self.waveTransitionTime - self.timeDelta, yBasis - self.waveHeight)]
+				if (thisC == 'D' and self.currentColor != 'x'):
+					self.emitPolygon(pointList, color)
+				else:
+					self.emitPolygon(pointList, "light grey")
+			elif nextC in 'dxXD':
+				#print ("tdDrawDataDX: A. nextC in 'dxXD'")
+				a = x1
+				e = x1 - self.waveTransitionTime/2
+				f = yBasis - self.waveHeight/2
+				if nextC in 'xX':
+					pointList = [(a, yBasis),
+							(a, yBasis - self.waveHeight),
+							(a - self.timeDelta, yBasis - self.waveHeight),
+							(e - self.timeDelta, yBasis - self.waveHeight/2),
+							(a - self.timeDelta, yBasis)]
+					self.emitPolygon(pointList, "light grey")
+				elif self.currentColor != 'x':
+					pointList = [(a, yBasis),
+							(a, yBasis - self.waveHeight),
+							(a - self.timeDelta, yBasis - self.waveHeight),
+							(e - self.timeDelta, yBasis - self.waveHeight/2),
+							(a - self.timeDelta, yBasis)]
+					self.emitPolygon(pointList, color)
+			elif nextC in 'hfF':
+				#print ("thisC == 'X' or (thisC == 'D' and self.currentColor != 'x') === and === nextC in 'hfF'")
+				a = x1 - self.waveTransitionTime
+				d = yBasis - self.waveHeight
+				pointList = [(a - self.timeDelta, yBasis),
+						(a - self.timeDelta, d),
+						(x1 - self.timeDelta, d)]
+				if thisC == 'D' and self.currentColor != 'x':
+					self.emitPolygon(pointList, color)
+				else:
+					self.emitPolygon(pointList, "light grey")
+			elif nextC in 'lrRpP':
+				a = x1 - self.waveTransitionTime
+				d = yBasis
+				pointList = [(a - self.timeDelta, yBasis - self.waveHeight),
+						(a - self.timeDelta, d),
+						(x1 - self.timeDelta, d)]
+				if thisC == 'D' and self.currentColor != 'x':
+					self.emitPolygon(pointList, color)
+				else:
+					self.emitPolygon(pointList, "light grey")
+		elif thisC == 'D':
+			if nextC in 'xXdD':
+				#print ("tdDrawDataDX: B. nextC in 'dxXD', self.currentColor = ", self.currentColor)
+				a = x1 - self.waveTransitionTime/2
+				c = x1
+				f = yBasis - self.waveHeight
+				pointList = [(a - self.timeDelta, yBasis - self.waveHeight/2),
+						(c - self.timeDelta, yBasis),
+						(c, yBasis),
+						(c, yBasis - self.waveHeight),
+						(c - self.timeDelta, yBasis - self.waveHeight)]
+				if nextC in 'xX':
+					self.emitPolygon(pointList, "light grey")
+				elif self.currentColor != 'x':
+					self.emitPolygon(pointList, color)
+
+
+		if nextC == 'z':
+			gx1 = xBasis + self.waveTransitionTime/2 + self.waveHalfDuration
+			#draw lines last
+			self.emitLine(gx1 - self.timeDelta, yBasis - self.waveHeight, 
+						gx1 + self.waveTransitionTime - self.timeDelta, yBasis - self.waveHeight/2)
+			self.emitLine(gx1 - self.timeDelta, yBasis, 
+						gx1 + self.waveTransitionTime - self.timeDelta, yBasis - self.waveHeight/2)
+			self.emitLine(gx1 + self.waveTransitionTime - self.timeDelta, yBasis - self.waveHeight/2, 
+				x1, yBasis - self.waveHeight/2, self.triPen)
+
+		if nextC not in 'zlrRpP':
+			#angled line to top
+			self.emitLine(x0 - self.timeDelta, y0, x1 - self.timeDelta, y1)
+			if nextC in 'hfF':
+				self.emitLine(x0 - self.timeDelta, y1, x1 - self.timeDelta, y1)
+		elif nextC in 'lrR':
+			self.emitLine(x0 - self.timeDelta, y0, x1 - self.timeDelta, y0)
+		elif nextC in 'pP':
+			self.emitLine(x0 - self.timeDelta, y1, x0 + self.waveTransitionTime - self.timeDelta, y0)
+			self.emitLine(x0 - self.timeDelta, y0, x1 - self.timeDelta, y0)
+
+		x0 = xBasis + self.waveTransitionTime/2
+		x1 = x0 + self.waveHalfDuration
+		y0 = yBasis - self.waveHeight
+		#horizontal line at top
+		self.emitLine(x0, y0, x1 - self.timeDelta, y0) 
+		x0 = x1
+		x1 += self.waveTransitionTime
+		y0 = yBasis - self.waveHeight
+		y1 = yBasis
+		if nextC not in 'zhfF':
+			#angled line to bottom
+			self.emitLine(x0 - self.timeDelta, y0, x1 - self.timeDelta, y1)
+
+			#additional bottom lines needed to the right of crossover when timeDelta is enabled
+			self.emitLine(x1 - self.timeDelta, y1, x1, y1) 
+
+		if nextC not in 'lrRzpP':
+			#additional top lines needed to the right of crossover when timeDelta is enabled
+			self.emitLine(x1 - self.timeDelta, y0, x1, y0)
+
+		x0 = xBasis + self.waveTransitionTime/2
+		x1 = x0 + self.waveHalfDuration
+		y0 = yBasis
+		y1 = y0
+
+		#horizontal line at bottom
+		self.emitLine(x0, y0, x1 - self.timeDelta, y0)
+		self.pendingTimeDelta = self.timeDelta
+		#print ("tdDrawDataDX: exiting... self.pendingTimeDelta=", self.pendingTimeDelta)
+
+	def tdDrawSpace(self, waveCount, hasArrow, basis=(0, 0)):
+		xBasis, yBasis = basis
+		x0 = xBasis + self.waveTransitionTime/2
+		if hasArrow == False: #no arrow
+			#print ("-- seeing 's', this line has arrows ...")
+			if self.maxWaveCount == 0:
+				self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
+				#FIXME
+				#draw the grid
+				#if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
+				#	self.emitLine(x0 + self.waveHalfDuration,
+				#		yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+				#		x0 + self.waveHalfDuration,
+				#		yBasis, self.gridOtherPen)
+				#elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
+				#	self.emitLine(x0 + self.waveHalfDuration,
+				#		yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+				#		x0 + self.waveHalfDuration,
+				#		yBasis, self.gridPen)
+		else:
+			if self.maxWaveCount == 0:
+				self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
+				#FIXME
+				#if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
+				#	self.emitLine(x0 + self.waveHalfDuration,
+				#		yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2,
+				#		x0 + self.waveHalfDuration,
+				#		yBasis + self.arrowVertOffset, self.gridOtherPen)
+				#elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
+				#	self.emitLine(x0 + self.waveHalfDuration,
+				#		yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2,
+				#		x0 + self.waveHalfDuration,
+				#		yBasis + self.arrowVertOffset, self.gridPen)
+
+	def tdDrawTri(self, waveCount, nextC=None, basis=(0, 0)):
+		xBasis, yBasis = basis
+		x0 = xBasis + self.waveTransitionTime/2
+		if nextC in "dDXxlhrRfFpP":
+			x1 = x0 + self.waveHalfDuration
+		else:
+			x1 = x0 + self.waveHalfPeriod
+
+		y0 = yBasis - self.waveHeight/2
+		y1 = y0
+
+		if self.maxWaveCount == 0:
+			self.drawGrid (xBasis + self.waveTransitionTime/2, yBasis, waveCount)
+			#FIXME
+			#draw the grid
+			#if (self.evenGridsEnabled == True and (waveCount % 2) == 0):
+			#	self.emitLine(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+			#		x0 + self.waveHalfDuration, yBasis, self.gridOtherPen)
+			#elif (self.oddGridsEnabled == True and (waveCount % 2) == 1):
+			#	self.emitLine(x0 + self.waveHalfDuration, yBasis - self.waveHeight - self.signalWaveYSpacing + self.waveHeightChange/2, 
+			#		x0 + self.waveHalfDuration, yBasis, self.gridPen)
+
+		c = x1 + self.waveTransitionTime
+
+		if nextC in 'xX' or (nextC in 'dD' and self.currentColor != 'x'):
+			pointList = [(x1 - self.timeDelta, y0),
+					(c - self.timeDelta, yBasis),
+					(c, yBasis),
+					(c, yBasis - self.waveHeight),
+					(c - self.timeDelta, yBasis - self.waveHeight)]
+			if nextC in 'dD' and self.currentColor != 'x':
+				color = "light grey"
+				if self.currentColor in colorMap.keys():
+					color = colorMap[self.currentColor]
+				self.emitPolygon(pointList, color)
+			else:
+				self.emitPolygon(pointList, "light grey")
+
+		if nextC in 'dDXx':
+			self.emitLine(x1 - self.timeDelta, y0, 
+				x1 + self.waveTransitionTime - self.timeDelta, yBasis - self.waveHeight)
+			self.emitLine(x1 - self.timeDelta, y0, 
+				x1 + self.waveTransitionTime - self.timeDelta, yBasis)
+			self.emitLine(x1 + self.waveTransitionTime - self.timeDelta, yBasis - self.waveHeight, 
+				x1 + self.waveTransitionTime, yBasis - self.waveHeight)
+			self.emitLine(x1 + self.waveTransitionTime - self.timeDelta, yBasis, 
+				x1 + self.waveTransitionTime, yBasis)
+			self.emitLine(x0 - self.pendingTimeDelta, y0, x1 - self.timeDelta, y1, self.triPen)
+		elif nextC in 'hfF':
+			self.emitLine(x0, y0, c - self.waveTransitionTime - self.timeDelta, y0, self.triPen) 
+			self.emitLine(x0 + self.waveHalfDuration - self.timeDelta, y0, c - self.timeDelta, yBasis - self.waveHeight)
+			self.emitLine(c - self.timeDelta, yBasis - self.waveHeight, x1 + self.waveTransitionTime, yBasis - self.waveHeight)
+		elif nextC in 'lrRpP':
+			self.emitLine(x0, y0, c - self.waveTransitionTime - self.timeDelta, y0, self.triPen)
+			self.emitLine(x0 + self.waveHalfDuration - self.timeDelta, y0, c - self.timeDelta, yBasis)
+			self.emitLine(c - self.timeDelta, yBasis, x1 + self.waveTransitionTime, yBasis)
+		else:
+			self.emitLine(x0, y0, c - self.waveTransitionTime, y0, self.triPen)
+	
+		self.pendingTimeDelta = self.timeDelta
+		#print ("tdDrawTri: exiting... self.pendingTimeDelta=", self.pendingTimeDelta)
+
+	def tdDrawGap(self, waveCount, lastC=None, nextC=None, basis=(0, 0)):
+		xBasis, yBasis = basis
+		xShift = -6
+		x0 = xBasis - self.waveHalfDuration/2 + xShift
+		color = self.gapPenColor
+
+		pointList = [(x0 - 5, yBasis - self.waveHeight - self.signalWaveYSpacing/4),
+			(x0 + 2, yBasis - 3*self.waveHeight/4),
+			(x0 - 12, yBasis - self.waveHeight/4),
+			(x0 - 5, yBasis + self.signalWaveYSpacing/4),
+
+			(x0 + 7, yBasis + self.signalWaveYSpacing/4),
+			(x0, yBasis - self.waveHeight/4),
+			(x0 + 17, yBasis - 3*self.waveHeight/4),
+			(x0 + 7, yBasis - self.waveHeight - self.signalWaveYSpacing/4)]
+
+		#the gap covers the waves around it, but stays under the arrows at z 1
+		self.emitPolygon(pointList, color, z = 0.5)
+
+		#a path is a list of (start, control1, control2, end) cubic segments
+		path = [((x0 - 5, yBasis - self.waveHeight - self.signalWaveYSpacing/4),
+					(x0 + 20, yBasis - 3*self.waveHeight/4),
+					(x0 - 28, yBasis - self.waveHeight/4),
+					(x0 - 5, yBasis + self.signalWaveYSpacing/4))]
+		self.emitPath(path, self.gapPen, z = 0.5)
+		path = path + [((x0 + 7, yBasis - self.waveHeight - self.signalWaveYSpacing/4),
+					(x0 + 30, yBasis - 3*self.waveHeight/4),
+					(x0 - 15, yBasis - self.waveHeight/4),
+					(x0 + 7, yBasis + self.signalWaveYSpacing/4))]
+		self.emitPath(path, self.gapPen, z = 0.5)
+
+	def tdDrawGapDontUse(self, waveCount, lastC=None, nextC=None, basis=(0, 0)):
+		xBasis, yBasis = basis
+		x0 = xBasis - self.waveHalfDuration - 5
+		xstep = -25
+		xstep2 = 15
+
+		pointList = [
+			(x0 + self.waveHalfDuration/2 + xstep, yBasis - self.gapHeight - self.signalWaveYSpacing/2),
+			(x0 + self.waveHalfDuration/2 + 7 + xstep, yBasis - 3*self.gapHeight/4),
+			(x0 + self.waveHalfDuration/2 - 7 + xstep, yBasis - self.gapHeight/4),
+			(x0 + self.waveHalfDuration/2 + xstep, yBasis + self.signalWaveYSpacing/2),
+
+			(x0 + self.waveHalfDuration/2 + xstep2, yBasis + self.signalWaveYSpacing/2),
+			(x0 + self.waveHalfDuration/2 - 7 + xstep2, yBasis - self.gapHeight/4),
+			(x0 + self.waveHalfDuration/2 + 7 + xstep2, yBasis - 3*self.gapHeight/4),
+			(x0 + self.waveHalfDuration/2 + xstep2, yBasis - self.gapHeight - self.signalWaveYSpacing/2)]
+
+		p = self.emitPolygon(pointList, self.gapBrushColor)
+		self.setZValue(p, 2)
+		p = self.emitPolygon(pointList, self.gapBrushColor)
+		###p.setBrush(QtGui.QBrush(Qt.DiagCrossPattern))
+		self.setZValue(p, 3)
+
+	def drawOverlays(self):
+		#print the overlaid annotation
+		for s in self.overlayAnnotationList:
+			x0, y0, annot = 0, 0, ''
+			try:
+				l =  s.split(' ')
+				x0, y0 = l[0], l[1]
+				annot = ' '.join(l[2:])
+			except:
+				x0, y0, annot = -1, -1, ''
+
+			if x0 != -1:
+				self.tdPrintOverlayAnnot (x0, y0, annot)
+
+		#draw the direction arrows
+		for s in self.directionArrowsList:
+			#print("DEBUG: self.directionArrowsList = ", self.directionArrowsList)
+			x0, y0, x1, y1, xm, ym = 0, 0, 0, 0, 0, 0
+			try:
+				[x0, y0, x1, y1, xm, ym] = s.split(' ')
+			except:
+				try:
+					[x0, y0, x1, y1] = s.split(' ')
+				except:
+					[x0, y0, x1, y1] = [-1, -1, -1, -1]
+			try:
+				x0 = int(x0)
+			except:
+				x0 = -1
+			try:
+				y0 = int(y0)
+			except:
+				y0 = x0
+			try:
+				x1 = int(x1)
+			except:
+				x1 = x0
+			try:
+				y1 = int(y1)
+			except:
+				y1 = y0
+			try:
+				xm = int(xm)
+			except:
+				xm = (x0 + x1)/2
+			try:
+				ym = int(ym)
+			except:
+				ym = (y0 + y1)/2
+			
+			if x0 != -1:
+				if xm == 0:
+					xm = (x0 + x1)/2
+				if ym == 0:
+					ym = (y0 + y1)/2
+				self.tdDrawDirectionArrow (x0, y0, x1, y1, xm, ym)
+
+	def drawDocument(self, texts, cursorBlock = -1, cursorColumn = -1):
+		#lay out a whole document, one string per text line, and return its primitives;
+		#documentLineStarts holds where each line, and then the overlays, start in them,
+		#and documentLineBands the lineBand of each line
+		self.primitives = []
+		self.documentLineStarts = []
+		self.documentLineBands = []
+		self.directionArrowsList = []
+		self.overlayAnnotationList = []
+		self.linesWithArrow = 0
+		#a document is drawn whole
+		deferWaveTokens = self.deferWaveTokens
+		self.deferWaveTokens = 0
+		try:
+			self.drawDocumentLines(texts, cursorBlock, cursorColumn)
+		finally:
+			self.deferWaveTokens = deferWaveTokens
+		self.documentLineStarts.append(len(self.primitives))
+		self.drawOverlays()
+		return self.primitives
+
+	def drawDocumentLines(self, texts, cursorBlock, cursorColumn):
+		line = 0
+		acceptDirective = True
+		for i in range (0, len(texts)):
+			data = texts[i]
+			if data.strip() == '':
+				continue
+			if acceptDirective == True:
+				if data.strip().find('#!') == 0:
+					if data[2:] != '':
+						self.processDirective(data[2:])
+					continue
+			command = self.commandOf(data)
+			if command != '':
+				acceptDirective = False
+				self.documentLineStarts.append(len(self.primitives))
+				self.documentLineBands.append(self.lineBand(line))
+				if self.maxWaveCount > 0:
+					self.fillAllGrids()
+				line += self.drawWaves1Line (line, command, cursorBlock == i, cursorColumn)
+				self.waveHeightChange = 0
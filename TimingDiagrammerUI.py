@@ -62,12 +62,12 @@ class Ui_TimingDiagrammer(object):
 		self.plainTextEdit.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAsNeeded)
 		self.plainTextEdit.setPlainText("")
 		self.plainTextEdit.setObjectName("plainTextEdit")
-		self.gridLayout.addWidget(self.plainTextEdit, 1, 0, 1, 1)
+		self.gridLayout.addWidget(self.plainTextEdit, 2, 0, 1, 1)
 		self.label = QtWidgets.QLabel(self.main)
 		self.label.setMinimumSize(QtCore.QSize(20, 20))
 		self.label.setBaseSize(QtCore.QSize(20, 20))
 		self.label.setObjectName("label")
-		self.gridLayout.addWidget(self.label, 2, 0, 1, 1)
+		self.gridLayout.addWidget(self.label, 3, 0, 1, 1)
 		TimingDiagrammer.setCentralWidget(self.main)
 		self.menu = QtWidgets.QMenuBar(TimingDiagrammer)
 		self.menu.setEnabled(True)
@@ -90,6 +90,8 @@ class Ui_TimingDiagrammer(object):
 		self.menuFile.setObjectName("menuFile")
 		self.menuOptions = QtWidgets.QMenu(self.menu)
 		self.menuOptions.setObjectName("menuOptions")
+		self.menuView = QtWidgets.QMenu(self.menu)
+		self.menuView.setObjectName("menuView")
 		self.menuHelp = QtWidgets.QMenu(self.menu)
 		self.menuHelp.setObjectName("menuHelp")
 		TimingDiagrammer.setMenuBar(self.menu)
@@ -103,6 +105,8 @@ class Ui_TimingDiagrammer(object):
 		self.actionSaveAs.setObjectName("actionSaveAs")
 		self.actionExport = QtWidgets.QAction(TimingDiagrammer)
 		self.actionExport.setObjectName("actionExport")
+		self.actionExportSvg = QtWidgets.QAction(TimingDiagrammer)
+		self.actionExportSvg.setObjectName("actionExportSvg")
 		self.actionExit = QtWidgets.QAction(TimingDiagrammer)
 		self.actionExit.setObjectName("actionExit")
 		self.actionAliasing = QtWidgets.QAction(TimingDiagrammer)
@@ -111,17 +115,32 @@ class Ui_TimingDiagrammer(object):
 		self.actionSettings.setObjectName("actionSettings")
 		self.actionAbout = QtWidgets.QAction(TimingDiagrammer)
 		self.actionAbout.setObjectName("actionAbout")
+		self.actionZoomIn = QtWidgets.QAction(TimingDiagrammer)
+		self.actionZoomIn.setObjectName("actionZoomIn")
+		self.actionZoomOut = QtWidgets.QAction(TimingDiagrammer)
+		self.actionZoomOut.setObjectName("actionZoomOut")
+		self.actionZoomReset = QtWidgets.QAction(TimingDiagrammer)
+		self.actionZoomReset.setObjectName("actionZoomReset")
+		self.actionMinimap = QtWidgets.QAction(TimingDiagrammer)
+		self.actionMinimap.setObjectName("actionMinimap")
 		self.menuFile.addAction(self.actionNew)
 		self.menuFile.addAction(self.actionOpen)
 		self.menuFile.addAction(self.actionSave)
 		self.menuFile.addAction(self.actionSaveAs)
 		self.menuFile.addAction(self.actionExport)
+		self.menuFile.addAction(self.actionExportSvg)
 		self.menuFile.addSeparator()
 		self.menuFile.addAction(self.actionExit)
 		self.menuOptions.addAction(self.actionAliasing)
 		self.menuOptions.addAction(self.actionSettings)
+		self.menuView.addAction(self.actionZoomIn)
+		self.menuView.addAction(self.actionZoomOut)
+		self.menuView.addAction(self.actionZoomReset)
+		self.menuView.addSeparator()
+		self.menuView.addAction(self.actionMinimap)
 		self.menuHelp.addAction(self.actionAbout)
 		self.menu.addAction(self.menuFile.menuAction())
+		self.menu.addAction(self.menuView.menuAction())
 		self.menu.addAction(self.menuOptions.menuAction())
 		self.menu.addAction(self.menuHelp.menuAction())
 
@@ -134,14 +153,25 @@ class Ui_TimingDiagrammer(object):
 		self.label.setText(_translate("TimingDiagrammer", "Status: Ready"))
 		self.menuFile.setTitle(_translate("TimingDiagrammer", "File"))
 		self.menuOptions.setTitle(_translate("TimingDiagrammer", "Options"))
+		self.menuView.setTitle(_translate("TimingDiagrammer", "View"))
 		self.menuHelp.setTitle(_translate("TimingDiagrammer", "Help"))
 		self.actionNew.setText(_translate("TimingDiagrammer", "New"))
 		self.actionOpen.setText(_translate("TimingDiagrammer", "Open"))
 		self.actionSave.setText(_translate("TimingDiagrammer", "Save"))
 		self.actionSaveAs.setText(_translate("TimingDiagrammer", "Save As"))
 		self.actionExport.setText(_translate("TimingDiagrammer", "Export image"))
+		self.actionExportSvg.setText(_translate("TimingDiagrammer", "Export SVG"))
 		self.actionExit.setText(_translate("TimingDiagrammer", "Exit"))
 		self.actionAliasing.setText(_translate("TimingDiagrammer", "Enable Anitialiasing"))
 		self.actionAliasing.setCheckable(True)
 		self.actionSettings.setText(_translate("TimingDiagrammer", "Settings"))
 		self.actionAbout.setText(_translate("TimingDiagrammer", "About"))
+		self.actionZoomIn.setText(_translate("TimingDiagrammer", "Zoom In"))
+		self.actionZoomIn.setShortcut(_translate("TimingDiagrammer", "Ctrl++"))
+		self.actionZoomOut.setText(_translate("TimingDiagrammer", "Zoom Out"))
+		self.actionZoomOut.setShortcut(_translate("TimingDiagrammer", "Ctrl+-"))
+		self.actionZoomReset.setText(_translate("TimingDiagrammer", "Actual Size"))
+		self.actionZoomReset.setShortcut(_translate("TimingDiagrammer", "Ctrl+0"))
+		self.actionMinimap.setText(_translate("TimingDiagrammer", "Overview"))
+		self.actionMinimap.setCheckable(True)
+		self.actionMinimap.setChecked(True)
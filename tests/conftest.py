@@ -0,0 +1,12 @@
+import os, sys
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+testDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(testDir))
+
+from PyQt5.QtWidgets import QApplication
+
+@pytest.fixture(scope='session')
+def app():
+	return QApplication.instance() or QApplication(sys.argv[:1])
@@ -0,0 +1,44 @@
+import os, io, contextlib
+
+from PyQt5 import QtCore, QtGui
+import TimingDiagrammer as TD
+
+testDir = os.path.dirname(os.path.abspath(__file__))
+
+def newForm(**settings):
+	form = TD.TimingDiagrammer()
+	for k, v in settings.items():
+		setattr(form, k, v)
+	return form
+
+def loadForm(form, name, directory = testDir):
+	form.currentDirName = directory
+	form.currentFileName = name
+	form.resetParameters()
+	form.resetVariables()
+	with contextlib.redirect_stdout(io.StringIO()):
+		form.fileReadBackend()
+		form.finishRedraw()
+
+def sceneImage(form):
+	if form.incrementalRedraw:
+		form.showVirtualRegion(None, None)
+	scene = form.graphicsView.scene()
+	rect = scene.sceneRect()
+	image = QtGui.QImage(QtCore.QRectF(rect).toRect().size(), QtGui.QImage.Format_RGB32)
+	image.fill(QtGui.QColor('white'))
+	painter = QtGui.QPainter(image)
+	scene.render(painter)
+	painter.end()
+	return image, (rect.x(), rect.y(), rect.width(), rect.height())
+
+def readImage(fileName):
+	image = QtGui.QImage(fileName)
+	assert not image.isNull(), fileName
+	return image.convertToFormat(QtGui.QImage.Format_RGB32)
+
+def writeTim(directory, name, text):
+	fileName = os.path.join(str(directory), name)
+	with open(fileName, 'w', encoding = 'utf-8', newline = '\n') as f:
+		f.write(text)
+	return fileName
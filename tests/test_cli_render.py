@@ -0,0 +1,53 @@
+import os, sys, shutil, subprocess
+
+from helpers import testDir, readImage
+
+script = os.path.join(os.path.dirname(testDir), 'TimingDiagrammer.py')
+
+def render(*args):
+	env = dict(os.environ, QT_QPA_PLATFORM = 'offscreen')
+	return subprocess.run([sys.executable, script, '--render'] + [str(arg) for arg in args],
+		capture_output = True, text = True, env = env, timeout = 600)
+
+def test_render_writes_each_input_next_to_it(app, tmp_path):
+	for name in ('example.tim', 'clk.tim'):
+		shutil.copy(os.path.join(testDir, name), str(tmp_path))
+	result = render(tmp_path)
+	assert result.returncode == 0, result.stderr
+	assert result.stdout == ''
+	for name in ('example.png', 'clk.png'):
+		assert not readImage(str(tmp_path / name)).isNull()
+
+def test_render_to_a_named_svg(app, tmp_path):
+	fileName = tmp_path / 'out.svg'
+	result = render(os.path.join(testDir, 'arr.tim'), '-o', fileName)
+	assert result.returncode == 0, result.stderr
+	with open(str(fileName), encoding = 'utf-8') as f:
+		assert '<svg' in f.read()
+
+def test_render_reports_failures_and_exits_nonzero(app, tmp_path):
+	missing = str(tmp_path / 'missing.tim')
+	result = render(os.path.join(testDir, 'example.tim'), missing, os.path.join(testDir, 'clk.tim'),
+		'-o', tmp_path / 'out')
+	assert result.returncode == 1
+	#Qt may warn on stderr as well
+	lines = result.stderr.splitlines()
+	assert [line for line in lines if line.startswith(missing + ": Error: ")] != []
+	assert lines[-1] == "1 of 3 file(s) failed"
+	#the other files are still written
+	assert sorted(os.listdir(str(tmp_path / 'out'))) == ['clk.png', 'example.png']
+
+def test_parallel_render_keeps_input_order_and_output(app, tmp_path):
+	names = ['annot.tim', 'clk.tim', 'example.tim', 'arr.tim', 'color.tim']
+	inputs = [os.path.join(testDir, name) for name in names]
+	serial = render(*(inputs + ['-o', tmp_path / 'serial', '-j', 1, '--stats']))
+	parallel = render(*(inputs + ['-o', tmp_path / 'parallel', '-j', 2, '--stats']))
+	for result in (serial, parallel):
+		assert result.returncode == 0, result.stderr
+		#one line per file, in the order given, whichever process finished first
+		reported = [line.split(' -> ')[0] for line in result.stdout.splitlines() if ' -> ' in line]
+		assert reported == inputs
+	assert "2 process(es)" in parallel.stdout
+	for name in names:
+		imageName = name[:-4] + '.png'
+		assert readImage(str(tmp_path / 'serial' / imageName)) == readImage(str(tmp_path / 'parallel' / imageName))
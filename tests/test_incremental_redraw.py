@@ -0,0 +1,48 @@
+import random, io, contextlib
+import pytest
+
+from PyQt5 import QtGui
+from helpers import newForm, loadForm, sceneImage
+
+def editStep(forms, rng, chars):
+	text = forms[0].plainTextEdit.toPlainText()
+	n = len(text)
+	pos = rng.randrange(0, n + 1)
+	delete = rng.random() < 0.4 and n > 0
+	count = rng.randrange(1, 4)
+	ins = ''.join(rng.choice(chars) for _ in range(rng.randrange(1, 4)))
+	for form in forms:
+		cursor = form.plainTextEdit.textCursor()
+		cursor.setPosition(pos)
+		with contextlib.redirect_stdout(io.StringIO()):
+			if delete:
+				cursor.setPosition(min(pos + count, n), QtGui.QTextCursor.KeepAnchor)
+				form.plainTextEdit.setTextCursor(cursor)
+				cursor.removeSelectedText()
+			else:
+				form.plainTextEdit.setTextCursor(cursor)
+				cursor.insertText(ins)
+	for form in forms:
+		with contextlib.redirect_stdout(io.StringIO()):
+			form.flushRedraw()
+			form.finishRedraw()
+
+@pytest.mark.parametrize('defer', [0, 3])
+@pytest.mark.parametrize('name', ['example.tim', 'clk.tim', 'annot.tim'])
+def test_incremental_redraw_matches_full_rebuild(app, name, defer):
+	incremental = newForm(incrementalRedraw=True)
+	if defer:
+		incremental.deferWaveTokens = defer
+		incremental.deferRunTokens = 2
+	full = newForm(incrementalRedraw=False)
+	forms = (incremental, full)
+	for form in forms:
+		loadForm(form, name)
+	assert sceneImage(incremental) == sceneImage(full)
+	rng = random.Random(name + str(defer))
+	for step in range(8):
+		editStep(forms, rng, 'DdXxlhrRpPz;\n$r3|<->,abc')
+		imageIncremental, rectIncremental = sceneImage(incremental)
+		imageFull, rectFull = sceneImage(full)
+		assert rectIncremental == rectFull, step
+		assert imageIncremental == imageFull, step
@@ -0,0 +1,70 @@
+import io, contextlib
+
+from PyQt5 import QtGui
+from helpers import newForm, loadForm, sceneImage
+
+def edit(form, start, end, text):
+	#replaces the text between two positions and leaves the cursor at the end
+	#of the document, on its last line, which is empty
+	cursor = form.plainTextEdit.textCursor()
+	cursor.setPosition(start)
+	cursor.setPosition(end, QtGui.QTextCursor.KeepAnchor)
+	with contextlib.redirect_stdout(io.StringIO()):
+		cursor.insertText(text)
+		cursor.movePosition(QtGui.QTextCursor.End)
+		form.plainTextEdit.setTextCursor(cursor)
+		form.flushRedraw()
+		form.finishRedraw()
+
+def lineItems(form):
+	return dict((key, entry['items']) for (key, entry) in form.lineItemCache.items())
+
+def redraw(form):
+	with contextlib.redirect_stdout(io.StringIO()):
+		form.reDrawCanvas()
+		form.finishRedraw()
+
+def test_lines_that_move_back_get_their_items_back(app):
+	form = newForm()
+	loadForm(form, 'example.tim')
+	edit(form, 0, 0, '')
+	#the first lines start from the state the last redraw ended with
+	redraw(form)
+	before = lineItems(form)
+	drawnLines = []
+	drawWaves1Line = form.drawWaves1Line
+	def counted(*args):
+		drawnLines.append(args[0])
+		return drawWaves1Line(*args)
+	form.drawWaves1Line = counted
+	#a new line on top moves every line down, taking it away moves them back
+	added = 'added;PPPPDDxx\n'
+	edit(form, 0, 0, added)
+	assert len(form.lineDrawingCache) >= len(before) - 1
+	del drawnLines[:]
+	edit(form, 0, len(added), '')
+	redraw(form)
+	after = lineItems(form)
+	assert after.keys() == before.keys()
+	for key in before:
+		assert after[key] is before[key]
+	#moving back lays out only the lines before the state settles
+	assert len(drawnLines) < len(before) / 2
+	full = newForm(incrementalRedraw = False)
+	loadForm(full, 'example.tim')
+	assert sceneImage(form) == sceneImage(full)
+
+def test_line_drawing_cache_keeps_the_latest_drawings(app):
+	form = newForm()
+	loadForm(form, 'example.tim')
+	form.lineDrawingCacheSize = 3
+	redraw(form)
+	before = sorted(form.lineItemCache.items(), key = lambda item: item[1]['ordinal'])
+	assert len(before) > 3
+	document = form.plainTextEdit.document()
+	edit(form, 0, document.characterCount() - 1, 'other;PPPP\n')
+	#the lines were put away in order, and only the last three are kept
+	assert list(form.lineDrawingCache.keys()) == [key for (key, entry) in before[-3:]]
+	for (key, entry) in before[:-3]:
+		for item in entry['items']:
+			assert item.scene() is not form.graphicsScene
@@ -0,0 +1,38 @@
+import random
+
+from TimingDiagrammerEngine import TimingEngine
+
+#the per-character lookahead as it was before resolvednextCList
+def oldResolvednextC(cmd):
+	i = 0
+	last = chr(0)
+	ret = chr(0)
+	for c in cmd:
+		if c in '0123456789|/$':
+			i += 1
+			last = c
+			continue
+		elif last == '$':
+			last = chr(0)
+			if i < len(cmd) - 1:
+				ret = cmd[i+1:i+2]
+				if not ret in '0123456789|/$':
+					break
+		else:
+			ret = c
+			break
+		i += 1
+	return ret
+
+def test_resolvednextCList_matches_old_lookahead():
+	engine = TimingEngine()
+	rng = random.Random(5)
+	alphabet = 'PpDXdxlhz0123456789|/$rgb'
+	cmds = ['', 'P', 'D$', '$$', '$D', 'D$x', 'D$$x', '12|/x', 'D3$X', 'x$3$', 'l$h$l', 'P$|$/p']
+	cmds += [''.join(rng.choice(alphabet) for _ in range(rng.randrange(1, 30))) for _ in range(2000)]
+	for cmd in cmds:
+		nextCs = engine.resolvednextCList(cmd)
+		assert len(nextCs) == len(cmd), cmd
+		for cNum in range(len(cmd)):
+			expected = oldResolvednextC(cmd[cNum+1:]) if cNum < len(cmd) - 1 else chr(0)
+			assert nextCs[cNum] == expected, (cmd, cNum)
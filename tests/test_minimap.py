@@ -0,0 +1,82 @@
+import time, math
+import pytest
+
+from PyQt5 import QtCore, QtGui
+from PyQt5.QtCore import Qt
+from helpers import newForm, loadForm, writeTim
+
+def drawMinimap(app, form, width = 300, timeout = 30):
+	#the minimap is only scheduled while it is shown, so it is started here
+	form.minimap.resize(width, form.minimap.height())
+	form.minimap.setImage(None, QtCore.QRectF())
+	form.startMinimap()
+	deadline = time.monotonic() + timeout
+	while form.minimap.image is None and time.monotonic() < deadline:
+		app.processEvents()
+		time.sleep(0.001)
+	assert form.minimap.image is not None
+
+def manyLines(directory, count):
+	return writeTim(directory, 'many%d.tim' % count, "".join("s%d;PPPPhlDxxD\n" % i for i in range(0, count)))
+
+@pytest.mark.parametrize('incrementalRedraw', [True, False])
+def test_minimap_gives_each_line_a_row(app, incrementalRedraw):
+	form = newForm(incrementalRedraw = incrementalRedraw)
+	loadForm(form, 'example.tim')
+	try:
+		drawMinimap(app, form)
+	finally:
+		form.stopRenderThread()
+	minimap = form.minimap
+	assert (minimap.image.width(), minimap.image.height()) == (300, minimap.height())
+	rect = form.graphicsScene.sceneRect()
+	assert minimap.imageRect == rect
+	#each line between the two ends, and in order in the image and the scene
+	centers = minimap.rowCenters
+	assert len(centers) == 12 + 2
+	assert centers[0] == (0, rect.top())
+	assert centers[-1] == (minimap.image.height(), rect.bottom())
+	for i in range(1, len(centers)):
+		assert centers[i][0] > centers[i - 1][0]
+		assert centers[i][1] > centers[i - 1][1]
+
+def test_minimap_shows_every_so_many_lines_when_they_do_not_fit(app, tmp_path):
+	form = newForm()
+	loadForm(form, manyLines(tmp_path, 40))
+	try:
+		drawMinimap(app, form)
+	finally:
+		form.stopRenderThread()
+	minimap = form.minimap
+	#none less than minimapRowPixels high
+	step = math.ceil(40 * form.minimapRowPixels / minimap.height())
+	assert step > 1
+	assert len(minimap.rowCenters) == math.ceil(40 / step) + 2
+	rows = minimap.rowCenters[1:-1]
+	assert rows[1][0] - rows[0][0] >= form.minimapRowPixels
+
+def test_minimap_click_centers_the_view_on_the_row(app):
+	form = newForm()
+	loadForm(form, 'example.tim')
+	try:
+		drawMinimap(app, form)
+	finally:
+		form.stopRenderThread()
+	minimap = form.minimap
+	rect = minimap.imageRect
+	#a row in the middle, where the view can be centered on it
+	(imageY, sceneY) = minimap.rowCenters[len(minimap.rowCenters) // 2]
+	assert minimap.mapY(imageY, 0) == sceneY
+	assert minimap.mapY(sceneY, 1) == imageY
+	pos = QtCore.QPoint(minimap.width() // 2, round(imageY * minimap.height() / minimap.image.height()))
+	event = QtGui.QMouseEvent(QtCore.QEvent.MouseButtonPress, QtCore.QPointF(pos), Qt.LeftButton, Qt.LeftButton, Qt.NoModifier)
+	minimap.mousePressEvent(event)
+	view = form.graphicsView
+	center = view.mapToScene(view.viewport().rect().center())
+	assert abs(center.x() - (rect.x() + rect.width() / 2)) < 3
+	assert abs(center.y() - sceneY) < 3
+	#the frame drawn around what the view shows is around that row
+	shown = view.mapToScene(view.viewport().rect()).boundingRect()
+	frame = minimap.sceneToMinimap(shown)
+	assert frame.top() < pos.y() < frame.bottom()
+	assert frame.left() < pos.x() < frame.right()
@@ -0,0 +1,64 @@
+import io, contextlib
+
+from PyQt5 import QtGui
+from helpers import newForm, loadForm, sceneImage, writeTim
+
+def longTim(directory):
+	#far more lines than the view shows
+	return writeTim(directory, 'lines.tim', "".join("s%d;%s\n" % (i, "PPhlDxxDzZ"[i % 7:] + "lhDX") for i in range(0, 60)))
+
+def edit(form, start, end, text):
+	#the redraw is started, but left to continueRedraw
+	cursor = form.plainTextEdit.textCursor()
+	cursor.setPosition(start)
+	cursor.setPosition(end, QtGui.QTextCursor.KeepAnchor)
+	with contextlib.redirect_stdout(io.StringIO()):
+		cursor.insertText(text)
+		cursor.movePosition(QtGui.QTextCursor.Start)
+		form.plainTextEdit.setTextCursor(cursor)
+		form.flushRedraw()
+
+def continueRedraw(form):
+	with contextlib.redirect_stdout(io.StringIO()):
+		form.continueRedraw()
+
+def fullImage(form, directory):
+	full = newForm(incrementalRedraw = False)
+	loadForm(full, writeTim(directory, 'full.tim', form.plainTextEdit.toPlainText()))
+	return sceneImage(full)
+
+def test_progressive_redraw_ends_as_a_full_rebuild(app, tmp_path):
+	form = newForm(progressiveRedraw = True, progressiveSliceTime = 0)
+	loadForm(form, longTim(tmp_path))
+	edit(form, 0, 0, 'top;PPPPDDxx\n')
+	#the view is drawn, the rest is still to come
+	assert form.redrawSteps is not None
+	slices = 0
+	while form.redrawSteps is not None:
+		continueRedraw(form)
+		slices += 1
+	assert slices > 1
+	assert sceneImage(form) == fullImage(form, tmp_path)
+
+def test_abandoned_redraw_leaves_the_next_one_whole(app, tmp_path):
+	form = newForm(progressiveRedraw = True, progressiveSliceTime = 0)
+	loadForm(form, longTim(tmp_path))
+	edit(form, 0, 0, 'top;PPPPDDxx\n')
+	continueRedraw(form)
+	assert form.redrawSteps is not None
+	#an edit halfway through starts over from what is drawn so far
+	edit(form, 0, len('top;'), 'first;hl')
+	assert form.redrawSteps is not None
+	with contextlib.redirect_stdout(io.StringIO()):
+		form.finishRedraw()
+	assert form.redrawSteps is None
+	assert sceneImage(form) == fullImage(form, tmp_path)
+	#and so does one abandoned outright
+	edit(form, 0, 0, 'other;DDDD\n')
+	form.abandonRedraw()
+	assert form.redrawSteps is None
+	assert form.dirtyBlocks != set()
+	with contextlib.redirect_stdout(io.StringIO()):
+		form.reDrawCanvas()
+		form.finishRedraw()
+	assert sceneImage(form) == fullImage(form, tmp_path)
@@ -0,0 +1,88 @@
+import os, time, io, contextlib
+import pytest
+
+import TimingDiagrammer as TD
+from helpers import testDir, newForm, loadForm, sceneImage
+
+def waitForRedraw(app, form, timeout = 30):
+	deadline = time.monotonic() + timeout
+	with contextlib.redirect_stdout(io.StringIO()):
+		while form.redrawPending and time.monotonic() < deadline:
+			app.processEvents()
+			time.sleep(0.001)
+		assert not form.redrawPending
+		form.finishRedraw()
+
+def editedText(name):
+	with open(os.path.join(testDir, name), encoding = 'utf-8') as f:
+		text = f.read()
+	#a new line at the top moves every line under it
+	return 'moved;PPPPdDxX\n' + text.replace('D', 'X', 3)
+
+def setText(form, text):
+	with contextlib.redirect_stdout(io.StringIO()):
+		form.plainTextEdit.setPlainText(text)
+
+def countLayouts(form):
+	#the lines laid out on the main thread
+	calls = []
+	drawWaves1Line = form.drawWaves1Line
+	def counted(*args):
+		calls.append(args[0])
+		return drawWaves1Line(*args)
+	form.drawWaves1Line = counted
+	return calls
+
+@pytest.mark.parametrize('name', ['example.tim', 'clk.tim', 'annot.tim'])
+def test_background_render_matches_synchronous_redraw(app, name):
+	background = newForm(redrawQuietPeriod = 1)
+	synchronous = newForm(redrawQuietPeriod = 0)
+	for form in (background, synchronous):
+		loadForm(form, name)
+	waitForRedraw(app, background)
+	calls = countLayouts(background)
+	text = editedText(name)
+	setText(background, text)
+	assert background.redrawPending
+	setText(synchronous, text)
+	waitForRedraw(app, background)
+	try:
+		assert background.renderWorker is not None
+		#the worker laid out all but the line with the cursor
+		assert len(calls) <= 1
+		assert sceneImage(background) == sceneImage(synchronous)
+	finally:
+		background.stopRenderThread()
+
+def test_stale_background_render_is_dropped(app):
+	background = newForm(redrawQuietPeriod = 1)
+	synchronous = newForm(redrawQuietPeriod = 0)
+	for form in (background, synchronous):
+		loadForm(form, 'example.tim')
+	waitForRedraw(app, background)
+	setText(background, editedText('example.tim'))
+	#the answer to an older edit changes nothing
+	background.backgroundRenderDone(background.renderGeneration - 1, {})
+	assert background.redrawPending
+	#nor does one to an edit that a newer one has overtaken
+	text = editedText('clk.tim')
+	setText(background, text)
+	setText(synchronous, text)
+	waitForRedraw(app, background)
+	try:
+		assert sceneImage(background) == sceneImage(synchronous)
+	finally:
+		background.stopRenderThread()
+
+def test_engine_state_is_a_copy_that_lays_out_the_same(app):
+	form = newForm()
+	loadForm(form, 'color.tim')
+	state = form.engineState()
+	assert 'primitives' not in state
+	engine = TD.LayoutEngine()
+	engine.loadEngineState(state)
+	assert engine.directiveStateKey() == form.directiveStateKey()
+	assert engine.primitives == []
+	#the copy is the worker's own
+	state['gridPen'] = None
+	assert form.gridPen is not None
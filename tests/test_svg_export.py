@@ -0,0 +1,54 @@
+import os, shutil, io, contextlib
+import xml.etree.ElementTree as ET
+import pytest
+
+from PyQt5.QtWidgets import QMessageBox
+import TimingDiagrammer as TD
+from helpers import testDir, newForm, loadForm
+
+timFiles = ['example.tim', 'clk.tim', 'arr.tim', 'annot.tim', 'color.tim', 'delays.tim']
+
+@pytest.mark.parametrize('name', timFiles)
+def test_svg_parses_and_matches_scene(app, tmp_path, name):
+	form = newForm()
+	loadForm(form, name)
+	fileName = str(tmp_path / 'out.svg')
+	assert form.exportImage(fileName)
+	root = ET.parse(fileName).getroot()
+	assert root.tag.endswith('svg')
+	size = form.exportSize()
+	rect = form.graphicsView.scene().sceneRect()
+	assert float(root.get('width').rstrip('px')) == size.width()
+	assert float(root.get('height').rstrip('px')) == size.height()
+	viewBox = [float(v) for v in root.get('viewBox').split()]
+	#the view box starts at the scene origin and has the exported pixel size
+	assert viewBox == pytest.approx([rect.x(), rect.y(), size.width(), size.height()])
+	assert abs(size.width() - rect.width()) < 1 and abs(size.height() - rect.height()) < 1
+	assert len(list(root.iter())) > 1
+
+class RecordedMessageBox(QMessageBox):
+	#shows nothing, keeps what would have been shown
+	shown = []
+
+	def exec_(self):
+		RecordedMessageBox.shown.append((self.icon(), self.text()))
+		return QMessageBox.Ok
+
+@pytest.mark.parametrize('extension', ['.png', '.svg'])
+def test_file_export_reports_success_and_failure(app, tmp_path, monkeypatch, extension):
+	monkeypatch.setattr(TD, 'QMessageBox', RecordedMessageBox)
+	monkeypatch.setattr(RecordedMessageBox, 'shown', [])
+	shutil.copy(os.path.join(testDir, 'clk.tim'), str(tmp_path))
+	form = newForm()
+	loadForm(form, 'clk.tim', str(tmp_path))
+	with contextlib.redirect_stdout(io.StringIO()):
+		form.fileExport(None, extension)
+	assert os.path.isfile(str(tmp_path / ('clk' + extension)))
+	#a directory in the way of the image
+	os.remove(str(tmp_path / ('clk' + extension)))
+	os.mkdir(str(tmp_path / ('clk' + extension)))
+	with contextlib.redirect_stdout(io.StringIO()):
+		form.fileExport(None, extension)
+	[(icon, text), (failedIcon, failedText)] = RecordedMessageBox.shown
+	assert icon == QMessageBox.Information and text.startswith("Success")
+	assert failedIcon == QMessageBox.Critical and failedText.startswith("Error")
@@ -0,0 +1,84 @@
+import os, io, contextlib
+import pytest
+
+from helpers import testDir, newForm, readImage, writeTim
+
+def longTim(directory, cycles):
+	#dotted grid runs and dashed lines that reach across many tiles
+	return writeTim(directory, 'long%d.tim' % cycles, "#!grid both\n" +
+		"clk;" + "P" * cycles + "\n" + "bus;" + "DzxZ" * (cycles // 4) + "\n" + "sig;" + "hlz" * (cycles // 3) + "\n")
+
+def exportSingleAndTiled(tmp_path, fileName, threads = 1):
+	form = newForm(incrementalRedraw=False, progressiveRedraw=False)
+	single = str(tmp_path / 'single.png')
+	tiled = str(tmp_path / 'tiled.png')
+	with contextlib.redirect_stdout(io.StringIO()):
+		form.exportThreads = 1
+		form.renderFile(fileName, single)
+		form.exportMaxImageBytes = 0
+		form.exportTileBytes = 60000
+		form.exportTileWidth = 200
+		form.exportThreads = threads
+		assert form.exportImage(tiled)
+	imageTiled = readImage(tiled)
+	assert imageTiled.size() == form.exportSize()
+	return readImage(single), imageTiled
+
+@pytest.mark.parametrize('name', ['example.tim', 'clk.tim', 'arr.tim'])
+def test_tiled_export_matches_single_image(app, tmp_path, name):
+	imageSingle, imageTiled = exportSingleAndTiled(tmp_path, os.path.join(testDir, name))
+	assert imageSingle == imageTiled
+
+def test_long_dotted_lines_tile_exactly(app, tmp_path):
+	imageSingle, imageTiled = exportSingleAndTiled(tmp_path, longTim(tmp_path, 240))
+	assert imageTiled.width() > 20 * 200
+	assert imageSingle == imageTiled
+
+def test_tile_margin_does_not_grow_with_the_diagram(app, tmp_path):
+	margins = []
+	for cycles in (24, 240):
+		form = newForm(incrementalRedraw=False, progressiveRedraw=False)
+		with contextlib.redirect_stdout(io.StringIO()):
+			form.renderFile(longTim(tmp_path, cycles), str(tmp_path / 'out.png'))
+		margins.append(form.exportMargin(form.exportSize()))
+	assert margins[0] == margins[1]
+	#the widest pen and an arrowhead, not the longest line
+	assert max(margins[1]) < 40
+
+@pytest.mark.parametrize('name', ['example.tim', 'annot.tim'])
+def test_tiles_drawn_on_threads_match_single_image(app, tmp_path, name):
+	imageSingle, imageTiled = exportSingleAndTiled(tmp_path, os.path.join(testDir, name), threads = 3)
+	assert imageSingle == imageTiled
+
+def test_threads_draw_wide_images_in_tiles(app, tmp_path, monkeypatch):
+	#under exportMaxImageBytes, but wide enough to spread over the threads
+	form = newForm(incrementalRedraw=False, progressiveRedraw=False)
+	single = str(tmp_path / 'single.png')
+	with contextlib.redirect_stdout(io.StringIO()):
+		form.exportThreads = 1
+		form.renderFile(os.path.join(testDir, 'example.tim'), single)
+		form.exportTileWidth = 200
+		form.exportThreads = 3
+		tiled = []
+		exportTiled = form.exportTiled
+		monkeypatch.setattr(form, 'exportTiled', lambda fileName: tiled.append(fileName) or exportTiled(fileName))
+		assert form.exportImage(str(tmp_path / 'threads.png'))
+	assert tiled != []
+	assert readImage(single) == readImage(str(tmp_path / 'threads.png'))
+
+def test_strips_drawn_on_threads_match_single_image(app, tmp_path):
+	form = newForm(incrementalRedraw=False, progressiveRedraw=False)
+	single = str(tmp_path / 'single.png')
+	with contextlib.redirect_stdout(io.StringIO()):
+		form.exportThreads = 1
+		form.renderFile(os.path.join(testDir, 'example.tim'), single)
+		form.exportStripWidth = 300
+		form.exportThreads = 3
+		assert form.exportImage(str(tmp_path / 'strip.png'))
+	imageSingle = readImage(single)
+	left = 0
+	for number in range(1, (imageSingle.width() + 299) // 300 + 1):
+		strip = readImage(str(tmp_path / ('strip-%03d.png' % number)))
+		assert strip == imageSingle.copy(left, 0, strip.width(), imageSingle.height())
+		left += strip.width()
+	assert left == imageSingle.width()
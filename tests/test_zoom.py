@@ -0,0 +1,63 @@
+from PyQt5 import QtCore, QtGui
+import TimingDiagrammer as TD
+from helpers import newForm, loadForm
+
+def renderScaled(form, scale):
+	#the scene drawn at a scale, as the view draws it when zoomed
+	rect = form.graphicsView.scene().sceneRect()
+	size = (rect.size() * scale).toSize().expandedTo(QtCore.QSize(1, 1))
+	image = QtGui.QImage(size, QtGui.QImage.Format_RGB32)
+	image.fill(QtGui.QColor('white'))
+	painter = QtGui.QPainter(image)
+	form.graphicsView.scene().render(painter, QtCore.QRectF(image.rect()), rect)
+	painter.end()
+	return image
+
+def darkPixels(image):
+	count = 0
+	for y in range(0, image.height()):
+		for x in range(0, image.width()):
+			if QtGui.qGray(image.pixel(x, y)) < 128:
+				count += 1
+	return count
+
+def countCalls(monkeypatch, name):
+	calls = []
+	method = getattr(TD.WaveRow, name)
+	def counted(self, *args):
+		calls.append(args)
+		return method(self, *args)
+	monkeypatch.setattr(TD.WaveRow, name, counted)
+	return calls
+
+def test_zoom_is_kept_between_its_limits(app):
+	form = newForm()
+	loadForm(form, 'example.tim')
+	form.zoomBy(1e6)
+	assert form.zoomFactor == form.zoomMax
+	assert form.graphicsView.transform().m11() == form.zoomMax
+	form.zoomBy(1e-9)
+	assert form.zoomFactor == form.zoomMin
+	assert form.graphicsView.transform().m11() == form.zoomMin
+	form.viewZoomReset()
+	assert form.zoomFactor == 1
+	assert form.graphicsView.transform().m11() == 1
+	assert form.label.text() == "Status: Zoom 100%"
+
+def test_rows_far_out_are_painted_as_envelopes(app, monkeypatch):
+	form = newForm(incrementalRedraw = False)
+	loadForm(form, 'clk.tim')
+	painted = countCalls(monkeypatch, 'paintEnvelope')
+	built = countCalls(monkeypatch, 'envelope')
+	renderScaled(form, 1)
+	assert painted == []
+	#a cycle under lodCyclePixels device pixels wide
+	scale = TD.WaveRow.lodCyclePixels / (2 * form.waveHalfPeriod) / 4
+	image = renderScaled(form, scale)
+	assert painted != []
+	assert darkPixels(image) > 0
+	assert built != []
+	#zooming a little further reuses the envelopes of the same column width
+	del built[:]
+	renderScaled(form, scale * 0.9)
+	assert built == []